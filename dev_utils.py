@@ -72,3 +72,190 @@ def test_run():
     sik.click(pic_plus)
     sik.click(pic_1)
     sik.click(pic_equal)
+
+
+def _benchmark(func, repeat=5):
+    import time
+
+    func()  # warm up caches
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def benchFeatureSearch(sizes=(64, 128, 256, 512, 800), repeat=5):
+    """
+    compares exist() with existByFeatures() on the current screen,
+    templates of different sizes are cut out from the center of the screen
+    """
+    from src.pysikuli._features import FeatureIndex
+
+    compression_ratio = sik.config.COMPRESSION_RATIO
+    region = sik.config.MONITOR_REGION
+    np_screen = np.array(sik.grab(region))
+    height, width = np_screen.shape[:2]
+
+    print(f"{'size':>6} {'ratio':>6} {'gray':>6} {'exist ms':>10} {'features ms':>12}")
+    for size in sizes:
+        x1, y1 = (width - size) // 2, (height - size) // 2
+        template = np.ascontiguousarray(np_screen[y1 : y1 + size, x1 : x1 + size, :3])
+
+        index = FeatureIndex()
+        try:
+            index.add(template, key=size)
+        except ValueError:
+            print(f"{size:>6} too few keypoints in the template")
+            continue
+
+        def locate():
+            return index.locate(size, region=np_screen, tuple_region=region)
+
+        features_ms, match = _benchmark(locate, repeat)
+        found = "" if match else " (not found)"
+
+        for ratio in (1, 2):
+            for grayscale in (True, False):
+                sik.config.COMPRESSION_RATIO = ratio
+
+                def exist():
+                    return sik.exist(
+                        template,
+                        region=np_screen,
+                        grayscale=grayscale,
+                        tuple_region=region,
+                    )
+
+                exist_ms, _ = _benchmark(exist, repeat)
+                print(
+                    f"{size:>6} {ratio:>6} {grayscale!s:>6} "
+                    f"{exist_ms:>10.1f} {features_ms:>12.1f}{found}"
+                )
+    sik.config.COMPRESSION_RATIO = compression_ratio
+
+
+def recordSession(path="session.npz", seconds=10, fps=5):
+    """
+    records the screen while you use your application, the session is replayed by benchMatchMemo()
+    """
+    import time
+
+    region = sik.config.MONITOR_REGION
+    frames = []
+    for _ in range(int(seconds * fps)):
+        frames.append(np.array(sik.grab(region)))
+        time.sleep(1 / fps)
+    np.savez_compressed(path, *frames)
+    return path
+
+
+def benchMatchMemo(session="session.npz", templates=None, size=64):
+    """
+    replays a recorded session through exist() with and without config.MATCH_MEMO,
+    by default templates are cut out from the first frame of the session
+    """
+    import time
+
+    frames = list(np.load(session).values())
+    height, width = frames[0].shape[:2]
+    region = (0, 0, width, height)
+    if templates is None:
+        templates = [
+            np.ascontiguousarray(frames[0][y : y + size, x : x + size, :3])
+            for x, y in (
+                (0, 0),
+                (width - size, 0),
+                ((width - size) // 2, (height - size) // 2),
+                (0, height - size),
+                (width - size, height - size),
+            )
+        ]
+
+    def replay():
+        for np_frame in frames:
+            frame = sik.Frame(np_frame, region)
+            for template in templates:
+                sik.exist(template, region=frame)
+
+    match_memo = sik.config.MATCH_MEMO
+    print(f"{len(frames)} frames, {len(templates)} templates")
+    for memo in (False, True):
+        sik.config.MATCH_MEMO = memo
+        sik.match_memo.clear()
+        sik.match_memo.resetStats()
+
+        start = time.perf_counter()
+        replay()
+        frame_ms = (time.perf_counter() - start) / len(frames) * 1000
+
+        searches = sik.match_memo.hits + sik.match_memo.misses
+        hit_rate = sik.match_memo.hits / searches if searches else 0
+        print(f"memo={memo!s:>5} {frame_ms:>8.1f} ms/frame hit rate {hit_rate:.0%}")
+    sik.config.MATCH_MEMO = match_memo
+
+
+def benchInputBackend(text=None, moves=500):
+    """
+    compares write() and mouseMove() through pynput and XTest, run it under Xvfb:
+    xvfb-run python -c "import dev_utils; dev_utils.benchInputBackend()"
+    the typed text goes to the focused window, if there is any
+    """
+    import time
+
+    text = text if text is not None else "The quick brown fox, 0123456789! " * 30
+    width, height = sik.config.MONITOR_RESOLUTION
+    points = [(i % width, (i * 7) % height) for i in range(moves)]
+
+    input_backend = sik.config.INPUT_BACKEND
+    print(f"{'backend':>8} {'chars/s':>10} {'moves/s':>10}")
+    for backend in ("pynput", "xtest"):
+        sik.config.INPUT_BACKEND = backend
+
+        start = time.perf_counter()
+        sik.write(text, time_step=0)
+        chars_per_second = len(text) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for point in points:
+            sik.mouseMove(point)
+        moves_per_second = moves / (time.perf_counter() - start)
+
+        print(f"{backend:>8} {chars_per_second:>10.0f} {moves_per_second:>10.0f}")
+    sik.config.INPUT_BACKEND = input_backend
+
+
+def benchClipboard(sizes=(10, 10_000, 1_000_000), repeat=20):
+    """
+    compares the copy/paste round trip through xsel and the in-process X clipboard,
+    run it under X or Xvfb with xsel installed:
+    xvfb-run python -c "import dev_utils; dev_utils.benchClipboard()"
+    """
+    clipboard_backend = sik.config.CLIPBOARD_BACKEND
+    print(f"{'backend':>8} {'chars':>9} {'ms':>9}")
+    for size in sizes:
+        text = ("pysikuli ✓ " * (size // 11 + 1))[:size]
+
+        for backend in ("xsel", "xlib"):
+            sik.config.CLIPBOARD_BACKEND = backend
+
+            def roundTrip():
+                sik.copyToClip(text)
+                assert sik.pasteFromClip() == text
+
+            elapsed, _ = _benchmark(roundTrip, repeat)
+            print(f"{backend:>8} {size:>9} {elapsed:>9.3f}")
+    sik.config.CLIPBOARD_BACKEND = clipboard_backend
+
+
+def benchHotkeyDispatch(presses=1000):
+    """
+    measures the time from the PyHotKey handler to the onHotkey() callback,
+    the key events are simulated by calling the handler as the listener does
+    """
+    sik.timing_stats.reset()
+    hotkey = sik.onHotkey(sik.Key.f9, lambda: None)
+    for _ in range(presses):
+        sik.hotkey_dispatcher._onHotkey(hotkey.combination)
+    sik.hotkey_dispatcher.wait()
+    hotkey.stop()
+    print(sik.timing_stats.report())
@@ -49,20 +49,108 @@ from ._main import (
     dragDrop,
 )
 
+# import scrolling by a distance or until a target appears
+from ._scroll import scrollBy, scrollUntil, scrollSchedule
+
+# import precomputed mouse paths, used by mouseSmoothMove() and dragDrop()
+from ._trajectory import Trajectory, trajectory, EASINGS
+
 
 # import Screenshot-related functions
 from ._main import (
     grab,
+    grabFrame,
+    Frame,
     find,
     findAny,
     getPixel,
     wait,
+    waitAny,
+    waitAll,
+    Vanish,
+    waitUntilStable,
+    waitForChange,
     exist,
     imageExistFromFolder,
     existCount,
     waitWhileExist,
 )
 
+# import XTest input backend, used on Linux when config.INPUT_BACKEND is "xtest"
+if config.UNIX:
+    from ._xtest import XTestBackend
+
+# import in-process clipboard, used on Linux when config.CLIPBOARD_BACKEND is "xlib"
+if config.UNIX:
+    from ._xclipboard import XClipboard
+
+# import background fail-safe watcher, used when config.FAILSAFE_WATCHER is True
+from ._failsafe import FailSafeWatcher, failsafe_watcher
+
+# import recording and replaying of input macros
+from ._macro import MacroLog, MacroRecorder, recordMacro, replayMacro
+
+# import ordered queue of input actions on a dedicated thread
+from ._queue import InputQueue, input_queue
+
+# import global hotkey callbacks
+from ._hotkeys import Hotkey, HotkeyDispatcher, hotkey_dispatcher, onHotkey
+
+# import precise waits and jitter statistics of the paced input loops
+from ._timing import Pacer, JitterStats, timing_stats, preciseSleep, sleepUntil
+
+# import deadlines and cancellation of nested calls
+from ._deadline import Deadline, currentDeadline
+from ._exceptions import PysikuliException, FailSafeException, CancelledException
+
+# import search result cache, used by exist() and find() when config.RESULT_CACHE is True
+from ._cache import ResultCache, result_cache
+
+# import match memo, used by exist() when config.MATCH_MEMO is True
+from ._memo import MatchMemo, match_memo
+
+# import incremental matcher, used by the search loops when config.INCREMENTAL_MATCH is True
+from ._incremental import IncrementalMatcher
+
+# import frame streams and pipelines for custom monitoring
+from ._stream import frames, FrameStream, Pipeline, Stage
+
+# import polling statistics of the search loops
+from ._polling import lastPollStats
+
+# import awaitable versions of the search, wait, click and move functions
+from ._async import (
+    existAsync,
+    findAsync,
+    waitAsync,
+    waitWhileExistAsync,
+    clickAsync,
+    rightClickAsync,
+    mouseSmoothMoveAsync,
+)
+
+# import feature-based search for large templates
+from ._features import FeatureIndex, existByFeatures
+
+# import template library for recognizing one of many known templates
+from ._library import TemplateLibrary
+
+# import screen states for recognizing the current screen of the application
+from ._states import ScreenStates
+
+# import background observers of regions
+from ._observer import (
+    Observer,
+    ObserveEvent,
+    observers,
+    onAppear,
+    onVanish,
+    onChange,
+)
+
+# import search strategy planner, used by exist() when config.MATCH_PLANNER is True
+from ._planner import MatchPlanner, planner
+
 
 # import the window management functions
 from ._main import (
@@ -0,0 +1,225 @@
+# module with awaitable versions of the search, wait, click and move functions
+from contextlib import aclosing
+import contextvars
+import functools
+import asyncio
+import logging
+
+from ._config import config
+from ._polling import Poller
+from ._deadline import _checkDeadline
+from ._cache import result_cache
+from ._main import (
+    exist,
+    _pollExist,
+    _incrementalMatcher,
+    mouse,
+    _smoothMove,
+    _failSafeCheck,
+    _coordinateNormalization,
+)
+
+
+async def _runInExecutor(func, *args, **kwargs):
+    """
+    screen capture and cv2.matchTemplate are CPU-bound and release the GIL,
+    so they run in the default executor without blocking the event loop,
+    the context is copied to keep the task's Deadline
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        None, functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+async def existAsync(
+    image,
+    region=None,
+    grayscale: bool = None,
+    precision: float = None,
+    pixel_colors: tuple = None,
+    tuple_region: tuple | list = None,
+):
+    return await _runInExecutor(
+        exist,
+        image=image,
+        region=region,
+        grayscale=grayscale,
+        precision=precision,
+        pixel_colors=pixel_colors,
+        tuple_region=tuple_region,
+    )
+
+
+async def findAsync(
+    image,
+    region=None,
+    max_search_time: float = None,
+    time_step: float = None,
+    grayscale: bool = None,
+    precision: float = None,
+    pixel_colors: tuple = None,
+):
+    max_search_time = (
+        max_search_time if max_search_time is not None else config.MAX_SEARCH_TIME
+    )
+
+    matcher = _incrementalMatcher(image, grayscale, precision, pixel_colors)
+    async with aclosing(aiter(Poller(max_search_time, time_step))) as polls:
+        async for poll in polls:
+            _match = await _runInExecutor(
+                _pollExist,
+                matcher,
+                poll,
+                image,
+                region,
+                grayscale,
+                precision,
+                pixel_colors,
+            )
+            if _match != None:
+                return _match
+    return None
+
+
+async def waitAsync(
+    image: str,
+    region=None,
+    max_search_time: float = None,
+    time_step: float = None,
+    grayscale: bool = None,
+    precision: float = None,
+    pixel_colors=None,
+):
+    if await findAsync(
+        image=image,
+        region=region,
+        max_search_time=max_search_time,
+        time_step=time_step,
+        grayscale=grayscale,
+        precision=precision,
+        pixel_colors=pixel_colors,
+    ):
+        return True
+    else:
+        error_text = f"waitAsync(): couldn't find the picture: {image}"
+        logging.fatal(error_text)
+        raise TimeoutError(error_text)
+
+
+async def waitWhileExistAsync(
+    image,
+    region=None,
+    max_search_time: float = None,
+    time_step: float = None,
+    grayscale: bool = None,
+    precision: float = None,
+    pixel_colors: tuple = None,
+):
+    max_search_time = (
+        max_search_time if max_search_time is not None else config.MAX_SEARCH_TIME
+    )
+
+    matcher = _incrementalMatcher(image, grayscale, precision, pixel_colors)
+    async with aclosing(aiter(Poller(max_search_time, time_step))) as polls:
+        async for poll in polls:
+            _match = await _runInExecutor(
+                _pollExist,
+                matcher,
+                poll,
+                image,
+                region,
+                grayscale,
+                precision,
+                pixel_colors,
+            )
+            if _match == None:
+                return True
+    return None
+
+
+async def mouseSmoothMoveAsync(
+    destination_loc, speed: float = None, easing: str = None
+):
+    _failSafeCheck()
+    _checkDeadline()
+    for delay in _smoothMove(destination_loc, speed, easing):
+        await asyncio.sleep(delay)
+        _checkDeadline()
+
+
+async def clickAsync(
+    loc_or_pic=None,
+    # search variables
+    region=None,
+    max_search_time: float = None,
+    time_step: float = None,
+    grayscale: bool = None,
+    precision: float = None,
+    # click variables
+    button=None,
+    clicks=1,
+    interval=0.0,
+):
+    """
+    Awaitable version of click(), the image search doesn't block the event loop
+    """
+    button = button if button is not None else config.MOUSE_PRIMARY_BUTTON
+
+    if config.OSX and interval < 0.02:
+        interval = 0.02
+
+    if loc_or_pic:
+        if isinstance(loc_or_pic, str):
+            _match = await findAsync(
+                image=loc_or_pic,
+                region=region,
+                max_search_time=max_search_time,
+                time_step=time_step,
+                grayscale=grayscale,
+                precision=precision,
+            )
+            if _match is None:
+                error_text = f"Couldn't find the picture: {loc_or_pic}"
+                logging.fatal(error_text)
+                raise TimeoutError(error_text)
+            x, y = _match.center_loc
+        else:
+            x, y = _coordinateNormalization(loc_or_pic)
+
+        logging.debug(
+            f"clickAsync: {x, y}, clicks: {clicks} interval: {interval} button: {button}"
+        )
+
+        await mouseSmoothMoveAsync(destination_loc=(x, y))
+        await asyncio.sleep(interval)
+
+    for _ in range(clicks):
+        _failSafeCheck()
+        mouse.click(button, 1)
+        result_cache.clear()
+        await asyncio.sleep(interval)
+
+
+async def rightClickAsync(
+    loc_or_pic,
+    region=None,
+    max_search_time: float = None,
+    time_step: float = None,
+    grayscale: bool = None,
+    precision: float = None,
+    clicks=1,
+    interval=0.0,
+):
+    await clickAsync(
+        loc_or_pic=loc_or_pic,
+        region=region,
+        max_search_time=max_search_time,
+        time_step=time_step,
+        grayscale=grayscale,
+        precision=precision,
+        button=config.MOUSE_SECONDARY_BUTTON,
+        clicks=clicks,
+        interval=interval,
+    )
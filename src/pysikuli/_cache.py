@@ -0,0 +1,111 @@
+# module for caching search results between input actions
+from collections import OrderedDict
+import numpy as np
+import threading
+import time
+
+from ._config import config
+from ._memo import _contentKey
+
+# the oldest entries are dropped above this size
+_MAX_ENTRIES = 256
+
+
+class ResultCache(object):
+    """
+    Short-lived cache of exist() and find() results for the live screen.
+
+    While the script sends no input, the same template in the same region
+    usually gives the same answer, so a repeated search returns the cached Match
+    without a screenshot. Entries expire after config.RESULT_CACHE_TTL seconds
+    and are dropped by every pysikuli input action or by clear().
+    Searches of a Frame, ScreenShot or np.ndarray region are never cached.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        return (
+            f"ResultCache(entries={len(self._entries)}, hits={self.hits}, "
+            f"misses={self.misses}, invalidations={self.invalidations})"
+        )
+
+    __repr__ = __str__
+
+    @staticmethod
+    def key(image, tuple_region, grayscale, precision, pixel_colors):
+        """
+        Returns the cache key of the search or None if the search can't be cached
+        """
+        if not config.RESULT_CACHE:
+            return None
+        if isinstance(image, str):
+            image_key = image
+        elif isinstance(image, np.ndarray):
+            # by the pixels, the array can be changed in place between the searches
+            image_key = _contentKey(image)
+        else:
+            return None
+
+        grayscale = grayscale if grayscale is not None else config.GRAYSCALE
+        precision = precision if precision is not None else config.MIN_PRECISION
+        return (
+            image_key,
+            tuple(tuple_region),
+            grayscale,
+            precision,
+            pixel_colors,
+            config.COMPRESSION_RATIO,
+        )
+
+    def get(self, key):
+        """
+        Returns tuple(hit, Match), Match can be None for a cached failed search
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > config.RESULT_CACHE_TTL:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, entry[1]
+
+    @property
+    def generation(self):
+        return self.invalidations
+
+    def put(self, key, _match, generation=None):
+        """
+        Stores the result, unless an input action has happened since `generation`
+        """
+        with self._lock:
+            if generation is not None and generation != self.invalidations:
+                return
+            self._entries[key] = (time.monotonic(), _match)
+            self._entries.move_to_end(key)
+            while len(self._entries) > _MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def resetStats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+result_cache = ResultCache()
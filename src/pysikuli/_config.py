@@ -68,6 +68,14 @@ class Config:
     FAILSAFE = True
     FAILSAFE_REGIONS = [(0, 0, 0, 0)]
 
+    # If True, the fail-safe is detected by mouse and keyboard listeners in the background,
+    # so each action only checks a flag and find() loops stop within one poll.
+    # The mouse trigger is cleared when the mouse leaves the fail-safe region
+    # and the hotkey trigger raises once
+    FAILSAFE_WATCHER = True
+    # If True, the triggered fail-safe stays until pysikuli.failsafe_watcher.reset()
+    FAILSAFE_LATCH = False
+
     @property
     def FAILSAFE_HOTKEY(self):
         if self._FAILSAFE_HOTKEY is None:
@@ -90,11 +98,41 @@ class Config:
     # This parameter increases speed by about 30%, but degrades unambiguous image recognition
     GRAYSCALE = True
 
+    # If True, exist() chooses the cheapest search strategy (full, downscaled, tiled or
+    # around the previous match) by its estimated cost, see pysikuli.planner.report()
+    MATCH_PLANNER = False
+
+    # If True, exist() and find() reuse the result of the same search on the live screen
+    # until any pysikuli input action or RESULT_CACHE_TTL seconds, see pysikuli.result_cache
+    RESULT_CACHE = False
+    RESULT_CACHE_TTL = 0.5
+
+    # If True, exist() remembers the best match of the last MATCH_MEMO_SIZE searches by
+    # the region pixels and skips the search when the same pixels show up again
+    MATCH_MEMO = False
+    MATCH_MEMO_SIZE = 128
+
+    # If True, find(), wait() and waitWhileExist() recompute only the changed parts
+    # of the region between polls, see pysikuli.IncrementalMatcher
+    INCREMENTAL_MATCH = False
+
     # Main score for detection match
     MIN_PRECISION = 0.8
     # After this time a image search will return a None result
     MAX_SEARCH_TIME = 2.0
 
+    # Constants for feature-based (keypoint) image search
+
+    # Maximum number of ORB keypoints extracted from a template or a region
+    FEATURE_COUNT = 1000
+    # Minimum number of descriptor matches required to estimate a location
+    FEATURE_MIN_MATCHES = 10
+    # Lowe's ratio test, the lower, the fewer but more reliable matches are used
+    FEATURE_MATCH_RATIO = 0.75
+
+    # Minimal correlation of the current frame with a recorded screen state
+    STATE_MIN_CONFIDENCE = 0.9
+
     REFRESH_RATE = None
     if not REFRESH_RATE:
         REFRESH_RATE = int(pmc.getPrimary().frequency)
@@ -103,6 +141,59 @@ class Config:
     # Each TIME_STEP in seconds tap and write takes after each key press
     TIME_STEP = 0
 
+    # The waits of tap(), write(), hotkey(), scroll(), click() and mouseSmoothMove()
+    # sleep until TIMING_SPIN seconds before the planned time and busy-wait the rest,
+    # because time.sleep() may oversleep by the OS timer slack.
+    # 0 saves the CPU, but the waits become less accurate, see pysikuli.timing_stats
+    TIMING_SPIN = 0.002
+    # If True, the lateness of each wait is collected into pysikuli.timing_stats
+    TIMING_STATS = True
+
+    # How find(), wait() and waitWhileExist() pace their screenshots:
+    # "fixed" - sleep TIME_STEP after each screenshot, with TIME_STEP = 0 it takes a whole CPU core
+    # "refresh" - take one screenshot per screen refresh, there is nothing new between refreshes
+    # "backoff" - start with one refresh interval and double it up to POLL_MAX_INTERVAL
+    # "deadline" - the same as "backoff", but the last screenshot is taken exactly at the deadline
+    POLLING_POLICY = "refresh"
+    POLL_MAX_INTERVAL = 0.1
+
+    # Minimal changed part of the region for onChange(), waitForChange() and waitUntilStable()
+    MIN_CHANGED = 0.01
+
+    # Constants for onAppear(), onVanish() and onChange() observers
+
+    # Default interval in seconds between checks of an observer
+    OBSERVE_INTERVAL = 0.2
+    # Part of one CPU core the observer thread may use, including the callbacks
+    OBSERVE_CPU_BUDGET = 0.25
+
+    # Backend of the keyboard and mouse actions on Linux:
+    # "pynput" - events are sent by pynput and PyHotKey, each one is synced with the X server
+    # "xtest" - events are sent by XTest directly, write() sends the whole text in one flush
+    # and types the characters which aren't on the keyboard layout, see pysikuli.XTestBackend
+    INPUT_BACKEND = "pynput"
+
+    # How write() enters the text:
+    # "type" - character by character, TIME_STEP after each one
+    # "paste" - through the clipboard, the previous text in the clipboard is restored
+    # "auto" - paste the texts from WRITE_PASTE_THRESHOLD characters and the texts
+    # with characters out of the keyboard layout, type the rest.
+    # Ctrl+V doesn't paste in terminals, so pasting is opt-in
+    WRITE_MODE = "type"
+    WRITE_PASTE_THRESHOLD = 200
+    # If True, the clipboard is restored only after the application has read the text
+    # from the in-process clipboard (see CLIPBOARD_BACKEND), or else after the text
+    # has appeared in the active window, in WRITE_PASTE_TIMEOUT seconds
+    # or TimeoutError is raised. Without the active window the text is typed
+    WRITE_PASTE_VERIFY = True
+    WRITE_PASTE_TIMEOUT = 1
+
+    # Clipboard of copyToClip(), pasteFromClip() and paste() on Linux:
+    # "xlib" - the clipboard is owned by a background thread of this process,
+    # the text is handed over to xsel at exit, see pysikuli.XClipboard
+    # "xsel" - each copy and paste spawns an xsel process, the clipboard is owned by xsel
+    CLIPBOARD_BACKEND = "xsel"
+
     # Constants for window control function
     WINDOW_WAITING_CONFIRMATION = True
 
@@ -173,6 +264,30 @@ class Config:
     MOUSE_PRIMARY_BUTTON = Button.left
     MOUSE_SECONDARY_BUTTON = Button.right
     MOUSE_MOVE_SPEED = 1
+    # Speed profile of mouseSmoothMove(): "linear", "ease-in-out" or "bezier",
+    # the "bezier" profile is a timing curve like CSS cubic-bezier(x1, y1, x2, y2)
+    MOUSE_MOVE_EASING = "linear"
+    MOUSE_MOVE_BEZIER = (0.25, 0.1, 0.25, 1.0)
+
+    # Constants for scrollBy() and scrollUntil()
+
+    # Speed of scrollBy() in clicks per second
+    SCROLL_SPEED = 30
+    # Acceleration profile of scrollBy(): "linear", "ease-in-out" or "bezier"
+    SCROLL_PROFILE = "ease-in-out"
+    # scrollUntil() gives up after this number of clicks
+    SCROLL_MAX_CLICKS = 100
+    # The largest burst of clicks of scrollUntil() between the screen checks
+    SCROLL_MAX_BURST = 8
+    # The longest wait of scrollUntil() for the screen to settle after a burst
+    SCROLL_SETTLE_TIME = 0.25
+
+    # Constants for recording and replaying macros
+
+    # Replay speed of replayMacro(), 2 replays twice as fast as recorded
+    MACRO_SPEED = 1.0
+    # The recorder merges the mouse moves closer in time than this
+    MACRO_MOVE_INTERVAL = 0.01
 
     # Constants for tools module
     SOUND_ON = True
@@ -0,0 +1,157 @@
+# module for bounding the total time of nested calls and cancelling them from another thread
+import contextvars
+import threading
+import time
+
+from ._exceptions import CancelledException
+
+_current = contextvars.ContextVar("pysikuli_deadline", default=None)
+
+
+class Deadline(object):
+    """
+    Bounds the total time of all searches, waits, mouse movements and scrolls
+    inside the `with` block and allows to cancel them from another thread, e.g.:
+
+    budget = Deadline(5)
+    with budget:
+        click("pics/menu.png")
+        click("pics/item.png")
+
+    # in another thread
+    budget.cancel()
+
+    Each search gets at most the remaining time and returns as if its max_search_time
+    has ended, mouse movements and scrolls raise TimeoutError after the deadline.
+    Cancelled calls raise CancelledException within one poll interval.
+    Nested deadlines never outlive the outer ones and are cancelled together with them.
+    """
+
+    def __init__(self, seconds: float = None):
+        self.seconds = seconds
+        self.expires = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._parent = None
+        self._children = []
+        self._token = None
+
+    def __str__(self):
+        return (
+            f"<Deadline seconds={self.seconds}, remaining={self.remaining()}, "
+            f"cancelled={self.cancelled}>"
+        )
+
+    def __enter__(self):
+        if self._token is not None:
+            raise RuntimeError("The deadline is already in use")
+
+        expires = time.monotonic() + self.seconds if self.seconds is not None else None
+        self._parent = _current.get()
+        if self._parent is not None:
+            parent_expires = self._parent.expires
+            if parent_expires is not None and (
+                expires is None or parent_expires < expires
+            ):
+                expires = parent_expires
+            self._parent._addChild(self)
+
+        self.expires = expires
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _current.reset(self._token)
+        self._token = None
+        if self._parent is not None:
+            self._parent._removeChild(self)
+            self._parent = None
+        return False
+
+    def _addChild(self, child):
+        with self._lock:
+            self._children.append(child)
+            cancelled = self.cancelled
+        if cancelled:
+            child.cancel()
+
+    def _removeChild(self, child):
+        with self._lock:
+            self._children.remove(child)
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    @property
+    def expired(self):
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def cancel(self):
+        """
+        Cancels the calls inside this and nested deadlines, safe to call from any thread
+        """
+        with self._lock:
+            self._event.set()
+            children = list(self._children)
+        for child in children:
+            child.cancel()
+
+    def remaining(self):
+        """
+        Returns the remaining seconds or None for a deadline without time limit
+        """
+        if self.expires is None:
+            return None
+        return max(self.expires - time.monotonic(), 0.0)
+
+    def check(self):
+        if self.cancelled:
+            raise CancelledException("pysikuli call has been cancelled")
+        if self.expired:
+            raise TimeoutError(f"pysikuli deadline of {self.seconds} seconds is over")
+
+    def sleep(self, seconds: float):
+        """
+        Sleeps like time.sleep(), but wakes up at once when the deadline is cancelled
+        """
+        if seconds > 0:
+            self._event.wait(seconds)
+
+
+def currentDeadline():
+    """
+    Returns the innermost active Deadline or None
+    """
+    return _current.get()
+
+
+def _limitTime(seconds: float) -> float:
+    deadline = _current.get()
+    if deadline is None:
+        return seconds
+    remaining = deadline.remaining()
+    if remaining is None:
+        return seconds
+    return min(seconds, remaining)
+
+
+def _checkCancelled():
+    deadline = _current.get()
+    if deadline is not None and deadline.cancelled:
+        raise CancelledException("pysikuli call has been cancelled")
+
+
+def _checkDeadline():
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check()
+
+
+def _sleep(seconds: float):
+    deadline = _current.get()
+    if deadline is None:
+        if seconds > 0:
+            time.sleep(seconds)
+    else:
+        deadline.sleep(seconds)
@@ -0,0 +1,30 @@
+# module with the exceptions raised by pysikuli
+
+
+class PysikuliException(Exception):
+    """
+    pysikuli code will raise this exception class for any invalid actions. If pysikuli raises some other exception,
+    you should assume that this is caused by a bug in pysikuli itself. (Including a failure to catch potential
+    exceptions raised by pysikuli.)
+    """
+
+    pass
+
+
+class FailSafeException(PysikuliException):
+    """
+    This exception is raised by pysikuli functions when the user puts the mouse cursor into one of the "failsafe
+    points" (by default, one of the four corners of the primary monitor). This exception shouldn't be caught; it's
+    meant to provide a way to terminate a misbehaving script.
+    """
+
+    pass
+
+
+class CancelledException(PysikuliException):
+    """
+    This exception is raised by searches, waits and mouse movements when their Deadline is cancelled,
+    e.g. from another thread.
+    """
+
+    pass
@@ -0,0 +1,184 @@
+# module for detecting the fail-safe triggers by input events instead of polling
+from pynput.mouse import Listener as MouseListener
+from PyHotKey import keyboard_manager as keyboard
+import collections
+import threading
+import logging
+
+from ._config import config
+from ._exceptions import FailSafeException
+
+_MOUSE_REASON = (
+    "pysikuli fail-safe triggered when moving the mouse within the fail-safe region."
+)
+_HOTKEY_REASON = "pysikuli fail-safe triggered when pressing the fail-safe hotkey."
+# the number of the own mouse moves remembered until the listener reports them
+_OWN_MOVES = 64
+
+
+def _inFailSafeRegion(x, y):
+    for region in config.FAILSAFE_REGIONS:
+        if region[0] <= x <= region[2] and region[1] <= y <= region[3]:
+            return True
+    return False
+
+
+def _failSafeError(reason):
+    return FailSafeException(
+        f"{reason}\nTo disable the fail-safe, "
+        "set pysikuli.FAILSAFE to False. DISABLING FAIL-SAFE IS "
+        "NOT RECOMMENDED."
+    )
+
+
+class FailSafeWatcher(object):
+    """
+    Watches the mouse moves and the fail-safe hotkey in the listener threads
+    and remembers the trigger, so each action checks one attribute instead
+    of asking the X server for the mouse position and scanning the pressed keys.
+
+    The mouse trigger is cleared when the mouse leaves the fail-safe region
+    and the hotkey trigger raises once, unless config.FAILSAFE_LATCH is True:
+    then the trigger stays until reset(). The moves made by pysikuli itself
+    don't trigger the fail-safe. The listener only reports the moves, so the first
+    action after start() checks the current position by checkPosition().
+    """
+
+    def __init__(self):
+        self.reason = None
+        self._mouse_triggered = False
+        # the hotkey is polled by the actions if it couldn't be registered
+        self.hotkey_watched = False
+        self._lock = threading.Lock()
+        self._mouse_listener = None
+        self._hotkey_id = None
+        self._hotkey = None
+        self._hotkey_source = None
+        self._own_moves = collections.deque(maxlen=_OWN_MOVES)
+        # False until the position of the mouse before the first move is checked
+        self.position_checked = False
+        self._failed = False
+
+    @property
+    def running(self):
+        return self._mouse_listener is not None
+
+    def ownMove(self, x, y):
+        """
+        Marks the position the mouse is moved to by pysikuli,
+        the listener ignores the move to it
+        """
+        if self._mouse_listener is not None:
+            self._own_moves.append((x, y))
+
+    def _onMove(self, x, y):
+        own = (x, y) in self._own_moves
+        if own:
+            self._own_moves.remove((x, y))
+        if _inFailSafeRegion(x, y):
+            if not own:
+                self._mouse_triggered = True
+                if self.reason is None:
+                    self.reason = _MOUSE_REASON
+        elif self._mouse_triggered and not config.FAILSAFE_LATCH:
+            self._mouse_triggered = False
+            if self.reason == _MOUSE_REASON:
+                self.reason = None
+
+    def checkPosition(self, x, y):
+        """
+        Checks the mouse position, which the listener doesn't know before a move
+        """
+        self.position_checked = True
+        self._onMove(x, y)
+
+    def _onHotkey(self):
+        if self.reason is None:
+            self.reason = _HOTKEY_REASON
+
+    def _unregisterHotkey(self):
+        if self._hotkey_id is not None and self._hotkey_id > 0:
+            try:
+                keyboard.unregister_hotkey_by_id(self._hotkey_id)
+            except IndexError:
+                # PyHotKey fails on an empty hotkey list, e.g. after unregister_all
+                pass
+        self._hotkey_id = None
+        self.hotkey_watched = False
+
+    def _registerHotkey(self):
+        self._unregisterHotkey()
+        self._hotkey_source = config.FAILSAFE_HOTKEY
+        self._hotkey = list(self._hotkey_source)
+        self._hotkey_id = keyboard.register_hotkey(self._hotkey, 2, self._onHotkey)
+        self.hotkey_watched = self._hotkey_id > 0
+        if not self.hotkey_watched:
+            problem = "is already registered" if self._hotkey_id == -1 else "is invalid"
+            logging.warning(
+                f"The fail-safe hotkey {self._hotkey} {problem}, "
+                "it is polled before each action instead"
+            )
+
+    def start(self):
+        """
+        Starts the listeners, returns False if they can't be started on this system
+        """
+        with self._lock:
+            if self.running:
+                return True
+            if self._failed:
+                return False
+            try:
+                self._registerHotkey()
+                self._mouse_listener = MouseListener(on_move=self._onMove)
+                self._mouse_listener.daemon = True
+                self._mouse_listener.start()
+            except Exception:
+                logging.warning(
+                    "fail-safe watcher couldn't start, falling back to polling",
+                    exc_info=True,
+                )
+                self._failed = True
+                self._mouse_listener = None
+                return False
+            return True
+
+    def stop(self):
+        with self._lock:
+            if self._mouse_listener is not None:
+                self._mouse_listener.stop()
+                self._mouse_listener = None
+            self._unregisterHotkey()
+            self._hotkey = None
+            self._hotkey_source = None
+            self._own_moves.clear()
+            self.position_checked = False
+            self._failed = False
+
+    def reset(self):
+        self._mouse_triggered = False
+        self.reason = None
+
+    def check(self):
+        """
+        Raises FailSafeException if the fail-safe has been triggered
+        """
+        reason = self.reason
+        if reason is not None:
+            if reason == _HOTKEY_REASON and not config.FAILSAFE_LATCH:
+                self.reason = _MOUSE_REASON if self._mouse_triggered else None
+            raise _failSafeError(reason)
+        if self._hotkey_source is not config.FAILSAFE_HOTKEY and self.running:
+            with self._lock:
+                self._registerHotkey()
+
+
+failsafe_watcher = FailSafeWatcher()
+
+
+def _checkTriggered():
+    """
+    Cheap check for the search loops, doesn't start the watcher
+    """
+    if config.FAILSAFE and failsafe_watcher.reason is not None:
+        failsafe_watcher.check()
@@ -0,0 +1,228 @@
+# module for feature-based (keypoint) image search of large templates
+from collections.abc import Hashable
+import numpy as np
+import logging
+import cv2
+
+from ._config import config
+from ._main import (
+    Match,
+    _regionToNumpyArray,
+    _imageToNumpyArray,
+    _getCenterLoc,
+    _toGray,
+)
+
+# the region may contain much more details than the template,
+# so the region detector keeps more keypoints, but not unlimited
+_MAX_REGION_FEATURES_MULTIPLIER = 10
+
+
+class _TemplateFeatures(object):
+    __slots__ = ("np_image", "gray", "keypoints", "descriptors", "width", "height")
+
+    def __init__(self, np_image: np.ndarray, detector):
+        self.np_image = np_image
+        self.gray = _toGray(np_image)
+        self.height, self.width = self.gray.shape[:2]
+        keypoints, self.descriptors = detector.detectAndCompute(self.gray, None)
+        self.keypoints = np.float32([kp.pt for kp in keypoints]).reshape(-1, 2)
+
+
+class FeatureIndex(object):
+    """
+    Stores ORB keypoints and descriptors of templates, so they are extracted only once.
+
+    Feature search is intended for large templates (dialogs, panels, whole windows),
+    the cost of `cv2.matchTemplate` grows with template area times region area,
+    while descriptor matching depends only on the number of keypoints.
+    """
+
+    def __init__(self, feature_count: int = None):
+        self.feature_count = (
+            feature_count if feature_count is not None else config.FEATURE_COUNT
+        )
+        self._detector = cv2.ORB_create(nfeatures=self.feature_count)
+        self._matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+        self._templates = {}
+
+    def __len__(self):
+        return len(self._templates)
+
+    def __contains__(self, key):
+        return key in self._templates
+
+    def add(self, image, key=None):
+        """
+        Extracts and stores template features.
+
+        Args:
+            image (str | np.ndarray | ScreenShot): template to index
+            key (optional): name of the template, required for non path images.
+
+        Returns:
+            key under which the template is stored
+        """
+        if key is None:
+            if not isinstance(image, str):
+                raise TypeError("key is required for non path images")
+            key = image
+
+        features = _TemplateFeatures(_imageToNumpyArray(image), self._detector)
+        if features.descriptors is None:
+            raise ValueError(f"Couldn't extract any keypoints from the image: {key}")
+
+        self._templates[key] = features
+        return key
+
+    def remove(self, key):
+        self._templates.pop(key, None)
+
+    def clear(self):
+        self._templates.clear()
+
+    def _getTemplate(self, image):
+        # any key given to add() is looked up, np.ndarray isn't hashable
+        if isinstance(image, Hashable) and image in self._templates:
+            return self._templates[image]
+        elif isinstance(image, str):
+            self.add(image)
+            return self._templates[image]
+        # np.ndarray or ScreenShot are not indexed, because they can't be identified
+        return _TemplateFeatures(_imageToNumpyArray(image), self._detector)
+
+    def _regionFeatures(self, gray_region: np.ndarray, template: _TemplateFeatures):
+        area_multiplier = gray_region.size / max(template.gray.size, 1)
+        feature_count = int(
+            self.feature_count
+            * min(max(area_multiplier, 1), _MAX_REGION_FEATURES_MULTIPLIER)
+        )
+        detector = cv2.ORB_create(nfeatures=feature_count)
+        keypoints, descriptors = detector.detectAndCompute(gray_region, None)
+        keypoints = np.float32([kp.pt for kp in keypoints]).reshape(-1, 2)
+        return keypoints, descriptors
+
+    def _estimateTransform(self, template: _TemplateFeatures, keypoints, descriptors):
+        pairs = self._matcher.knnMatch(template.descriptors, descriptors, k=2)
+
+        good = [
+            pair[0]
+            for pair in pairs
+            if len(pair) == 2
+            and pair[0].distance < config.FEATURE_MATCH_RATIO * pair[1].distance
+        ]
+        if len(good) < config.FEATURE_MIN_MATCHES:
+            logging.debug(f"feature search: only {len(good)} good matches")
+            return None
+
+        src = template.keypoints[[m.queryIdx for m in good]]
+        dst = keypoints[[m.trainIdx for m in good]]
+
+        # GUI elements are shifted and occasionally scaled, but never sheared,
+        # so a similarity transform is more robust than a full homography
+        transform, inliers = cv2.estimateAffinePartial2D(
+            src, dst, method=cv2.RANSAC, ransacReprojThreshold=3.0
+        )
+        if transform is None or int(inliers.sum()) < config.FEATURE_MIN_MATCHES:
+            return None
+        return transform
+
+    def locate(
+        self,
+        image,
+        region=None,
+        precision: float = None,
+        tuple_region: tuple | list = None,
+    ):
+        """
+        Searchs for a large image within an area or on the screen by its keypoints.
+
+        The location is estimated from matched descriptors, then the score is
+        calculated with `TM_CCOEFF_NORMED` on the found window only, so the score
+        is comparable with the score of `exist()`.
+
+        Returns:
+            Match | None
+        """
+        precision = precision if precision is not None else config.MIN_PRECISION
+
+        template = self._getTemplate(image)
+        np_region, tuple_region = _regionToNumpyArray(region, tuple_region)
+        gray_region = _toGray(np_region)
+
+        reg_height, reg_width = gray_region.shape[:2]
+        if template.height > reg_height or template.width > reg_width:
+            raise ValueError(
+                f"The region ({np_region.shape}) is smaller than the image ({template.np_image.shape}) you are looking for"
+            )
+
+        keypoints, descriptors = self._regionFeatures(gray_region, template)
+        if descriptors is None or len(keypoints) < config.FEATURE_MIN_MATCHES:
+            return None
+
+        transform = self._estimateTransform(template, keypoints, descriptors)
+        if transform is None:
+            return None
+
+        # warp the found window back into template coordinates to score it
+        inverse = cv2.invertAffineTransform(transform)
+        window = cv2.warpAffine(gray_region, inverse, (template.width, template.height))
+        score = cv2.matchTemplate(window, template.gray, cv2.TM_CCOEFF_NORMED)
+        score = round(float(score[0][0]), 6)
+
+        image = image if isinstance(image, str) else type(image)
+        logging.debug(
+            f"feature search result: {score} precision: {precision} img: {image}"
+        )
+
+        if score < precision:
+            return None
+
+        w, h = template.width, template.height
+        corners = np.float32([[0, 0], [w, 0], [0, h], [w, h]])
+        corners = cv2.transform(corners.reshape(-1, 1, 2), transform).reshape(-1, 2)
+        left = int(np.clip(round(corners[:, 0].min()), 0, reg_width - 1))
+        top = int(np.clip(round(corners[:, 1].min()), 0, reg_height - 1))
+        width = min(round(corners[:, 0].max()) - left, reg_width - left)
+        height = min(round(corners[:, 1].max()) - top, reg_height - top)
+
+        loc_rel = (left, top)
+        loc_abs = (tuple_region[0] + left, tuple_region[1] + top)
+        loc_rel_center = _getCenterLoc(width, height, loc_rel)
+
+        return Match(
+            up_left_loc=loc_abs,
+            center_loc=_getCenterLoc(width, height, loc_abs),
+            relative_loc_center=loc_rel_center,
+            score=score,
+            precision=precision,
+            np_image=template.np_image,
+            np_region=np_region,
+            tuple_region=tuple_region,
+        )
+
+
+_feature_index = FeatureIndex()
+
+
+def existByFeatures(
+    image,
+    region=None,
+    precision: float = None,
+    tuple_region: tuple | list = None,
+):
+    """
+    Feature-based alternative to `exist()` for large templates (dialogs, panels, windows).
+
+    Template keypoints are extracted once and stored in the module index,
+    use `FeatureIndex` directly to manage your own set of templates.
+
+    Returns:
+        Match | None
+    """
+    return _feature_index.locate(
+        image=image,
+        region=region,
+        precision=precision,
+        tuple_region=tuple_region,
+    )
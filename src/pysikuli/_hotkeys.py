@@ -0,0 +1,230 @@
+# module for calling functions on global hotkeys from a dispatcher thread
+from PyHotKey import keyboard_manager as keyboard
+import threading
+import logging
+import queue
+
+from ._config import config
+from ._timing import now, timing_stats
+
+
+def _normalizeKey(key):
+    # the same as hotkey() does, PyHotKey compares the characters case-sensitively
+    return key.lower() if isinstance(key, str) else key
+
+
+class Hotkey(object):
+    """
+    One callback of a key combination, registered by onHotkey().
+    `presses` > 1 means a single key tapped that many times, e.g. double F9.
+    """
+
+    def __init__(self, keys, callback, args=(), presses: int = 1):
+        if not isinstance(keys, (list, tuple)):
+            keys = (keys,)
+        if not keys:
+            raise ValueError("The hotkey needs at least one key")
+        if presses < 1:
+            raise ValueError(f"presses must be positive, got {presses}")
+        if len(keys) > 1 and presses != 1:
+            raise ValueError("Only a single key hotkey can be pressed several times")
+
+        self.keys = tuple(_normalizeKey(key) for key in keys)
+        self.callback = callback
+        self.args = args
+        self.presses = presses
+
+        self.paused = False
+        self.stopped = False
+        self.fired = 0
+        self._dispatcher = None
+
+    def __str__(self):
+        return f"<Hotkey {self.keys}, presses={self.presses}, fired={self.fired}>"
+
+    __repr__ = __str__
+
+    @property
+    def combination(self):
+        """
+        The hotkeys with the same combination share one PyHotKey registration
+        """
+        return frozenset(self.keys), self.presses
+
+    @property
+    def active(self):
+        return not (self.paused or self.stopped)
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def stop(self):
+        self.stopped = True
+        if self._dispatcher is not None:
+            self._dispatcher.remove(self)
+
+
+class HotkeyDispatcher(object):
+    """
+    Registers the key combinations in the PyHotKey listener and calls their callbacks
+    one by one in a dispatcher thread. PyHotKey calls the handlers in its listener
+    thread, so the handler only timestamps the event and queues it: a slow callback
+    doesn't delay the key handling and the fail-safe hotkey.
+
+    The time from the key event to the start of the callbacks is recorded
+    into pysikuli.timing_stats["onHotkey"].
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # combination -> [PyHotKey id or None for a single press, list of Hotkey]
+        self._combinations = {}
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self.dispatched = 0
+
+    def __len__(self):
+        return len(self.hotkeys)
+
+    @property
+    def hotkeys(self):
+        with self._lock:
+            return [
+                hotkey
+                for _, hotkeys in self._combinations.values()
+                for hotkey in hotkeys
+            ]
+
+    def _register(self, hotkey: Hotkey):
+        keys = list(hotkey.keys)
+        combination = hotkey.combination
+        if len(keys) == 1 and hotkey.presses == 1:
+            # PyHotKey hotkeys of one key need at least two taps,
+            # a single press is handled on the release of the key
+            if not keyboard.set_magickey_on_release(
+                keys[0], self._onHotkey, combination
+            ):
+                raise ValueError(f"Invalid hotkey: {keys}")
+            return None
+        hotkey_id = keyboard.register_hotkey(
+            keys, hotkey.presses, self._onHotkey, combination
+        )
+        if hotkey_id == -1:
+            raise ValueError(f"The hotkey {keys} is already registered elsewhere")
+        if hotkey_id <= 0:
+            raise ValueError(f"Invalid hotkey: {keys}")
+        return hotkey_id
+
+    def _unregister(self, hotkey: Hotkey, registration):
+        if registration is None:
+            keyboard.remove_magickey_on_release(hotkey.keys[0])
+        else:
+            keyboard.unregister_hotkey_by_id(registration)
+
+    def add(self, hotkey: Hotkey):
+        with self._lock:
+            entry = self._combinations.get(hotkey.combination)
+            if entry is None:
+                entry = [self._register(hotkey), []]
+                self._combinations[hotkey.combination] = entry
+            entry[1].append(hotkey)
+            hotkey._dispatcher = self
+            hotkey.stopped = False
+            self._start()
+        return hotkey
+
+    def remove(self, hotkey: Hotkey):
+        with self._lock:
+            entry = self._combinations.get(hotkey.combination)
+            if entry is None or hotkey not in entry[1]:
+                return
+            entry[1].remove(hotkey)
+            hotkey.stopped = True
+            if not entry[1]:
+                del self._combinations[hotkey.combination]
+                self._unregister(hotkey, entry[0])
+
+    def clear(self):
+        for hotkey in self.hotkeys:
+            self.remove(hotkey)
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="pysikuli-hotkeys", daemon=True
+            )
+            self._thread.start()
+
+    def _onHotkey(self, combination):
+        # runs in the PyHotKey listener thread
+        with self._lock:
+            self._pending += 1
+        self._queue.put((combination, now()))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            combination, timestamp = item
+            try:
+                self._dispatch(combination, timestamp)
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    self.dispatched += 1
+                    if self._pending == 0:
+                        self._idle.notify_all()
+
+    def _dispatch(self, combination, timestamp: float):
+        with self._lock:
+            entry = self._combinations.get(combination)
+            hotkeys = list(entry[1]) if entry is not None else []
+        if config.TIMING_STATS:
+            timing_stats.record("onHotkey", now() - timestamp)
+        for hotkey in hotkeys:
+            if not hotkey.active:
+                continue
+            hotkey.fired += 1
+            try:
+                hotkey.callback(*hotkey.args)
+            except Exception:
+                logging.exception(f"hotkey callback failed: {hotkey}")
+
+    def wait(self, timeout: float = None):
+        """
+        Waits until the callbacks of all pressed hotkeys are done,
+        returns False on timeout
+        """
+        with self._lock:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Unregisters all hotkeys and stops the dispatcher thread
+        """
+        self.clear()
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        if wait:
+            thread.join()
+        self._thread = None
+
+
+hotkey_dispatcher = HotkeyDispatcher()
+
+
+def onHotkey(keys, callback, *args, presses: int = 1):
+    """
+    Calls callback(*args) in the dispatcher thread each time the keys are pressed
+    together, e.g. onHotkey(Key.f9, pause) or onHotkey([Key.ctrl, Key.alt, "s"], skip).
+    Returns the Hotkey, which can be paused, resumed or stopped.
+    """
+    return hotkey_dispatcher.add(Hotkey(keys, callback, args, presses))
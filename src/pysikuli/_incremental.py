@@ -0,0 +1,191 @@
+# module for re-matching only the changed parts of a region between polls
+import numpy as np
+import logging
+import cv2
+
+from ._config import config
+from ._main import (
+    Match,
+    _regionToFrame,
+    _imageToNumpyArray,
+    _imgDownsize,
+    _getCenterLoc,
+)
+
+# changed pixels are grouped into dirty rectangles by blocks of this size
+_BLOCK = 16
+
+# if the dirty rectangles cover more of the correlation map, it's recomputed at once
+_FULL_MATCH_PART = 0.5
+
+
+def _dirtyRects(np_region: np.ndarray, previous: np.ndarray):
+    """
+    Returns rectangles (x1, y1, x2, y2) which cover all changed pixels
+    """
+    diff = cv2.absdiff(np_region, previous)
+    if diff.ndim == 3:
+        diff = diff.max(axis=2)
+    if not diff.any():
+        return []
+
+    height, width = diff.shape
+    blocks_y, blocks_x = -(-height // _BLOCK), -(-width // _BLOCK)
+    padded = np.zeros((blocks_y * _BLOCK, blocks_x * _BLOCK), np.uint8)
+    padded[:height, :width] = diff
+    blocks = padded.reshape(blocks_y, _BLOCK, blocks_x, _BLOCK).max(axis=(1, 3))
+
+    _, _, stats, _ = cv2.connectedComponentsWithStats(
+        (blocks > 0).astype(np.uint8), connectivity=8
+    )
+    return [
+        (
+            x * _BLOCK,
+            y * _BLOCK,
+            min((x + w) * _BLOCK, width),
+            min((y + h) * _BLOCK, height),
+        )
+        for x, y, w, h, _ in stats[1:]
+    ]
+
+
+class IncrementalMatcher(object):
+    """
+    Searches one template in a region again and again, like find() does between polls.
+
+    The correlation map of the previous frame is kept, and only the cells whose
+    template window overlaps a changed rectangle are recomputed, so a blinking
+    cursor or a spinner in a large region costs a small cv2.matchTemplate.
+    The best match is tracked by the maximum of each map row,
+    only the rows of the recomputed cells are updated.
+    """
+
+    def __init__(self, image, grayscale: bool = None, precision: float = None):
+        self.image = image
+        self.grayscale = grayscale if grayscale is not None else config.GRAYSCALE
+        self.precision = precision if precision is not None else config.MIN_PRECISION
+        self.ratio = config.COMPRESSION_RATIO
+
+        np_image = _imageToNumpyArray(image)
+        self._img_height, self._img_width = np_image.shape[:2]
+        if self.grayscale:
+            self._image_capture = cv2.cvtColor(np_image, cv2.COLOR_BGR2GRAY)
+            self._template = self._image_capture
+            self._variant = "gray"
+        else:
+            self._image_capture = np_image
+            # the same conversion as in _matchTemplate()
+            self._template = cv2.cvtColor(np_image, cv2.COLOR_RGB2BGR)
+            self._variant = "bgr"
+        if self.ratio > 1:
+            self._template = _imgDownsize(self._template, self.ratio)
+
+        self.full_updates = 0
+        self.partial_updates = 0
+        self.unchanged_updates = 0
+        self.reset()
+
+    def reset(self):
+        self._np_region = None
+        self._tuple_region = None
+        self._map = None
+        self._row_max = None
+        self._row_arg = None
+
+    def _matchFull(self, np_region):
+        self._map = cv2.matchTemplate(np_region, self._template, cv2.TM_CCOEFF_NORMED)
+        self._row_max = self._map.max(axis=1)
+        self._row_arg = self._map.argmax(axis=1)
+        self.full_updates += 1
+
+    def _affectedCells(self, rect):
+        templ_height, templ_width = self._template.shape[:2]
+        map_height, map_width = self._map.shape
+        x1, y1, x2, y2 = rect
+        return (
+            max(x1 - templ_width + 1, 0),
+            max(y1 - templ_height + 1, 0),
+            min(x2, map_width),
+            min(y2, map_height),
+        )
+
+    def _matchCells(self, np_region, cells):
+        templ_height, templ_width = self._template.shape[:2]
+        x1, y1, x2, y2 = cells
+        window = np_region[y1 : y2 + templ_height - 1, x1 : x2 + templ_width - 1]
+        self._map[y1:y2, x1:x2] = cv2.matchTemplate(
+            window, self._template, cv2.TM_CCOEFF_NORMED
+        )
+        self._row_max[y1:y2] = self._map[y1:y2].max(axis=1)
+        self._row_arg[y1:y2] = self._map[y1:y2].argmax(axis=1)
+
+    def update(self, frame):
+        """
+        Matches the frame and returns tuple(score, location) of the best match
+        in the coordinates of the downscaled region
+        """
+        np_region = frame.variant(self._variant, self.ratio)
+        if np_region.shape[0] < self._template.shape[0] or (
+            np_region.shape[1] < self._template.shape[1]
+        ):
+            raise ValueError(
+                f"The region ({frame.np_region.shape}) is smaller than the image "
+                f"({self._image_capture.shape}) you are looking for"
+            )
+
+        if (
+            self._map is None
+            or frame.tuple_region != self._tuple_region
+            or np_region.shape != self._np_region.shape
+        ):
+            self._matchFull(np_region)
+        else:
+            cells = [
+                self._affectedCells(rect)
+                for rect in _dirtyRects(np_region, self._np_region)
+            ]
+            cells = [c for c in cells if c[0] < c[2] and c[1] < c[3]]
+            area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in cells)
+            if not cells:
+                self.unchanged_updates += 1
+            elif area > self._map.size * _FULL_MATCH_PART:
+                self._matchFull(np_region)
+            else:
+                for cell in cells:
+                    self._matchCells(np_region, cell)
+                self.partial_updates += 1
+                logging.debug(f"IncrementalMatcher: recomputed {len(cells)} rects")
+
+        self._np_region = np_region
+        self._tuple_region = frame.tuple_region
+
+        row = int(np.argmax(self._row_max))
+        return float(self._row_max[row]), (int(self._row_arg[row]), row)
+
+    def exist(self, region=None, tuple_region=None):
+        """
+        Same as exist() for the matcher's template, but recomputes only the changed parts
+        """
+        frame = _regionToFrame(region, tuple_region)
+        score, loc = self.update(frame)
+        score = round(score, 6)
+        if score < self.precision:
+            return None
+
+        tuple_region = frame.tuple_region
+        loc_rel = tuple(point * self.ratio for point in loc)
+        loc_abs = (tuple_region[0] + loc_rel[0], tuple_region[1] + loc_rel[1])
+        region_capture = frame.gray if self.grayscale else frame.np_region
+
+        return Match(
+            up_left_loc=loc_abs,
+            center_loc=_getCenterLoc(self._img_width, self._img_height, loc_abs),
+            relative_loc_center=_getCenterLoc(
+                self._img_width, self._img_height, loc_rel
+            ),
+            score=score,
+            precision=self.precision,
+            np_image=self._image_capture,
+            np_region=region_capture,
+            tuple_region=tuple_region,
+        )
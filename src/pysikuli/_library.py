@@ -0,0 +1,178 @@
+# module for recognizing which of many known templates is shown in a small region
+import numpy as np
+import logging
+import cv2
+import os
+
+from ._main import (
+    exist,
+    _regionToNumpyArray,
+    _regionToFrame,
+    _imageToNumpyArray,
+    _toGray,
+)
+
+# dHash compares neighbouring pixels of a (HASH_SIZE + 1) x HASH_SIZE thumbnail,
+# so the signature of any image is exactly 64 bits
+_HASH_SIZE = 8
+
+# the signature is split into 4 bands of 16 bits for the multi-index lookup,
+# by the pigeonhole principle any signature within 3 bits shares at least one band
+_BANDS = 4
+_BAND_BITS = 16
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], np.uint8)
+
+
+def _dHash(np_img: np.ndarray) -> int:
+    thumbnail = cv2.resize(
+        _toGray(np_img), (_HASH_SIZE + 1, _HASH_SIZE), interpolation=cv2.INTER_AREA
+    )
+    bits = (thumbnail[:, 1:] > thumbnail[:, :-1]).flatten()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def _hammingDistances(signatures: np.ndarray, signature: int) -> np.ndarray:
+    xor = np.bitwise_xor(signatures, np.uint64(signature))
+    return _POPCOUNT[xor.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+class TemplateLibrary(object):
+    """
+    Answers the question "which of the known templates is in this region".
+
+    Each template gets a 64 bit perceptual signature (dHash), so a region is compared
+    with the whole library by a signature lookup and only a few nearest templates
+    are confirmed with `exist()`. The region should tightly enclose the icon,
+    like a status cell or a toolbar slot.
+    """
+
+    def __init__(self):
+        self._names = []
+        self._images = []
+        self._signatures = np.empty(0, np.uint64)
+        self._bands = [{} for _ in range(_BANDS)]
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    @property
+    def names(self):
+        return list(self._names)
+
+    def add(self, image, name=None):
+        """
+        Adds a template to the library.
+
+        Args:
+            image (str | np.ndarray | ScreenShot): template
+            name (optional): template name, defaults to the image path
+
+        Returns:
+            name of the added template
+        """
+        if name is None:
+            if not isinstance(image, str):
+                raise TypeError("name is required for non path images")
+            name = image
+        if name in self._names:
+            raise ValueError(f"Template '{name}' is already in the library")
+
+        np_image = _imageToNumpyArray(image)
+        signature = _dHash(np_image)
+
+        index = len(self._names)
+        self._names.append(name)
+        self._images.append(np_image)
+        self._signatures = np.append(self._signatures, np.uint64(signature))
+        for band, table in enumerate(self._bands):
+            key = (signature >> (band * _BAND_BITS)) & _BAND_MASK
+            table.setdefault(key, []).append(index)
+        return name
+
+    def addFolder(self, path):
+        """
+        Adds all pictures from the folder, the file paths are used as names
+        """
+        valid_images = [".jpg", ".gif", ".png", ".jpeg"]
+        added = []
+        for file in sorted(os.listdir(path)):
+            full_path = os.path.join(path, file)
+            if os.path.isfile(full_path) and (
+                os.path.splitext(file)[1].lower() in valid_images
+            ):
+                added.append(self.add(full_path))
+        return added
+
+    def shortlist(self, region=None, top: int = 3, tuple_region=None):
+        """
+        Returns names of the `top` templates with the nearest signatures to the region
+        """
+        np_region, _ = _regionToNumpyArray(region, tuple_region)
+        return [self._names[i] for i in self._shortlist(np_region, top)]
+
+    def _shortlist(self, np_region: np.ndarray, top: int):
+        reg_height, reg_width = np_region.shape[:2]
+        signature = _dHash(np_region)
+
+        candidates = set()
+        for band, table in enumerate(self._bands):
+            key = (signature >> (band * _BAND_BITS)) & _BAND_MASK
+            candidates.update(table.get(key, ()))
+
+        # not enough near signatures, fall back to the vectorized full scan
+        if len(candidates) < top:
+            candidates = range(len(self._names))
+
+        candidates = np.fromiter(candidates, np.int64)
+        distances = _hammingDistances(self._signatures[candidates], signature)
+        order = candidates[np.argsort(distances, kind="stable")]
+
+        fitting = [
+            i
+            for i in order
+            if self._images[i].shape[0] <= reg_height
+            and self._images[i].shape[1] <= reg_width
+        ]
+        return fitting[:top]
+
+    def classify(
+        self,
+        region=None,
+        top: int = 3,
+        grayscale: bool = None,
+        precision: float = None,
+        tuple_region=None,
+    ):
+        """
+        Recognizes which known template is in the region.
+
+        Args:
+            region: region where the template is expected. Defaults to the whole screen.
+            top (int, optional): how many nearest templates are confirmed with correlation. Defaults to 3.
+
+        Returns:
+            tuple(name, Match) of the best confirmed template or None
+        """
+        # all candidates are confirmed on the same frame to share its preprocessing
+        frame = _regionToFrame(region, tuple_region)
+
+        best_name, best_match = None, None
+        for i in self._shortlist(frame.np_region, top):
+            match = exist(
+                image=self._images[i],
+                region=frame,
+                grayscale=grayscale,
+                precision=precision,
+            )
+            if match and (best_match is None or match.score > best_match.score):
+                best_name, best_match = self._names[i], match
+
+        logging.debug(f"classify(): {best_name} of {len(self._names)} templates")
+        if best_match is None:
+            return None
+        return best_name, best_match
@@ -0,0 +1,362 @@
+# module for recording mouse and keyboard input and replaying it faster than real time
+from pynput import mouse as pynput_mouse, keyboard as pynput_keyboard
+import numpy as np
+import threading
+import logging
+
+from ._config import config, Key
+from ._cache import result_cache
+from ._deadline import _checkDeadline
+from ._timing import now, sleepUntil
+from ._main import (
+    mouse,
+    find,
+    keyDown,
+    keyUp,
+    mousePress,
+    mouseRelease,
+    _failSafeCheck,
+    _setMousePosition,
+)
+
+# kinds of the logged events
+MOVE = 0
+MOUSE_DOWN = 1
+MOUSE_UP = 2
+SCROLL = 3
+KEY_DOWN = 4
+KEY_UP = 5
+SYNC = 6
+
+# one event takes 21 bytes: for moves x, y are the position, for scrolls dx, dy,
+# code is the index of the key or the button in MacroLog.inputs,
+# or of the template in MacroLog.sync_points
+_EVENT_DTYPE = np.dtype(
+    [("time", "f8"), ("kind", "u1"), ("x", "i4"), ("y", "i4"), ("code", "i4")]
+)
+_INITIAL_CAPACITY = 1024
+
+
+def _inputToText(value):
+    if isinstance(value, pynput_keyboard.Key):
+        return f"Key.{value.name}"
+    if isinstance(value, pynput_mouse.Button):
+        return f"Button.{value.name}"
+    char = getattr(value, "char", value)
+    if isinstance(char, str):
+        return char
+    return f"<{value.vk}>"
+
+
+def _textToInput(text: str):
+    if text.startswith("Key.") and len(text) > 4:
+        return pynput_keyboard.Key[text[4:]]
+    if text.startswith("Button.") and len(text) > 7:
+        return pynput_mouse.Button[text[7:]]
+    if text.startswith("<") and text.endswith(">") and len(text) > 2:
+        return pynput_keyboard.KeyCode.from_vk(int(text[1:-1]))
+    return pynput_keyboard.KeyCode.from_char(text)
+
+
+class MacroLog(object):
+    """
+    Timestamped input events in one growing NumPy array,
+    the keys and buttons are stored once in `inputs` and referenced by index.
+    `sync_points` are tuple(image, region, max_search_time) which replayMacro()
+    waits for before continuing.
+    """
+
+    def __init__(self):
+        self._events = np.empty(_INITIAL_CAPACITY, _EVENT_DTYPE)
+        self._count = 0
+        self._lock = threading.RLock()
+        self.inputs = []
+        self._input_codes = {}
+        self.sync_points = []
+
+    def __len__(self):
+        return self._count
+
+    def __str__(self):
+        return (
+            f"MacroLog(events={self._count}, duration={self.duration:.3f}, "
+            f"sync_points={len(self.sync_points)})"
+        )
+
+    __repr__ = __str__
+
+    @property
+    def events(self) -> np.ndarray:
+        return self._events[: self._count]
+
+    @property
+    def duration(self):
+        return float(self._events[self._count - 1]["time"]) if self._count else 0.0
+
+    def _inputCode(self, value):
+        code = self._input_codes.get(value)
+        if code is None:
+            code = self._input_codes[value] = len(self.inputs)
+            self.inputs.append(value)
+        return code
+
+    def _append(self, kind: int, time: float, x: int, y: int, code: int):
+        with self._lock:
+            if self._count == len(self._events):
+                self._events = np.resize(self._events, len(self._events) * 2)
+            self._events[self._count] = (time, kind, x, y, code)
+            self._count += 1
+
+    def append(self, kind: int, time: float, x=0, y=0, value=None):
+        """
+        Adds an event, `value` is the key or the button of the event
+        """
+        with self._lock:
+            code = self._inputCode(value) if value is not None else -1
+            self._append(kind, time, x, y, code)
+
+    def addSyncPoint(self, time: float, image, region=None, max_search_time=None):
+        with self._lock:
+            self.sync_points.append((image, region, max_search_time))
+            self._append(SYNC, time, 0, 0, len(self.sync_points) - 1)
+
+    def save(self, path):
+        """
+        Saves the log into a .npz file, the sync point images must be paths or arrays
+        """
+        arrays = {
+            "events": self.events,
+            "inputs": np.array([_inputToText(value) for value in self.inputs], str),
+        }
+        regions = []
+        for index, (image, region, max_search_time) in enumerate(self.sync_points):
+            if isinstance(image, str):
+                arrays[f"sync_path_{index}"] = np.array(image)
+            else:
+                arrays[f"sync_image_{index}"] = np.asarray(image)
+            regions.append(
+                (
+                    tuple(region) if region is not None else (-1, -1, -1, -1),
+                    max_search_time if max_search_time is not None else -1,
+                )
+            )
+        arrays["sync_regions"] = np.array(
+            [region for region, _ in regions], np.int64
+        ).reshape(-1, 4)
+        arrays["sync_times"] = np.array([time for _, time in regions], np.float64)
+        np.savez_compressed(path, **arrays)
+
+    @staticmethod
+    def load(path):
+        log = MacroLog()
+        with np.load(path) as data:
+            events = data["events"]
+            log._events = np.array(events, _EVENT_DTYPE)
+            log._count = len(events)
+            for text in data["inputs"].tolist():
+                log._inputCode(_textToInput(text))
+            for index, (region, max_search_time) in enumerate(
+                zip(data["sync_regions"].tolist(), data["sync_times"].tolist())
+            ):
+                if f"sync_path_{index}" in data:
+                    image = str(data[f"sync_path_{index}"])
+                else:
+                    image = data[f"sync_image_{index}"]
+                region = tuple(region) if region[0] >= 0 else None
+                max_search_time = max_search_time if max_search_time >= 0 else None
+                log.sync_points.append((image, region, max_search_time))
+        return log
+
+
+class MacroRecorder(object):
+    """
+    Records the mouse and keyboard events with pynput listeners, e.g.:
+
+    with MacroRecorder() as recorder:
+        input("Do the flow and press Enter here")
+    recorder.log.save("flow.npz")
+
+    The mouse moves closer in time than config.MACRO_MOVE_INTERVAL are merged,
+    the last move before any other event is always kept.
+    """
+
+    def __init__(self, stop_key=None):
+        self.stop_key = stop_key
+        self.log = MacroLog()
+        self._start_time = None
+        self._last_move_time = None
+        self._pending_move = None
+        self._lock = threading.Lock()
+        self._mouse_listener = None
+        self._keyboard_listener = None
+        self._stopped = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    @property
+    def recording(self):
+        return self._start_time is not None and not self._stopped.is_set()
+
+    def _time(self):
+        return now() - self._start_time
+
+    def _flushMove(self):
+        if self._pending_move is not None:
+            self.log.append(MOVE, *self._pending_move)
+            self._pending_move = None
+
+    def _onMove(self, x, y):
+        with self._lock:
+            time = self._time()
+            if (
+                self._last_move_time is not None
+                and time - self._last_move_time < config.MACRO_MOVE_INTERVAL
+            ):
+                self._pending_move = (time, x, y)
+                return
+            self._pending_move = None
+            self._last_move_time = time
+            self.log.append(MOVE, time, x, y)
+
+    def _onClick(self, x, y, button, pressed):
+        with self._lock:
+            self._flushMove()
+            kind = MOUSE_DOWN if pressed else MOUSE_UP
+            self.log.append(kind, self._time(), x, y, button)
+
+    def _onScroll(self, x, y, dx, dy):
+        with self._lock:
+            self._flushMove()
+            self.log.append(SCROLL, self._time(), dx, dy)
+
+    def _onPress(self, key):
+        if key == self.stop_key:
+            threading.Thread(target=self.stop, daemon=True).start()
+            return
+        with self._lock:
+            self._flushMove()
+            self.log.append(KEY_DOWN, self._time(), value=key)
+
+    def _onRelease(self, key):
+        if key == self.stop_key:
+            return
+        with self._lock:
+            self._flushMove()
+            self.log.append(KEY_UP, self._time(), value=key)
+
+    def start(self):
+        self._start_time = now()
+        self._stopped.clear()
+        self._mouse_listener = pynput_mouse.Listener(
+            on_move=self._onMove, on_click=self._onClick, on_scroll=self._onScroll
+        )
+        self._keyboard_listener = pynput_keyboard.Listener(
+            on_press=self._onPress, on_release=self._onRelease
+        )
+        self._mouse_listener.start()
+        self._keyboard_listener.start()
+        return self
+
+    def syncPoint(self, image, region=None, max_search_time: float = None):
+        """
+        Marks the current moment: on replay, the next events wait until the image
+        is found in the region
+        """
+        with self._lock:
+            self._flushMove()
+            self.log.addSyncPoint(self._time(), image, region, max_search_time)
+
+    def stop(self):
+        with self._lock:
+            if self._stopped.is_set():
+                return self.log
+            self._stopped.set()
+            self._flushMove()
+        for listener in (self._mouse_listener, self._keyboard_listener):
+            if listener is not None:
+                listener.stop()
+        return self.log
+
+    def wait(self, timeout: float = None):
+        """
+        Waits until the recording is stopped by the stop key
+        """
+        return self._stopped.wait(timeout)
+
+
+def recordMacro(stop_key=Key.esc):
+    """
+    Records the input until stop_key is pressed and returns the MacroLog
+    """
+    recorder = MacroRecorder(stop_key).start()
+    recorder.wait()
+    return recorder.log
+
+
+def replayMacro(log: MacroLog, speed: float = None, sync: bool = True):
+    """
+    Replays the log `speed` times faster than it was recorded,
+    speed=float("inf") replays without pauses.
+
+    At a sync point the replay waits until its image is found and raises TimeoutError
+    if it isn't, the following events are timed from that moment, so the fast replay
+    doesn't run ahead of the application. With sync=False the sync points are skipped.
+    A late mouse move is skipped if the next move is already due as well.
+    Returns the number of the replayed events.
+    """
+    speed = speed if speed is not None else config.MACRO_SPEED
+    if speed <= 0:
+        raise ValueError(f"The speed must be positive, got {speed}")
+
+    events = log.events
+    times = events["time"] / speed
+    kinds = events["kind"].tolist()
+    xs, ys, codes = events["x"].tolist(), events["y"].tolist(), events["code"].tolist()
+
+    replayed = 0
+    base_time = now()
+    offset = 0.0
+    count = len(events)
+    for index in range(count):
+        kind = kinds[index]
+        target = base_time + times[index] - offset
+        if kind == MOVE and index + 1 < count and kinds[index + 1] == MOVE:
+            if base_time + times[index + 1] - offset <= now():
+                continue
+        sleepUntil(target, "macro")
+        _checkDeadline()
+        _failSafeCheck()
+
+        if kind == MOVE:
+            _setMousePosition((xs[index], ys[index]))
+        elif kind == MOUSE_DOWN:
+            _setMousePosition((xs[index], ys[index]))
+            mousePress(log.inputs[codes[index]])
+        elif kind == MOUSE_UP:
+            _setMousePosition((xs[index], ys[index]))
+            mouseRelease(log.inputs[codes[index]])
+        elif kind == SCROLL:
+            mouse.scroll(xs[index], ys[index])
+            result_cache.clear()
+        elif kind == KEY_DOWN:
+            keyDown(log.inputs[codes[index]])
+        elif kind == KEY_UP:
+            keyUp(log.inputs[codes[index]])
+        elif kind == SYNC:
+            if not sync:
+                continue
+            image, region, max_search_time = log.sync_points[codes[index]]
+            if find(image, region, max_search_time=max_search_time) is None:
+                raise TimeoutError(f"Sync point {codes[index]} wasn't found: {image}")
+            # the next events are timed from the moment the image has appeared
+            base_time = now()
+            offset = times[index]
+            logging.debug(f"replayMacro: sync point {codes[index]} passed")
+        replayed += 1
+    return replayed
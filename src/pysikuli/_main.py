@@ -3,12 +3,22 @@ import pymsgbox as pmb
 import numpy as np
 import functools
 import logging
+import string
+import atexit
 import math
 import time
 import cv2
 import os
 
 from ._config import config, Key, Button, _MONITOR_REGION
+from ._exceptions import PysikuliException, FailSafeException
+from ._deadline import _checkDeadline
+from ._failsafe import failsafe_watcher, _inFailSafeRegion
+from ._polling import Poller
+from ._cache import result_cache
+from ._memo import match_memo, _contentKey
+from ._trajectory import Trajectory, trajectory
+from ._timing import Pacer, now, preciseSleep
 from pynput.mouse import Controller as mouse_manager
 from PyHotKey import keyboard_manager as keyboard
 from mss.screenshot import ScreenShot
@@ -18,37 +28,12 @@ from mss import mss, tools
 mouse = mouse_manager()
 
 
-class PysikuliException(Exception):
-    """
-    pysikuli code will raise this exception class for any invalid actions. If pysikuli raises some other exception,
-    you should assume that this is caused by a bug in pysikuli itself. (Including a failure to catch potential
-    exceptions raised by pysikuli.)
-    """
-
-    pass
-
-
-class FailSafeException(PysikuliException):
-    """
-    This exception is raised by pysikuli functions when the user puts the mouse cursor into one of the "failsafe
-    points" (by default, one of the four corners of the primary monitor). This exception shouldn't be caught; it's
-    meant to provide a way to terminate a misbehaving script.
-    """
-
-    pass
-
-
 def _mouseFailSafeCheck():
-    mousePos = mousePosition()
-    for region in config.FAILSAFE_REGIONS:
-        if (
-            region[0] <= mousePos[0] <= region[2]
-            and region[1] <= mousePos[1] <= region[3]
-        ):
-            return (
-                "pysikuli fail-safe triggered when "
-                "moving the mouse within the fail-safe region."
-            )
+    if _inFailSafeRegion(*mousePosition()):
+        return (
+            "pysikuli fail-safe triggered when "
+            "moving the mouse within the fail-safe region."
+        )
 
 
 def hotkeyFailSafeCheck():
@@ -63,8 +48,24 @@ def hotkeyFailSafeCheck():
 
 def _failSafeCheck():
     if config.FAILSAFE:
-        hotkeyCheck = hotkeyFailSafeCheck()
-        mouseCheck = _mouseFailSafeCheck()
+        watcher = failsafe_watcher
+        if config.FAILSAFE_WATCHER and (watcher.running or watcher.start()):
+            if not watcher.position_checked:
+                # the mouse may be in the fail-safe region before any move
+                watcher.checkPosition(*mousePosition())
+            if (
+                watcher.reason is not None
+                or watcher._hotkey_source is not config.FAILSAFE_HOTKEY
+            ):
+                watcher.check()
+            if watcher.hotkey_watched:
+                return
+            # the hotkey couldn't be registered, only it is polled
+            hotkeyCheck = hotkeyFailSafeCheck()
+            mouseCheck = None
+        else:
+            hotkeyCheck = hotkeyFailSafeCheck()
+            mouseCheck = _mouseFailSafeCheck()
         if hotkeyCheck or mouseCheck:
             raise FailSafeException(
                 f"{hotkeyCheck or mouseCheck}\nTo disable the fail-safe, "
@@ -83,7 +84,11 @@ def failSafeCheck(wrappedFunction):
         if config.PAUSE_BETWEEN_ACTION:
             time.sleep(config.PAUSE_BETWEEN_ACTION)
         _failSafeCheck()
-        return wrappedFunction(*args, **kwargs)
+        try:
+            return wrappedFunction(*args, **kwargs)
+        finally:
+            # any input may change the screen
+            result_cache.clear()
 
     return failSafeWrapper
 
@@ -254,6 +259,93 @@ class Region(object):
             image=image, region=self.reg, grayscale=grayscale, precision=precision
         )
 
+    def onAppear(
+        self,
+        image,
+        callback,
+        interval: float = None,
+        priority: int = 0,
+        grayscale: bool = None,
+        precision: float = None,
+    ):
+        from ._observer import onAppear
+
+        return onAppear(
+            image=image,
+            callback=callback,
+            region=self.reg,
+            interval=interval,
+            priority=priority,
+            grayscale=grayscale,
+            precision=precision,
+        )
+
+    def onVanish(
+        self,
+        image,
+        callback,
+        interval: float = None,
+        priority: int = 0,
+        grayscale: bool = None,
+        precision: float = None,
+    ):
+        from ._observer import onVanish
+
+        return onVanish(
+            image=image,
+            callback=callback,
+            region=self.reg,
+            interval=interval,
+            priority=priority,
+            grayscale=grayscale,
+            precision=precision,
+        )
+
+    def onChange(
+        self,
+        callback,
+        interval: float = None,
+        priority: int = 0,
+        min_changed: float = None,
+    ):
+        from ._observer import onChange
+
+        return onChange(
+            callback=callback,
+            region=self.reg,
+            interval=interval,
+            priority=priority,
+            min_changed=min_changed,
+        )
+
+    def waitUntilStable(
+        self,
+        stable_time: float = 0.3,
+        max_search_time: float = None,
+        min_changed: float = None,
+    ):
+        return waitUntilStable(
+            region=self.reg,
+            stable_time=stable_time,
+            max_search_time=max_search_time,
+            time_step=self.time_step,
+            min_changed=min_changed,
+        )
+
+    def waitForChange(
+        self,
+        max_search_time: float = None,
+        min_changed: float = None,
+        baseline=None,
+    ):
+        return waitForChange(
+            region=self.reg,
+            max_search_time=max_search_time,
+            time_step=self.time_step,
+            min_changed=min_changed,
+            baseline=baseline,
+        )
+
 
 class Match(Region):
     __slots__ = (
@@ -338,6 +430,107 @@ class Match(Region):
         return self.offset_loc
 
 
+class Frame(object):
+    """
+    A captured region with lazily computed and cached variants.
+
+    Every search against the same frame reuses the grayscale and color conversions,
+    downscaled images and integral images, so the preprocessing runs once per frame
+    rather than once per template. Pass a frame as `region` to any search function.
+    """
+
+    __slots__ = ("np_region", "tuple_region", "timestamp", "_variants", "_digest")
+
+    def __init__(self, np_region: np.ndarray, tuple_region: tuple, timestamp=None):
+        self.np_region = np_region
+        self.tuple_region = tuple(tuple_region)
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self._variants = {}
+        self._digest = None
+
+    def __str__(self):
+        return f"<Frame {self.tuple_region} at {self.timestamp}>"
+
+    @property
+    def width(self):
+        return self.np_region.shape[1]
+
+    @property
+    def height(self):
+        return self.np_region.shape[0]
+
+    @property
+    def digest(self):
+        """
+        Content key of the frame pixels, the same pixels give the same digest
+        """
+        if self._digest is None:
+            self._digest = _contentKey(self.np_region)
+        return self._digest
+
+    @property
+    def gray(self):
+        return self.variant("gray")
+
+    @property
+    def bgr(self):
+        return self.variant("bgr")
+
+    def variant(self, name="gray", ratio=1):
+        """
+        Returns cached "gray" or "bgr" variant of the frame downscaled by `ratio`
+        """
+        key = (name, ratio)
+        if key not in self._variants:
+            if ratio > 1:
+                variant = _imgDownsize(self.variant(name), ratio)
+            elif name == "gray":
+                variant = cv2.cvtColor(self.np_region, cv2.COLOR_RGB2GRAY)
+            elif name == "bgr":
+                # sct.grab always creates RGB images, see _matchTemplate()
+                variant = cv2.cvtColor(self.np_region, cv2.COLOR_RGB2BGR)
+            else:
+                raise ValueError(f"Unknown frame variant: {name}")
+            self._variants[key] = variant
+        return self._variants[key]
+
+    def integral(self, name="gray", ratio=1):
+        """
+        Returns cached integral image of the variant, useful for fast sums over rectangles
+        """
+        key = ("integral", name, ratio)
+        if key not in self._variants:
+            self._variants[key] = cv2.integral(self.variant(name, ratio))
+        return self._variants[key]
+
+    def crop(self, region: tuple):
+        """
+        Returns a new frame with the part of this frame, the region is in screen coordinates
+        """
+        x1, y1, x2, y2 = region
+        left, top = self.tuple_region[0], self.tuple_region[1]
+        if (
+            x1 < left
+            or y1 < top
+            or x2 > self.tuple_region[2]
+            or y2 > self.tuple_region[3]
+        ):
+            raise ValueError(f"Region {region} is outside the frame {self.tuple_region}")
+        np_region = self.np_region[y1 - top : y2 - top, x1 - left : x2 - left]
+        return Frame(np_region, (x1, y1, x2, y2), self.timestamp)
+
+
+def grabFrame(region=None):
+    """
+    Captures the region once for several searches, e.g.:
+
+    frame = grabFrame(region)
+    exist("pics/ok.png", region=frame)
+    exist("pics/cancel.png", region=frame)
+    """
+    return _regionToFrame(region)
+
+
 class Picture:
     def __init__():
         pass
@@ -378,6 +571,276 @@ def wait(
         raise TimeoutError(error_text)
 
 
+class Vanish(object):
+    """
+    Condition for waitAny() and waitAll(), which is fulfilled when the image disappears
+    """
+
+    __slots__ = ("image", "region")
+
+    def __init__(self, image, region=None):
+        self.image = image
+        self.region = region
+
+    def __str__(self):
+        return f"Vanish({self.image!r}, region={self.region!r})"
+
+
+def _conditionsNormalization(conditions):
+    normalized = []
+    for condition in conditions:
+        vanish = isinstance(condition, Vanish)
+        if vanish:
+            image, region = condition.image, condition.region
+        elif isinstance(condition, (tuple, list)):
+            image, region = condition
+        else:
+            image, region = condition, None
+
+        tuple_region = _regionNormalization(region)
+        if tuple_region is None:
+            raise TypeError(
+                f"Conditions must use screen regions, can't wait for changes of {type(region)}"
+            )
+        normalized.append((image, tuple_region, vanish))
+    return normalized
+
+
+def _unionRegion(regions):
+    return (
+        min(reg[0] for reg in regions),
+        min(reg[1] for reg in regions),
+        max(reg[2] for reg in regions),
+        max(reg[3] for reg in regions),
+    )
+
+
+def _checkConditions(conditions, union, grayscale, precision):
+    """
+    Captures the union of all regions once and yields (fulfilled, match) for each condition
+    """
+    frame = _regionToFrame(union)
+    crops = {union: frame}
+
+    for image, tuple_region, vanish in conditions:
+        if tuple_region not in crops:
+            crops[tuple_region] = frame.crop(tuple_region)
+        _match = exist(
+            image=image,
+            region=crops[tuple_region],
+            grayscale=grayscale,
+            precision=precision,
+        )
+        if vanish:
+            yield _match is None, None
+        else:
+            yield _match is not None, _match
+
+
+def waitAny(
+    conditions,
+    max_search_time: float = None,
+    time_step: float = None,
+    grayscale: bool = None,
+    precision: float = None,
+):
+    """
+    Waits until any of the conditions is fulfilled, e.g. a success or an error dialog appears.
+    Each poll captures the screen once for all conditions.
+
+    Args:
+        conditions (list): images, (image, region) pairs or Vanish(image, region) conditions
+
+    Returns:
+        tuple(index, Match) of the fulfilled condition, Match is None for Vanish conditions
+
+    Raises:
+        TimeoutError: none of the conditions were fulfilled in max_search_time
+    """
+    max_search_time = (
+        max_search_time if max_search_time is not None else config.MAX_SEARCH_TIME
+    )
+    conditions = _conditionsNormalization(conditions)
+    union = _unionRegion([reg for _, reg, _ in conditions])
+
+    for _ in Poller(max_search_time, time_step):
+        results = _checkConditions(conditions, union, grayscale, precision)
+        for index, (fulfilled, _match) in enumerate(results):
+            if fulfilled:
+                return index, _match
+
+    error_text = f"waitAny(): none of the conditions were fulfilled: {conditions}"
+    logging.fatal(error_text)
+    raise TimeoutError(error_text)
+
+
+def waitAll(
+    conditions,
+    max_search_time: float = None,
+    time_step: float = None,
+    grayscale: bool = None,
+    precision: float = None,
+):
+    """
+    Waits until all conditions are fulfilled on the same screenshot.
+
+    Args:
+        conditions (list): images, (image, region) pairs or Vanish(image, region) conditions
+
+    Returns:
+        list of Match for each condition, Match is None for Vanish conditions
+
+    Raises:
+        TimeoutError: the conditions were not fulfilled together in max_search_time
+    """
+    max_search_time = (
+        max_search_time if max_search_time is not None else config.MAX_SEARCH_TIME
+    )
+    conditions = _conditionsNormalization(conditions)
+    union = _unionRegion([reg for _, reg, _ in conditions])
+
+    for _ in Poller(max_search_time, time_step):
+        matches = []
+        for fulfilled, _match in _checkConditions(
+            conditions, union, grayscale, precision
+        ):
+            if not fulfilled:
+                break
+            matches.append(_match)
+        else:
+            return matches
+
+    error_text = f"waitAll(): the conditions were not fulfilled: {conditions}"
+    logging.fatal(error_text)
+    raise TimeoutError(error_text)
+
+
+# region changes are measured on gray thumbnails downscaled by this ratio,
+# a pixel is changed if its gray level differs by more than the threshold
+_CHANGE_RATIO = 4
+_CHANGE_PIXEL_THRESHOLD = 16
+
+
+def _changedPart(frame, baseline) -> float:
+    """
+    Returns the changed part of the frame compared with the baseline frame, from 0 to 1
+    """
+    thumbnail = frame.variant("gray", _CHANGE_RATIO)
+    previous = baseline.variant("gray", _CHANGE_RATIO)
+    if thumbnail.shape != previous.shape:
+        return 1.0
+    diff = cv2.absdiff(thumbnail, previous)
+    return np.count_nonzero(diff > _CHANGE_PIXEL_THRESHOLD) / diff.size
+
+
+def waitUntilStable(
+    region=None,
+    stable_time: float = 0.3,
+    max_search_time: float = None,
+    time_step: float = None,
+    min_changed: float = None,
+):
+    """
+    Waits until the region stops changing for `stable_time` seconds,
+    e.g. an animation or a page load has finished.
+
+    Args:
+        stable_time (float, optional): how long the region has to stay the same. Defaults to 0.3.
+        min_changed (float, optional): minimal changed part of the region, which is not ignored
+
+    Returns:
+        Frame: the last screenshot of the stable region
+
+    Raises:
+        TimeoutError: the region is still changing after max_search_time
+    """
+    max_search_time = (
+        max_search_time if max_search_time is not None else config.MAX_SEARCH_TIME
+    )
+    min_changed = min_changed if min_changed is not None else config.MIN_CHANGED
+    tuple_region = _regionNormalization(region)
+
+    baseline, stable_since = None, None
+    for _ in Poller(max_search_time + stable_time, time_step):
+        frame = _regionToFrame(tuple_region)
+        capture_time = now()
+        # compare with the first frame of the stable period, so a slow fade isn't missed
+        if baseline is None or _changedPart(frame, baseline) >= min_changed:
+            baseline, stable_since = frame, capture_time
+        elif capture_time - stable_since >= stable_time:
+            return frame
+
+    error_text = f"waitUntilStable(): the region is still changing: {tuple_region}"
+    logging.fatal(error_text)
+    raise TimeoutError(error_text)
+
+
+def waitForChange(
+    region=None,
+    max_search_time: float = None,
+    time_step: float = None,
+    min_changed: float = None,
+    baseline: Frame = None,
+):
+    """
+    Waits until the region differs from the baseline, e.g. a repaint after a click.
+
+    Args:
+        min_changed (float, optional): minimal changed part of the region
+        baseline (Frame, optional): the region before the change, grab it by grabFrame()
+            before the action to not miss a fast repaint. Defaults to the first screenshot.
+
+    Returns:
+        Frame: the first screenshot of the changed region
+
+    Raises:
+        TimeoutError: the region hasn't changed in max_search_time
+    """
+    max_search_time = (
+        max_search_time if max_search_time is not None else config.MAX_SEARCH_TIME
+    )
+    min_changed = min_changed if min_changed is not None else config.MIN_CHANGED
+    tuple_region = (
+        baseline.tuple_region if baseline is not None else _regionNormalization(region)
+    )
+
+    for _ in Poller(max_search_time, time_step):
+        frame = _regionToFrame(tuple_region)
+        if baseline is None:
+            baseline = frame
+        elif _changedPart(frame, baseline) >= min_changed:
+            return frame
+
+    error_text = f"waitForChange(): the region hasn't changed: {tuple_region}"
+    logging.fatal(error_text)
+    raise TimeoutError(error_text)
+
+
+def _incrementalMatcher(image, grayscale, precision, pixel_colors):
+    if not config.INCREMENTAL_MATCH or pixel_colors:
+        return None
+    from ._incremental import IncrementalMatcher
+
+    return IncrementalMatcher(image, grayscale, precision)
+
+
+def _pollExist(matcher, poll, image, region, grayscale, precision, pixel_colors):
+    """
+    One poll of find() and waitWhileExist(), the matcher of _incrementalMatcher()
+    or else exist() with config.RESULT_CACHE for the first poll
+    """
+    if matcher is not None:
+        return matcher.exist(region)
+    return _existCached(
+        image=image,
+        region=region,
+        grayscale=grayscale,
+        precision=precision,
+        pixel_colors=pixel_colors,
+        refresh=poll > 1,
+    )
+
+
 def waitWhileExist(
     image,
     region=None,
@@ -390,20 +853,14 @@ def waitWhileExist(
     max_search_time = (
         max_search_time if max_search_time is not None else config.MAX_SEARCH_TIME
     )
-    time_step = time_step if time_step is not None else config.TIME_STEP
 
-    start_time = time.time()
-    while time.time() - start_time < max_search_time:
-        _match = exist(
-            image=image,
-            region=region,
-            grayscale=grayscale,
-            precision=precision,
-            pixel_colors=pixel_colors,
+    matcher = _incrementalMatcher(image, grayscale, precision, pixel_colors)
+    for poll in Poller(max_search_time, time_step):
+        _match = _pollExist(
+            matcher, poll, image, region, grayscale, precision, pixel_colors
         )
         if _match == None:
             return True
-        time.sleep(time_step)
     return None
 
 
@@ -419,20 +876,14 @@ def find(
     max_search_time = (
         max_search_time if max_search_time is not None else config.MAX_SEARCH_TIME
     )
-    time_step = time_step if time_step is not None else config.TIME_STEP
 
-    start_time = time.time()
-    while time.time() - start_time < max_search_time:
-        _match = exist(
-            image=image,
-            region=region,
-            grayscale=grayscale,
-            precision=precision,
-            pixel_colors=pixel_colors,
+    matcher = _incrementalMatcher(image, grayscale, precision, pixel_colors)
+    for poll in Poller(max_search_time, time_step):
+        _match = _pollExist(
+            matcher, poll, image, region, grayscale, precision, pixel_colors
         )
         if _match != None:
             return _match
-        time.sleep(time_step)
     return None
 
 
@@ -443,17 +894,16 @@ def findAny(
     precision: float = None,
     pixel_colors: tuple = None,
 ):
-    region, tuple_region = _regionToNumpyArray(reg=region)
+    frame = _regionToFrame(region)
     matches = []
 
     for image in image_list:
         match = exist(
             image=image,
-            region=region,
+            region=frame,
             grayscale=grayscale,
             precision=precision,
             pixel_colors=pixel_colors,
-            tuple_region=tuple_region,
         )
         if match:
             matches.append(match)
@@ -472,6 +922,14 @@ def _imgDownsize(img: np.ndarray, multiplier):
     return cv2.resize(img, dsize, interpolation=cv2.INTER_AREA)
 
 
+def _toGray(np_img: np.ndarray):
+    if len(np_img.shape) < 3:
+        return np_img
+    elif np_img.shape[2] == 4:
+        return cv2.cvtColor(np_img, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(np_img, cv2.COLOR_BGR2GRAY)
+
+
 def _coordinateNormalization(
     loc_or_pic,
     region=None,
@@ -549,6 +1007,8 @@ def _regionNormalization(reg=None):
         reg = reg.reg
     elif isinstance(reg, (list | tuple)):
         reg = _regionValidation(reg)
+    elif isinstance(reg, Frame):
+        reg = reg.tuple_region
     elif isinstance(reg, np.ndarray):
         return None
     elif reg is None:
@@ -577,6 +1037,9 @@ def _handleNpRegion(np_region: np.ndarray, tuple_region):
 def _regionToNumpyArray(reg=None, tuple_region=None):
     tuple_reg = _regionNormalization(reg)
 
+    if isinstance(reg, Frame):
+        return reg.np_region, reg.tuple_region
+
     with mss() as sct:
         if isinstance(reg, np.ndarray):
             return _handleNpRegion(reg, tuple_region)
@@ -596,6 +1059,13 @@ def _regionToNumpyArray(reg=None, tuple_region=None):
     return np.array(grab_reg), tuple_reg
 
 
+def _regionToFrame(reg=None, tuple_region=None):
+    if isinstance(reg, Frame):
+        return reg
+    np_region, tuple_region = _regionToNumpyArray(reg, tuple_region)
+    return Frame(np_region, tuple_region)
+
+
 def _imageToNumpyArray(image):
     if isinstance(image, np.ndarray):
         return image
@@ -621,40 +1091,44 @@ def _matchTemplate(
     grayscale = grayscale if grayscale is not None else config.GRAYSCALE
     precision = precision if precision is not None else config.MIN_PRECISION
 
-    np_region, tuple_region = _regionToNumpyArray(region, tuple_region)
+    # the region preprocessing is cached in the frame and shared by all searches on it
+    frame = _regionToFrame(region, tuple_region)
+    tuple_region = frame.tuple_region
     np_image = _imageToNumpyArray(image)
 
     img_height, img_width, _ = np_image.shape
-    reg_height, reg_width, _ = np_region.shape
+    reg_height, reg_width, _ = frame.np_region.shape
 
     if img_height > reg_height or img_width > reg_width:
         raise ValueError(
-            f"The region ({np_region.shape}) is smaller than the image ({np_image.shape}) you are looking for"
+            f"The region ({frame.np_region.shape}) is smaller than the image ({np_image.shape}) you are looking for"
         )
 
     if grayscale and not pixel_colors:
         np_image = cv2.cvtColor(np_image, cv2.COLOR_BGR2GRAY)
-        np_region = cv2.cvtColor(np_region, cv2.COLOR_RGB2GRAY)
 
         image_capture = np_image
-        region_capture = np_region
+        region_capture = frame.gray
+        variant = "gray"
     else:
         image_capture = np_image
-        region_capture = np_region
+        region_capture = frame.np_region
         # both images must be stored in BGR format for futher matchTemplate
         np_image = cv2.cvtColor(np_image, cv2.COLOR_RGB2BGR)
-        np_region = cv2.cvtColor(np_region, cv2.COLOR_RGB2BGR)
+        variant = "bgr"
 
         # imread from np_image must create always BGR images, but in my case it is RGB
         # sct.grab from np_region create always RGB images
 
     if config.COMPRESSION_RATIO > 1:
         np_image = _imgDownsize(np_image, config.COMPRESSION_RATIO)
-        np_region = _imgDownsize(np_region, config.COMPRESSION_RATIO)
+        np_region = frame.variant(variant, config.COMPRESSION_RATIO)
     elif config.COMPRESSION_RATIO < 1:
         raise ValueError(
             f"Couldn't recognize COMPRESSION_RATIO: {config.COMPRESSION_RATIO}"
         )
+    else:
+        np_region = frame.variant(variant)
 
     # also can use cv2.TM_CCOEFF, TM_CCORR_NORMED and TM_CCOEFF_NORMED in descending order of speed
     # for TM_CCORR_NORMED, minimum precision is 0.991
@@ -700,24 +1174,115 @@ def exist(
     if exist find several patterns with same score, will return the most right and the most bottom match
     """
 
-    (
-        image_capture,
-        region_capture,
-        cv2_match,
-        img_width,
-        img_height,
-        tuple_region,
-        precision,
-    ) = _matchTemplate(
+    return _existCached(
         image=image,
         region=region,
         grayscale=grayscale,
         precision=precision,
         pixel_colors=pixel_colors,
         tuple_region=tuple_region,
-    ).values()
+    )
 
-    _, max_val, _, max_loc = cv2.minMaxLoc(cv2_match)
+
+def _existCached(
+    image,
+    region=None,
+    grayscale: bool = None,
+    precision: float = None,
+    pixel_colors: tuple = None,
+    tuple_region: tuple | list = None,
+    refresh: bool = False,
+):
+    """
+    exist() with config.RESULT_CACHE, `refresh` skips the lookup but stores the new result
+    """
+    key = None
+    # only the live screen can be cached, a Frame, ScreenShot or np.ndarray never changes
+    live_region = region is None or isinstance(region, (Region, tuple, list))
+    if config.RESULT_CACHE and live_region:
+        generation = result_cache.generation
+        key = result_cache.key(
+            image, _regionNormalization(region), grayscale, precision, pixel_colors
+        )
+    if key is not None and not refresh:
+        hit, _match = result_cache.get(key)
+        if hit:
+            return _match
+
+    _match = _exist(
+        image=image,
+        region=region,
+        grayscale=grayscale,
+        precision=precision,
+        pixel_colors=pixel_colors,
+        tuple_region=tuple_region,
+    )
+    if key is not None:
+        result_cache.put(key, _match, generation)
+    return _match
+
+
+def _exist(
+    image,
+    region=None,
+    grayscale: bool = None,
+    precision: float = None,
+    pixel_colors: tuple = None,
+    tuple_region: tuple | list = None,
+):
+    if config.MATCH_PLANNER and not pixel_colors:
+        from ._planner import planner
+
+        return planner.exist(
+            image=image,
+            region=region,
+            grayscale=grayscale,
+            precision=precision,
+            tuple_region=tuple_region,
+        )
+
+    memo_key, memo = None, None
+    if config.MATCH_MEMO:
+        # the precision and pixel colors are checked after, so they aren't a part of the key
+        region = _regionToFrame(region, tuple_region)
+        grayscale = grayscale if grayscale is not None else config.GRAYSCALE
+        gray_match = grayscale and not pixel_colors
+        memo_key = match_memo.key(region, image, gray_match)
+        if memo_key is not None:
+            memo = match_memo.get(memo_key)
+
+    if memo is None:
+        (
+            image_capture,
+            region_capture,
+            cv2_match,
+            img_width,
+            img_height,
+            tuple_region,
+            precision,
+        ) = _matchTemplate(
+            image=image,
+            region=region,
+            grayscale=grayscale,
+            precision=precision,
+            pixel_colors=pixel_colors,
+            tuple_region=tuple_region,
+        ).values()
+
+        _, max_val, _, max_loc = cv2.minMaxLoc(cv2_match)
+        if memo_key is not None:
+            match_memo.put(memo_key, max_val, max_loc)
+    else:
+        max_val, max_loc = memo
+        precision = precision if precision is not None else config.MIN_PRECISION
+        tuple_region = region.tuple_region
+        image_capture = _imageToNumpyArray(image)
+        img_height, img_width = image_capture.shape[:2]
+        if gray_match:
+            image_capture = cv2.cvtColor(image_capture, cv2.COLOR_BGR2GRAY)
+            region_capture = region.gray
+        else:
+            region_capture = region.np_region
 
     max_val = round(max_val, 6)
     image = image if isinstance(image, str) else type(image)
@@ -816,6 +1381,29 @@ def getPixel(x, y, np_region: np.ndarray = None):
     return (r, g, b)
 
 
+_xtest_backend = None
+
+
+def _inputBackend():
+    """
+    Returns XTestBackend if config.INPUT_BACKEND is "xtest" on Linux, otherwise None
+    """
+    global _xtest_backend
+    if config.INPUT_BACKEND != "xtest" or not config.UNIX:
+        return None
+    if _xtest_backend is None:
+        try:
+            from ._xtest import XTestBackend
+
+            _xtest_backend = XTestBackend()
+            # the remapped keycodes stay in the keyboard layout of the session
+            atexit.register(_xtest_backend.close)
+        except Exception:
+            logging.warning("XTest backend couldn't start, using pynput", exc_info=True)
+            _xtest_backend = False
+    return _xtest_backend or None
+
+
 def pressedKeys():
     return keyboard.pressed_keys
 
@@ -827,11 +1415,20 @@ def hotkey(*keys, interval=0.0):
 
     logging.debug(f"{keys}, interval: {interval}")
 
-    for key in keys:
-        if isinstance(key, str):
-            key = key.lower()
-        keyDown(key)
-        time.sleep(interval)
+    pacer = Pacer(interval, "hotkey")
+    pressed = []
+    try:
+        for key in keys:
+            if isinstance(key, str):
+                key = key.lower()
+            keyDown(key)
+            pressed.append(key)
+            pacer.wait()
+    except BaseException:
+        # a cancelled wait doesn't leave the modifiers held
+        for key in reversed(pressed):
+            _releaseKey(key)
+        raise
 
     logging.debug(f"Pressed: {keyboard.pressed_keys}")
 
@@ -839,7 +1436,7 @@ def hotkey(*keys, interval=0.0):
         if isinstance(key, str):
             key = key.lower()
         keyUp(key)
-        time.sleep(interval)
+        pacer.wait()
 
     logging.debug(f"Released: {keyboard.pressed_keys}")
 
@@ -857,33 +1454,216 @@ def tap(key, presses=1, interval=0.0, time_step: float = None):
 
     if config.OSX and interval < 0.02:
         interval = 0.02
+    pacer = Pacer(time_step, "tap")
     for x in range(presses):
         logging.debug(f"tap: {key}")
         logging.debug(keyboard.pressed_keys)
 
         keyDown(key)
-        time.sleep(time_step)
+        try:
+            pacer.wait()
+        except BaseException:
+            _releaseKey(key)
+            raise
         keyUp(key)
-        time.sleep(time_step + interval)
+        pacer.wait(time_step + interval)
+
+
+def _releaseKey(key):
+    backend = _inputBackend()
+    if backend is not None:
+        backend.release(key)
+    else:
+        keyboard.release(key)
 
 
 @failSafeCheck
 def keyUp(key):
-    keyboard.release(key)
+    _releaseKey(key)
 
 
 @failSafeCheck
 def keyDown(key):
-    keyboard.press(key)
+    backend = _inputBackend()
+    if backend is not None:
+        backend.press(key)
+    else:
+        keyboard.press(key)
+
+
+WRITE_MODES = ("auto", "type", "paste")
+# area in pixels of one character, a paste is confirmed when the active window
+# has changed by the area of _PASTE_MIN_CHARS characters
+_PASTE_CHAR_AREA = 8 * 16
+_PASTE_MIN_CHARS = 3
+# characters on the keys of any layout, the rest are typed by remapping the keymap
+_TYPABLE = frozenset(string.printable) - frozenset("\r\x0b\x0c")
+
+
+def _writeMode(message: str) -> str:
+    """
+    Returns "paste" for the long texts and the texts with characters out of the layout,
+    otherwise "type"
+    """
+    if len(message) >= config.WRITE_PASTE_THRESHOLD:
+        return "paste"
+    if not _TYPABLE.issuperset(message):
+        return "paste"
+    return "type"
+
+
+def _pasteRegion():
+    """
+    Returns the region of the active window, where the paste is expected to appear
+    """
+    try:
+        return tuple(pwc.getActiveWindow().bbox)
+    except Exception:
+        return None
+
+
+def _ownClipboard():
+    """
+    Returns the in-process clipboard if it holds the current text, otherwise None
+    """
+    clipboard_getter = getattr(config.platformModule, "_clipboard", None)
+    clipboard = clipboard_getter() if clipboard_getter is not None else None
+    return clipboard if clipboard is not None and clipboard.owned else None
+
+
+def _pasteHotkey():
+    if config.OSX:
+        hotkey(Key.cmd, "v")
+    else:
+        hotkey(Key.ctrl, "v")
+
+
+def _changedArea(frame, baseline) -> int:
+    """
+    Returns the changed area of the frame compared with the baseline, in pixels
+    """
+    thumbnail = frame.variant("gray", _CHANGE_RATIO)
+    previous = baseline.variant("gray", _CHANGE_RATIO)
+    if thumbnail.shape != previous.shape:
+        return frame.np_region.shape[0] * frame.np_region.shape[1]
+    diff = cv2.absdiff(thumbnail, previous)
+    return np.count_nonzero(diff > _CHANGE_PIXEL_THRESHOLD) * _CHANGE_RATIO**2
+
+
+def _expectedPasteArea(message: str) -> int:
+    characters = sum(not sign.isspace() for sign in message)
+    return max(min(characters, _PASTE_MIN_CHARS), 1) * _PASTE_CHAR_AREA
+
+
+def _waitForPaste(baseline: Frame, message: str):
+    """
+    Waits until the active window has changed by the area of a few characters
+    in two polls in a row, a blinking caret or a ticking clock is smaller
+    or doesn't stay
+    """
+    expected_area = _expectedPasteArea(message)
+    confirmed = 0
+    for _ in Poller(config.WRITE_PASTE_TIMEOUT):
+        frame = _regionToFrame(baseline.tuple_region)
+        if _changedArea(frame, baseline) >= expected_area:
+            confirmed += 1
+            if confirmed == 2:
+                return
+        else:
+            confirmed = 0
+    error_text = "write(): the pasted text hasn't appeared in the active window"
+    logging.fatal(error_text)
+    raise TimeoutError(error_text)
+
+
+def _pasteText(message: str) -> bool:
+    """
+    Pastes the message and restores the previous text in the clipboard,
+    returns False if the clipboard doesn't accept the message
+    or the paste can't be verified, because the active window isn't found
+    """
+    saved = pasteFromClip()
+    try:
+        copyToClip(message)
+        if pasteFromClip() != message:
+            logging.warning("write(): the clipboard hasn't accepted the text")
+            return False
+        # the in-process clipboard knows when the application has read the text,
+        # otherwise the paste is confirmed by the repaint of the active window
+        clipboard = _ownClipboard()
+        baseline = None
+        if config.WRITE_PASTE_VERIFY and clipboard is None:
+            region = _pasteRegion()
+            if region is None:
+                logging.warning("write(): the active window isn't found to verify")
+                return False
+            baseline = _regionToFrame(region)
+        if clipboard is not None:
+            clipboard.expectPaste()
+        _pasteHotkey()
+        # the application reads the clipboard after it gets the key events,
+        # so the old text is restored only after the paste has been done
+        if config.WRITE_PASTE_VERIFY and clipboard is not None:
+            if not clipboard.waitForPaste(config.WRITE_PASTE_TIMEOUT):
+                error_text = "write(): the application hasn't read the pasted text"
+                logging.fatal(error_text)
+                raise TimeoutError(error_text)
+        elif baseline is not None:
+            _waitForPaste(baseline, message)
+    finally:
+        copyToClip(saved)
+    return True
 
 
 @failSafeCheck
-def write(message, time_step: float = None):
+def write(message, time_step: float = None, mode: str = None):
+    """
+    Enters the text into the active window.
+
+    Args:
+        time_step (float, optional): interval after each typed character.
+            Defaults to config.TIME_STEP.
+        mode (str, optional): "type" - type character by character,
+            "paste" - paste through the clipboard, the previous text in the clipboard
+            is restored after the pasted text has appeared in the active window,
+            the text is typed if the clipboard or the active window isn't available,
+            "auto" - paste the texts from config.WRITE_PASTE_THRESHOLD characters
+            and the texts with characters out of the keyboard layout, type the rest.
+            Defaults to config.WRITE_MODE, "type".
+
+    Raises:
+        TimeoutError: the pasted text hasn't been read from the in-process clipboard
+            or hasn't appeared on the screen in config.WRITE_PASTE_TIMEOUT
+    """
+    requested_mode = mode if mode is not None else config.WRITE_MODE
+    if requested_mode not in WRITE_MODES:
+        raise ValueError(
+            f"Unknown write mode {requested_mode!r}, use one of {WRITE_MODES}"
+        )
+    mode = _writeMode(message) if requested_mode == "auto" else requested_mode
+    if mode == "paste":
+        try:
+            if _pasteText(message):
+                return
+        except OSError:
+            # e.g. xsel isn't installed, the automatic mode falls back to typing
+            if requested_mode != "auto":
+                raise
+            logging.warning("write(): the clipboard isn't available", exc_info=True)
+        logging.debug("write(): typing the text instead of pasting")
+
     time_step = time_step if time_step is not None else config.TIME_STEP
+    backend = _inputBackend()
     if time_step > 0:
+        pacer = Pacer(time_step, "write")
         for sign in message:
-            keyboard.tap(sign)
-            time.sleep(time_step)
+            if backend is not None:
+                backend.tap(sign)
+            else:
+                keyboard.tap(sign)
+            pacer.wait()
+    elif backend is not None:
+        backend.type(message)
     else:
         keyboard.type(message)
 
@@ -896,10 +1676,7 @@ def paste(text: str):
         text (str): text, which one will be entered into active window
     """
     copyToClip(text)
-    if config.OSX:
-        hotkey(Key.cmd, "v")
-    else:
-        hotkey(Key.ctrl, "v")
+    _pasteHotkey()
 
 
 def copyToClip(text):
@@ -911,14 +1688,48 @@ def pasteFromClip():
 
 
 def mousePosition():
+    backend = _inputBackend()
+    if backend is not None:
+        return backend.position()
     return mouse.position
 
 
+def _setMousePosition(loc):
+    failsafe_watcher.ownMove(*loc)
+    backend = _inputBackend()
+    if backend is not None:
+        # pynput sends the clicks by another connection, they must follow the move
+        backend.move(*loc)
+        backend.sync()
+    else:
+        mouse.position = loc
+    # the hover effects change the screen
+    result_cache.clear()
+
+
+def _setMousePath(points):
+    """
+    Moves the mouse through the points, XTest sends all of them in one flush,
+    pynput only moves to the last one
+    """
+    backend = _inputBackend()
+    if backend is None:
+        _setMousePosition(points[-1])
+        return
+    for point in points:
+        failsafe_watcher.ownMove(*point)
+    backend.moveAlong(points)
+    backend.sync()
+    result_cache.clear()
+
+
 @failSafeCheck
 def scroll(duration=0.1, horizontal_speed=0, vertical_speed=0):
+    pacer = Pacer(1 / config.REFRESH_RATE, "scroll")
     for _ in range(int(duration * config.REFRESH_RATE)):
+        _checkDeadline()
         mouse.scroll(horizontal_speed, vertical_speed)
-        time.sleep(1 / config.REFRESH_RATE)
+        pacer.wait()
 
 
 def hscroll(duration=0.1, speed=1):
@@ -926,99 +1737,98 @@ def hscroll(duration=0.1, speed=1):
 
 
 def vscroll(duration=0.1, speed=1):
-    scroll(duration, speed, 0)
+    scroll(duration, 0, speed)
 
 
 @failSafeCheck
 def mouseMove(destination_loc):
-    mouse.position = destination_loc
-
-
-@failSafeCheck
-def mouseSmoothMove(
-    destination_loc,
-    speed: float = None,
-):
-    start_time = time.time()
-
-    def vector_diff(vec1, vec2):
-        return vec2[0] - vec1[0], vec2[1] - vec1[1]
-
-    interruptions = 0
-
-    speed = speed if speed is not None else config.MOUSE_MOVE_SPEED
-    speed_multiplier = 1000
-    speed *= speed_multiplier
-    if speed < 0:
-        speed = 1
-
-    start_x, start_y = mouse.position
-    direction_vector = vector_diff(mouse.position, destination_loc)
+    _setMousePosition(destination_loc)
 
-    distance = math.sqrt(direction_vector[0] ** 2 + direction_vector[1] ** 2)
-    distance = round(distance)
 
-    duration = distance / speed
+# number of points of a trajectory where the mouse position is checked for interruptions
+_INTERRUPTION_CHECKS = 8
 
-    steps = round(0.0618 * distance * speed_multiplier / speed)
 
-    if steps < 1:
-        steps = 1
-
-    delta_x = direction_vector[0] / steps
-    delta_y = direction_vector[1] / steps
-
-    # if we use sleep lower than this value, we can't expect accurately sleep duration
-    min_delay = 0.015
-    execute_time = time.time() - start_time
-    sleep_time = (duration - execute_time) / steps
-
-    if sleep_time < min_delay:
-        return mouseMove(destination_loc)
-
-    for step in range(steps):
-        start_time = time.time()
-
-        new_x = int(start_x + delta_x * step)
-        new_y = int(start_y + delta_y * step)
-        mouse.position = (new_x, new_y)
+def _smoothMove(
+    destination_loc, speed: float = None, easing: str = None, path: Trajectory = None
+):
+    """
+    Replays a precomputed trajectory and yields the delay before the next point,
+    the caller sleeps, so the same movement serves both blocking and asyncio code.
+    The points are timed from the start of the movement, the points which are due
+    at once are sent together and pynput skips the late ones,
+    so a long movement keeps its duration even if the sleeps overshoot.
+    """
+    if path is None:
+        path = trajectory(mousePosition(), destination_loc, speed, easing)
 
-        execute_time = time.time() - start_time
-        if execute_time < sleep_time and step != steps - 1:
-            time.sleep(sleep_time - execute_time)
+    count = len(path)
+    check_every = max(count // _INTERRUPTION_CHECKS, 1)
+    checks = -(-count // check_every)
+    tolerance = max(path.max_step * 2, 2)
+    interruptions = 0
 
-        dist2NewPoint = vector_diff(mouse.position, (new_x, new_y))
+    start_time = now()
+    last_point = None
+    index = 0
+    while index < count:
+        elapsed = now() - start_time
+        if path.times[index] > elapsed:
+            yield path.times[index] - elapsed
+            continue
+        # the points up to the current time
+        end = int(np.searchsorted(path.times, elapsed, side="right"))
+        end = min(max(end, index + 1), count)
+
+        checked = -(-index // check_every) * check_every < end or end == count
+        if last_point is not None and checked:
+            position = mousePosition()
+            distance = math.hypot(
+                position[0] - last_point[0], position[1] - last_point[1]
+            )
+            if distance > tolerance:
+                interruptions += 1
+                if interruptions > checks * 0.5 or end == count:
+                    raise PysikuliException("Mouse movement has been interrupted")
 
-        if (
-            abs(dist2NewPoint[0]) > abs(delta_x) * 2
-            and abs(dist2NewPoint[1]) > abs(delta_y) * 2
-        ):
-            interruptions += 1
+        points = [(int(x), int(y)) for x, y in path.points[index:end]]
+        _setMousePath(points)
+        last_point = points[-1]
+        index = end
 
-        if interruptions > steps * 0.5:
-            raise PysikuliException("Mouse movement has been interrupted")
 
-    dist2point = vector_diff(mouse.position, destination_loc)
+@failSafeCheck
+def mouseSmoothMove(
+    destination_loc,
+    speed: float = None,
+    easing: str = None,
+):
+    """
+    Moves the mouse along a precomputed path, see pysikuli.trajectory()
 
-    if (
-        abs(dist2point[0]) <= abs(delta_x) * 2
-        and abs(dist2point[1]) <= abs(delta_y) * 2
-    ):
-        mouse.position = destination_loc
-    else:
-        raise PysikuliException("Mouse movement has been interrupted")
+    Args:
+        destination_loc (tuple): x, y of the destination
+        speed (float, optional): pixels per millisecond. Defaults to config.MOUSE_MOVE_SPEED.
+        easing (str, optional): "linear", "ease-in-out" or "bezier". Defaults to config.MOUSE_MOVE_EASING.
+    """
+    _checkDeadline()
+    for delay in _smoothMove(destination_loc, speed, easing):
+        preciseSleep(delay, "mouseSmoothMove")
+        _checkDeadline()
 
 
 def mouseMoveRelative(
     xOffset,
     yOffset,
     speed: float = None,
+    easing: str = None,
 ):
+    position = mousePosition()
     new_loc = (
-        mouse.position[0] + xOffset,
-        mouse.position[1] + yOffset,
+        position[0] + xOffset,
+        position[1] + yOffset,
     )
-    mouseSmoothMove(destination_loc=new_loc, speed=speed)
+    mouseSmoothMove(destination_loc=new_loc, speed=speed, easing=easing)
 
 
 @failSafeCheck
@@ -1122,13 +1932,16 @@ def click(
 
         mouseSmoothMove(destination_loc=(x, y))
 
-        time.sleep(interval)
+    pacer = Pacer(interval, "click")
+    if loc_or_pic:
+        pacer.wait()
 
     for _ in range(clicks):
         _failSafeCheck()
         mouse.click(button, 1)
+        result_cache.clear()
 
-        time.sleep(interval)
+        pacer.wait()
 
 
 def rightClick(
@@ -1184,6 +1997,7 @@ def dragDrop(
     start_location=None,
     speed: float = None,
     button: Button = None,
+    easing: str = None,
 ):
     """_summary_
 
@@ -1194,12 +2008,12 @@ def dragDrop(
     """
 
     if not start_location:
-        start_location = mouse.position
+        start_location = mousePosition()
 
-    mouseSmoothMove(destination_loc=start_location)
-    mousePress(button)
-    mouseSmoothMove(destination_loc=destination_loc, speed=speed)
+    mouseSmoothMove(destination_loc=start_location, easing=easing)
     mousePress(button)
+    mouseSmoothMove(destination_loc=destination_loc, speed=speed, easing=easing)
+    mouseRelease(button)
 
 
 def saveNumpyImg(image: np.ndarray, name):
@@ -0,0 +1,103 @@
+# module for memoizing match results of screen contents which have been seen before
+from collections import OrderedDict
+import numpy as np
+import threading
+import hashlib
+import os
+
+from ._config import config
+
+
+def _contentKey(array):
+    """
+    Returns the key of the array content: the shape, the dtype
+    and a 128-bit blake2b digest of the bytes, wide enough to never collide in practice
+    """
+    array = np.ascontiguousarray(array)
+    return array.shape, array.dtype.str, hashlib.blake2b(array, digest_size=16).digest()
+
+
+def _templateKey(image):
+    if isinstance(image, str):
+        # the file can be overwritten between searches
+        return image, os.path.getmtime(image)
+    elif isinstance(image, np.ndarray):
+        return _contentKey(image)
+    return None
+
+
+class MatchMemo(object):
+    """
+    Bounded LRU of exist() results keyed by the region pixels.
+
+    The screen often returns to a state it has shown before, like a toolbar or a dialog,
+    so a frame with the same pixels (Frame.digest) gives the same best match
+    for the same template and settings without cv2.matchTemplate.
+    Only the best score and location are stored, the precision and pixel colors
+    are checked against them as usual.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        return (
+            f"MatchMemo(entries={len(self._entries)}, hits={self.hits}, "
+            f"misses={self.misses})"
+        )
+
+    __repr__ = __str__
+
+    @staticmethod
+    def key(frame, image, grayscale: bool):
+        """
+        Returns the memo key of the search or None if the template can't be memoized
+        """
+        template_key = _templateKey(image)
+        if template_key is None:
+            return None
+        return (
+            frame.digest,
+            frame.tuple_region,
+            template_key,
+            grayscale,
+            config.COMPRESSION_RATIO,
+        )
+
+    def get(self, key):
+        """
+        Returns tuple(score, location) of the stored result or None
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, score: float, location: tuple):
+        with self._lock:
+            self._entries[key] = (score, location)
+            self._entries.move_to_end(key)
+            while len(self._entries) > config.MATCH_MEMO_SIZE:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def resetStats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+match_memo = MatchMemo()
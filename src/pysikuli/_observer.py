@@ -0,0 +1,406 @@
+# module for observing regions in the background with onAppear, onVanish and onChange callbacks
+import threading
+import logging
+import time
+
+from ._config import config
+from ._main import (
+    exist,
+    _regionNormalization,
+    _regionToFrame,
+    _unionRegion,
+    _changedPart,
+)
+
+APPEAR = "appear"
+VANISH = "vanish"
+CHANGE = "change"
+EVENTS = (APPEAR, VANISH, CHANGE)
+
+# the CPU budget is a token bucket, it can save up to 1 second of the budget for bursts
+_BUDGET_BURST = 1.0
+# seconds before the next capture after a failed one, for the observers with interval 0
+_MIN_RETRY = 0.1
+
+
+class ObserveEvent(object):
+    __slots__ = ("type", "observer", "match", "changed", "timestamp")
+
+    def __init__(self, event_type, observer, match=None, changed=0.0, timestamp=None):
+        self.type = event_type
+        self.observer = observer
+        self.match = match
+        self.changed = changed
+        self.timestamp = timestamp
+
+    def __str__(self):
+        return (
+            f"ObserveEvent(type={self.type!r}, match={self.match}, "
+            f"changed={self.changed:.3f}, timestamp={self.timestamp})"
+        )
+
+    __repr__ = __str__
+
+
+class Observer(object):
+    """
+    One registered event of a region, the callback is called with ObserveEvent
+    in the scheduler thread:
+
+        - appear: the image has appeared in the region, including the first check
+        - vanish: the image has vanished from the region, including the first check
+        - change: more than `min_changed` part of the region has changed since the last check
+    """
+
+    def __init__(
+        self,
+        event,
+        callback,
+        image=None,
+        region=None,
+        interval: float = None,
+        priority: int = 0,
+        grayscale: bool = None,
+        precision: float = None,
+        min_changed: float = None,
+    ):
+        if event not in EVENTS:
+            raise ValueError(f"Unknown event: {event}, supported: {EVENTS}")
+        if event != CHANGE and image is None:
+            raise ValueError(f"image is required for the {event} event")
+
+        self.tuple_region = _regionNormalization(region)
+        if self.tuple_region is None:
+            raise TypeError("Observers need a screen region, not np.ndarray")
+
+        self.event = event
+        self.callback = callback
+        self.image = image
+        self.interval = interval if interval is not None else config.OBSERVE_INTERVAL
+        self.priority = priority
+        self.grayscale = grayscale
+        self.precision = precision
+        self.min_changed = (
+            min_changed if min_changed is not None else config.MIN_CHANGED
+        )
+
+        self.paused = False
+        self.stopped = False
+        self.next_run = 0.0
+
+        self.checks = 0
+        self.fired = 0
+        self.cpu_time = 0.0
+
+        self._present = None
+        self._baseline = None
+        self._scheduler = None
+
+    def __str__(self):
+        return (
+            f"<Observer {self.event} {self.image!r} in {self.tuple_region}, "
+            f"interval={self.interval}, priority={self.priority}>"
+        )
+
+    __repr__ = __str__
+
+    @property
+    def active(self):
+        return not (self.paused or self.stopped)
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+        if self._scheduler is not None:
+            self._scheduler._wakeup.set()
+
+    def stop(self):
+        self.stopped = True
+        if self._scheduler is not None:
+            self._scheduler.remove(self)
+
+    def _check(self, frame):
+        """
+        Checks the frame of the observer's region and returns ObserveEvent if it has fired
+        """
+        self.checks += 1
+        if self.event == CHANGE:
+            previous, self._baseline = self._baseline, frame
+            if previous is None:
+                return None
+            changed = _changedPart(frame, previous)
+            if changed < self.min_changed:
+                return None
+            return ObserveEvent(
+                CHANGE, self, changed=changed, timestamp=frame.timestamp
+            )
+
+        _match = exist(
+            image=self.image,
+            region=frame,
+            grayscale=self.grayscale,
+            precision=self.precision,
+        )
+        present = _match is not None
+        previous, self._present = self._present, present
+        if present == previous:
+            return None
+        if self.event == APPEAR and present:
+            return ObserveEvent(APPEAR, self, match=_match, timestamp=frame.timestamp)
+        if self.event == VANISH and not present:
+            return ObserveEvent(VANISH, self, timestamp=frame.timestamp)
+        return None
+
+
+class ObserverScheduler(object):
+    """
+    Services all observers from one background thread.
+
+    Each cycle captures the union of the due observers' regions once and checks
+    them by priority while the CPU budget allows, the rest stay due for the next cycle.
+    The budget is a part of one CPU core, including the callbacks' time.
+    """
+
+    def __init__(self, cpu_budget: float = None):
+        self.cpu_budget = (
+            cpu_budget if cpu_budget is not None else config.OBSERVE_CPU_BUDGET
+        )
+        self._observers = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._running = False
+        self._paused = False
+        self._credit = self.cpu_budget * _BUDGET_BURST
+        self._last_refill = time.monotonic()
+
+    def __len__(self):
+        return len(self._observers)
+
+    @property
+    def observers(self):
+        with self._lock:
+            return list(self._observers)
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def add(self, observer: Observer):
+        with self._lock:
+            observer._scheduler = self
+            observer.stopped = False
+            observer.next_run = 0.0
+            self._observers.append(observer)
+        self.start()
+        self._wakeup.set()
+        return observer
+
+    def remove(self, observer: Observer):
+        with self._lock:
+            if observer in self._observers:
+                self._observers.remove(observer)
+        observer.stopped = True
+
+    def clear(self):
+        for observer in self.observers:
+            self.remove(observer)
+
+    def pause(self):
+        """
+        Pauses all observers, the scheduler thread keeps running
+        """
+        self._paused = True
+
+    def resume(self):
+        self._paused = False
+        self._wakeup.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="pysikuli-observer", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self, timeout: float = None):
+        """
+        Stops the scheduler thread, the observers stay registered until clear()
+        """
+        self._running = False
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while self._running:
+            delay = self._cycle()
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+
+    def _refill(self, now):
+        self._credit = min(
+            self._credit + (now - self._last_refill) * self.cpu_budget,
+            self.cpu_budget * _BUDGET_BURST,
+        )
+        self._last_refill = now
+
+    def _cycle(self):
+        """
+        Runs one cycle and returns the delay until the next one
+        """
+        now = time.monotonic()
+        self._refill(now)
+
+        active = [observer for observer in self.observers if observer.active]
+        if self._paused or not active:
+            return config.OBSERVE_INTERVAL
+        if self._credit <= 0:
+            return -self._credit / self.cpu_budget
+
+        due = [observer for observer in active if observer.next_run <= now]
+        if not due:
+            return min(observer.next_run for observer in active) - now
+
+        # the most overdue observers of the same priority go first, so none of them starves
+        due.sort(key=lambda observer: (-observer.priority, observer.next_run))
+
+        start_cpu = time.thread_time()
+        try:
+            frame = _regionToFrame(_unionRegion([o.tuple_region for o in due]))
+        except Exception:
+            logging.exception("observer scheduler: the screen capture has failed")
+            frame = None
+        self._credit -= time.thread_time() - start_cpu
+        if frame is None:
+            # the due observers retry after their interval, the thread keeps running
+            for observer in due:
+                observer.next_run = now + observer.interval
+            return max(min(observer.interval for observer in due), _MIN_RETRY)
+        crops = {frame.tuple_region: frame}
+
+        for observer in due:
+            if self._credit <= 0:
+                break
+            if not observer.active:
+                continue
+            start_cpu = time.thread_time()
+            try:
+                if observer.tuple_region not in crops:
+                    crops[observer.tuple_region] = frame.crop(observer.tuple_region)
+                event = observer._check(crops[observer.tuple_region])
+                if event is not None:
+                    observer.fired += 1
+                    observer.callback(event)
+            except Exception:
+                logging.exception(f"observer failed: {observer}")
+            observer.next_run = now + observer.interval
+            spent = time.thread_time() - start_cpu
+            observer.cpu_time += spent
+            self._credit -= spent
+
+        active = [observer for observer in self.observers if observer.active]
+        if not active:
+            return config.OBSERVE_INTERVAL
+        delay = min(observer.next_run for observer in active) - time.monotonic()
+        if self._credit <= 0:
+            delay = max(delay, -self._credit / self.cpu_budget)
+        return max(delay, 0)
+
+
+observers = ObserverScheduler()
+
+
+def observe(
+    event,
+    callback,
+    image=None,
+    region=None,
+    interval: float = None,
+    priority: int = 0,
+    grayscale: bool = None,
+    precision: float = None,
+    min_changed: float = None,
+):
+    """
+    Registers an observer in the shared scheduler and returns it,
+    the observer can be paused, resumed or stopped.
+    """
+    return observers.add(
+        Observer(
+            event,
+            callback,
+            image=image,
+            region=region,
+            interval=interval,
+            priority=priority,
+            grayscale=grayscale,
+            precision=precision,
+            min_changed=min_changed,
+        )
+    )
+
+
+def onAppear(
+    image,
+    callback,
+    region=None,
+    interval: float = None,
+    priority: int = 0,
+    grayscale: bool = None,
+    precision: float = None,
+):
+    return observe(
+        APPEAR,
+        callback,
+        image=image,
+        region=region,
+        interval=interval,
+        priority=priority,
+        grayscale=grayscale,
+        precision=precision,
+    )
+
+
+def onVanish(
+    image,
+    callback,
+    region=None,
+    interval: float = None,
+    priority: int = 0,
+    grayscale: bool = None,
+    precision: float = None,
+):
+    return observe(
+        VANISH,
+        callback,
+        image=image,
+        region=region,
+        interval=interval,
+        priority=priority,
+        grayscale=grayscale,
+        precision=precision,
+    )
+
+
+def onChange(
+    callback,
+    region=None,
+    interval: float = None,
+    priority: int = 0,
+    min_changed: float = None,
+):
+    return observe(
+        CHANGE,
+        callback,
+        region=region,
+        interval=interval,
+        priority=priority,
+        min_changed=min_changed,
+    )
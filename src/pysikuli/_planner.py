@@ -0,0 +1,401 @@
+# module for choosing the cheapest image search strategy for each search
+import numpy as np
+import logging
+import math
+import time
+import cv2
+
+from ._config import config
+from ._main import (
+    Match,
+    _regionToNumpyArray,
+    _imageToNumpyArray,
+    _imgDownsize,
+    _getCenterLoc,
+    _toGray,
+)
+
+FULL = "full"
+DOWNSCALED = "downscaled"
+TILED = "tiled"
+PRIOR_WINDOW = "prior_window"
+STRATEGIES = (FULL, DOWNSCALED, TILED, PRIOR_WINDOW)
+
+# a downscaled template smaller than this value can't be reliably recognized
+_MIN_DOWNSCALED_SIDE = 8
+# below this success rate the downscaled search is considered imprecise
+_MIN_RELIABILITY = 0.9
+# tiled search makes sense only if the region contains at least this number of tiles
+_MIN_TILES = 4
+_MAX_TILES_PER_SIDE = 4
+# weight of the last measurement in the moving average of the timings
+_EWMA_WEIGHT = 0.2
+
+
+def _correlate(np_region: np.ndarray, np_image: np.ndarray):
+    cv2_match = cv2.matchTemplate(np_region, np_image, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(cv2_match)
+    return max_val, max_loc
+
+
+def _crop(np_img: np.ndarray, x1, y1, x2, y2):
+    return np_img[y1:y2, x1:x2]
+
+
+class _TemplateHistory(object):
+    __slots__ = ("loc", "found", "prior_hits", "downscaled_hits")
+
+    def __init__(self):
+        # last found up-left location relative to the screen
+        self.loc = None
+        # [successes, tries] with Laplace smoothing in the rate calculation
+        self.found = [0, 0]
+        self.prior_hits = [0, 0]
+        self.downscaled_hits = [0, 0]
+
+    @staticmethod
+    def rate(counter):
+        return (counter[0] + 1) / (counter[1] + 2)
+
+
+class MatchPlanner(object):
+    """
+    Estimates the cost of every search strategy and executes the cheapest one
+    that keeps the required precision.
+
+    Strategies:
+        - full: `TM_CCOEFF_NORMED` over the whole region at full resolution
+        - downscaled: search on a downscaled frame, then refine at full resolution
+        - tiled: search tile by tile starting near the expected location, stop at the first match
+        - prior_window: search only around the location of the previous match
+
+    The cost is the number of processed pixels multiplied by the measured time per
+    pixel of the strategy on this machine, the expected cost of the fallback to the
+    full search is added according to the history of each template.
+    """
+
+    def __init__(self):
+        self._seconds_per_pixel = {}
+        self._history = {}
+        self.last_report = ""
+
+    def calibrate(self):
+        """
+        Measures the search speed on this machine, called automatically on the first search
+        """
+        rng = np.random.default_rng(0)
+        np_region = rng.integers(0, 255, (512, 512), np.uint8)
+        np_image = np.ascontiguousarray(np_region[100:132, 100:132])
+
+        _correlate(np_region, np_image)  # warm up
+        start = time.perf_counter()
+        _correlate(np_region, np_image)
+        seconds_per_pixel = (time.perf_counter() - start) / np_region.size
+
+        for strategy in STRATEGIES:
+            self._seconds_per_pixel[strategy] = seconds_per_pixel
+
+    def forget(self, key=None):
+        """
+        Clears the search history of the template or of all templates
+        """
+        if key is None:
+            self._history.clear()
+        else:
+            self._history.pop(key, None)
+
+    def _templateKey(self, image, np_image):
+        if isinstance(image, str):
+            return image
+        return (np_image.shape, hash(np_image.tobytes()))
+
+    def _tiles(self, reg_width, reg_height, img_width, img_height):
+        cols = min(_MAX_TILES_PER_SIDE, max(1, reg_width // (img_width * 2)))
+        rows = min(_MAX_TILES_PER_SIDE, max(1, reg_height // (img_height * 2)))
+        tiles = []
+        for row in range(rows):
+            for col in range(cols):
+                x1 = reg_width * col // cols
+                y1 = reg_height * row // rows
+                # the tile is expanded by the template size to not lose matches on the borders
+                x2 = min(reg_width, reg_width * (col + 1) // cols + img_width - 1)
+                y2 = min(reg_height, reg_height * (row + 1) // rows + img_height - 1)
+                tiles.append((x1, y1, x2, y2))
+        return tiles
+
+    def _priorWindow(self, prior_loc, reg_width, reg_height, img_width, img_height):
+        if prior_loc is None:
+            return None
+        margin = max(16, min(img_width, img_height))
+        x1 = max(0, prior_loc[0] - margin)
+        y1 = max(0, prior_loc[1] - margin)
+        x2 = min(reg_width, prior_loc[0] + img_width + margin)
+        y2 = min(reg_height, prior_loc[1] + img_height + margin)
+        if x2 - x1 < img_width or y2 - y1 < img_height:
+            return None
+        return x1, y1, x2, y2
+
+    def plan(self, np_image, np_region, key, prior_loc=None):
+        """
+        Returns the list of estimations sorted by the cost:
+        [(strategy, eligible, seconds, reason), ...]
+        """
+        if not self._seconds_per_pixel:
+            self.calibrate()
+
+        history = self._history.get(key, _TemplateHistory())
+        img_height, img_width = np_image.shape[:2]
+        reg_height, reg_width = np_region.shape[:2]
+        channels = 1 if len(np_region.shape) < 3 else np_region.shape[2]
+        full_pixels = reg_width * reg_height * channels
+        p_found = _TemplateHistory.rate(history.found)
+
+        estimations = []
+
+        def estimate(strategy, pixels, eligible, reason):
+            seconds = pixels * self._seconds_per_pixel[strategy]
+            estimations.append((strategy, eligible, seconds, reason))
+
+        estimate(FULL, full_pixels, True, "always precise")
+
+        ratio = max(2, config.COMPRESSION_RATIO)
+        reliability = _TemplateHistory.rate(history.downscaled_hits)
+        misses = history.downscaled_hits[1] - history.downscaled_hits[0]
+        refine_pixels = (img_width + 2 * ratio) * (img_height + 2 * ratio) * channels
+        # each downscaled miss is confirmed by the full search
+        downscaled_pixels = (
+            full_pixels / ratio**2
+            + refine_pixels
+            + (1 - p_found * reliability) * full_pixels
+        )
+        if min(img_width, img_height) / ratio < _MIN_DOWNSCALED_SIDE:
+            estimate(DOWNSCALED, downscaled_pixels, False, "template is too small")
+        elif reliability < _MIN_RELIABILITY and misses:
+            estimate(DOWNSCALED, downscaled_pixels, False, "missed matches before")
+        else:
+            estimate(DOWNSCALED, downscaled_pixels, True, f"ratio {ratio}")
+
+        tiles = self._tiles(reg_width, reg_height, img_width, img_height)
+        tiles_pixels = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in tiles) * channels
+        # with a known location the first tile usually contains the match
+        if prior_loc is not None:
+            p_first = _TemplateHistory.rate(history.prior_hits)
+            fraction = p_first / len(tiles) + (1 - p_first) * (0.5 * p_found + 1 - p_found)
+        else:
+            fraction = 0.5 * p_found + (1 - p_found)
+        if len(tiles) < _MIN_TILES:
+            estimate(TILED, tiles_pixels, False, f"only {len(tiles)} tiles")
+        else:
+            estimate(TILED, tiles_pixels * fraction, True, f"{len(tiles)} tiles")
+
+        window = self._priorWindow(prior_loc, reg_width, reg_height, img_width, img_height)
+        if window is None:
+            estimate(PRIOR_WINDOW, math.inf, False, "no previous match in the region")
+        else:
+            x1, y1, x2, y2 = window
+            p_hit = _TemplateHistory.rate(history.prior_hits)
+            window_pixels = (x2 - x1) * (y2 - y1) * channels
+            estimate(
+                PRIOR_WINDOW,
+                window_pixels + (1 - p_hit) * full_pixels,
+                True,
+                f"hit rate {p_hit:.2f}",
+            )
+
+        estimations.sort(key=lambda e: (not e[1], e[2]))
+        return estimations
+
+    def _searchFull(self, np_image, np_region, precision, prior_loc):
+        score, loc = _correlate(np_region, np_image)
+        return score, loc, np_region.size
+
+    def _searchDownscaled(self, np_image, np_region, precision, prior_loc):
+        ratio = max(2, config.COMPRESSION_RATIO)
+        small_region = _imgDownsize(np_region, ratio)
+        _, loc = _correlate(small_region, _imgDownsize(np_image, ratio))
+
+        # refine the location at full resolution
+        img_height, img_width = np_image.shape[:2]
+        reg_height, reg_width = np_region.shape[:2]
+        x1 = max(0, loc[0] * ratio - ratio)
+        y1 = max(0, loc[1] * ratio - ratio)
+        x2 = min(reg_width, loc[0] * ratio + img_width + ratio)
+        y2 = min(reg_height, loc[1] * ratio + img_height + ratio)
+        window = _crop(np_region, x1, y1, x2, y2)
+        score, loc = _correlate(window, np_image)
+        return score, (x1 + loc[0], y1 + loc[1]), small_region.size + window.size
+
+    def _searchTiled(self, np_image, np_region, precision, prior_loc):
+        img_height, img_width = np_image.shape[:2]
+        reg_height, reg_width = np_region.shape[:2]
+        tiles = self._tiles(reg_width, reg_height, img_width, img_height)
+
+        target = prior_loc if prior_loc is not None else (reg_width / 2, reg_height / 2)
+        tiles.sort(
+            key=lambda t: ((t[0] + t[2] - img_width) / 2 - target[0]) ** 2
+            + ((t[1] + t[3] - img_height) / 2 - target[1]) ** 2
+        )
+
+        best_score, best_loc, pixels = -1.0, (0, 0), 0
+        for x1, y1, x2, y2 in tiles:
+            tile = _crop(np_region, x1, y1, x2, y2)
+            score, loc = _correlate(tile, np_image)
+            pixels += tile.size
+            if score > best_score:
+                best_score, best_loc = score, (x1 + loc[0], y1 + loc[1])
+            if best_score >= precision:
+                break
+        return best_score, best_loc, pixels
+
+    def _searchPriorWindow(self, np_image, np_region, precision, prior_loc):
+        img_height, img_width = np_image.shape[:2]
+        reg_height, reg_width = np_region.shape[:2]
+        x1, y1, x2, y2 = self._priorWindow(
+            prior_loc, reg_width, reg_height, img_width, img_height
+        )
+        window = _crop(np_region, x1, y1, x2, y2)
+        score, loc = _correlate(window, np_image)
+        return score, (x1 + loc[0], y1 + loc[1]), window.size
+
+    def _execute(self, strategy, np_image, np_region, precision, prior_loc):
+        search = {
+            FULL: self._searchFull,
+            DOWNSCALED: self._searchDownscaled,
+            TILED: self._searchTiled,
+            PRIOR_WINDOW: self._searchPriorWindow,
+        }[strategy]
+
+        start = time.perf_counter()
+        score, loc, pixels = search(np_image, np_region, precision, prior_loc)
+        elapsed = time.perf_counter() - start
+
+        measured = elapsed / max(pixels, 1)
+        self._seconds_per_pixel[strategy] += _EWMA_WEIGHT * (
+            measured - self._seconds_per_pixel[strategy]
+        )
+        return score, loc, elapsed
+
+    def exist(
+        self,
+        image,
+        region=None,
+        grayscale: bool = None,
+        precision: float = None,
+        tuple_region: tuple | list = None,
+    ):
+        """
+        Same as `exist()`, but the search strategy is chosen by the planner.
+
+        Returns:
+            Match | None
+        """
+        grayscale = grayscale if grayscale is not None else config.GRAYSCALE
+        precision = precision if precision is not None else config.MIN_PRECISION
+
+        np_region, tuple_region = _regionToNumpyArray(region, tuple_region)
+        np_image = _imageToNumpyArray(image)
+        key = self._templateKey(image, np_image)
+
+        img_height, img_width = np_image.shape[:2]
+        reg_height, reg_width = np_region.shape[:2]
+        if img_height > reg_height or img_width > reg_width:
+            raise ValueError(
+                f"The region ({np_region.shape}) is smaller than the image ({np_image.shape}) you are looking for"
+            )
+
+        if grayscale or len(np_image.shape) < 3:
+            search_image, search_region = _toGray(np_image), _toGray(np_region)
+        else:
+            search_image, search_region = np_image[:, :, :3], np_region[:, :, :3]
+
+        history = self._history.setdefault(key, _TemplateHistory())
+        prior_loc = None
+        if history.loc is not None:
+            prior_loc = (
+                history.loc[0] - tuple_region[0],
+                history.loc[1] - tuple_region[1],
+            )
+
+        estimations = self.plan(search_image, search_region, key, prior_loc)
+        strategy = estimations[0][0]
+        score, loc, elapsed = self._execute(
+            strategy, search_image, search_region, precision, prior_loc
+        )
+        fallback = ""
+
+        if strategy == PRIOR_WINDOW:
+            history.prior_hits[1] += 1
+            if score >= precision:
+                history.prior_hits[0] += 1
+            else:
+                score, loc, elapsed_full = self._execute(
+                    FULL, search_image, search_region, precision, prior_loc
+                )
+                elapsed += elapsed_full
+                fallback = f" with fallback to {FULL}"
+
+        elif strategy == DOWNSCALED and score >= precision:
+            history.downscaled_hits[0] += 1
+            history.downscaled_hits[1] += 1
+
+        # the downscaled frame can lose the fine details, so a miss is only trusted
+        # after the full search
+        elif strategy == DOWNSCALED:
+            full_score, full_loc, elapsed_full = self._execute(
+                FULL, search_image, search_region, precision, prior_loc
+            )
+            history.downscaled_hits[1] += 1
+            if full_score < precision:
+                history.downscaled_hits[0] += 1
+            score, loc = full_score, full_loc
+            elapsed += elapsed_full
+            fallback = f" with fallback to {FULL}"
+
+        score = round(score, 6)
+        history.found[1] += 1
+        if score >= precision:
+            history.found[0] += 1
+            history.loc = (tuple_region[0] + loc[0], tuple_region[1] + loc[1])
+
+        self.last_report = self._report(
+            image, estimations, strategy + fallback, elapsed, score, precision
+        )
+        logging.debug(self.last_report)
+
+        if score < precision:
+            return None
+
+        loc_abs = (tuple_region[0] + loc[0], tuple_region[1] + loc[1])
+        return Match(
+            up_left_loc=loc_abs,
+            center_loc=_getCenterLoc(img_width, img_height, loc_abs),
+            relative_loc_center=_getCenterLoc(img_width, img_height, loc),
+            score=score,
+            precision=precision,
+            np_image=np_image,
+            np_region=np_region,
+            tuple_region=tuple_region,
+        )
+
+    def _report(self, image, estimations, chosen, elapsed, score, precision):
+        image = image if isinstance(image, str) else type(image)
+        lines = [f"planner: {image}"]
+        for strategy, eligible, seconds, reason in estimations:
+            status = "eligible" if eligible else "skipped"
+            lines.append(
+                f"  {strategy:<13} {seconds * 1000:>9.3f} ms  {status:<8}  {reason}"
+            )
+        lines.append(
+            f"  chosen: {chosen}, took {elapsed * 1000:.3f} ms, "
+            f"score: {score} precision: {precision}"
+        )
+        return "\n".join(lines)
+
+    def report(self):
+        """
+        Returns the explanation of the last decision
+        """
+        return self.last_report
+
+
+planner = MatchPlanner()
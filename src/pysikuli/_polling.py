@@ -0,0 +1,146 @@
+# module for pacing the search loops of find(), wait() and waitWhileExist()
+import asyncio
+import logging
+import time
+
+from ._config import config
+from ._deadline import _limitTime, _checkCancelled, _sleep
+from ._failsafe import _checkTriggered
+
+FIXED = "fixed"
+BACKOFF = "backoff"
+REFRESH = "refresh"
+DEADLINE = "deadline"
+POLICIES = (FIXED, BACKOFF, REFRESH, DEADLINE)
+
+
+class PollStats(object):
+    __slots__ = ("policy", "polls", "wall_time", "cpu_time", "sleep_time")
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.polls = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.sleep_time = 0.0
+
+    def __str__(self):
+        return (
+            f"PollStats(policy={self.policy!r}, polls={self.polls}, "
+            f"wall_time={self.wall_time:.4f}, cpu_time={self.cpu_time:.4f}, "
+            f"sleep_time={self.sleep_time:.4f})"
+        )
+
+    __repr__ = __str__
+
+
+_last_stats = PollStats(FIXED)
+
+
+def lastPollStats():
+    """
+    Returns poll count, wall time, CPU time and sleep time of the last finished wait,
+    the CPU time is of the whole process, as the async searches run in the executor
+    """
+    return _last_stats
+
+
+class Poller(object):
+    """
+    Iterates over the polls of a search loop until `max_search_time` is over,
+    sleeping between polls according to the policy:
+
+        - fixed: sleeps `time_step` after each poll
+        - backoff: starts with one refresh interval and doubles it up to POLL_MAX_INTERVAL
+        - refresh: polls once per screen refresh, aligned to the refresh interval
+        - deadline: the same as backoff, but never sleeps past the deadline
+          and always makes the last poll at the deadline
+
+    `time_step` is also the minimal interval between polls for all policies.
+    Inside a Deadline the search time is limited by its remaining time,
+    and a cancelled Deadline raises CancelledException before the next poll,
+    as well as the triggered fail-safe watcher raises FailSafeException.
+    """
+
+    def __init__(self, max_search_time: float, time_step: float = None, policy=None):
+        self.max_search_time = _limitTime(max_search_time)
+        self.time_step = time_step if time_step is not None else config.TIME_STEP
+        self.policy = policy if policy is not None else config.POLLING_POLICY
+        if self.policy not in POLICIES:
+            raise ValueError(
+                f"Unknown polling policy: {self.policy}, supported: {POLICIES}"
+            )
+        self.stats = PollStats(self.policy)
+
+    def _intervals(self):
+        refresh_interval = 1 / config.REFRESH_RATE
+        if self.policy == FIXED:
+            while True:
+                yield self.time_step
+        elif self.policy == REFRESH:
+            while True:
+                yield max(self.time_step, refresh_interval)
+        else:
+            interval = max(self.time_step, refresh_interval)
+            while True:
+                yield interval
+                interval = min(interval * 2, max(config.POLL_MAX_INTERVAL, interval))
+
+    def _schedule(self):
+        """
+        Yields the delay before each poll, the caller sleeps and polls,
+        so the same schedule serves both blocking and asyncio loops
+        """
+        global _last_stats
+        stats = self.stats
+        start_time = time.monotonic()
+        start_cpu = time.process_time()
+        deadline = start_time + self.max_search_time
+        next_poll = start_time
+        intervals = self._intervals()
+
+        try:
+            while next_poll < deadline or (
+                self.policy == DEADLINE and next_poll == deadline
+            ):
+                sleep_time = next_poll - time.monotonic()
+                stats.sleep_time += max(sleep_time, 0)
+                stats.polls += 1
+                yield sleep_time
+
+                if self.policy == DEADLINE and next_poll >= deadline:
+                    break
+
+                interval = next(intervals)
+                now = time.monotonic()
+                if self.policy == REFRESH:
+                    # skip the ticks missed by a slow poll instead of catching up
+                    next_poll += interval
+                    if next_poll < now:
+                        next_poll += (now - next_poll) // interval * interval + interval
+                else:
+                    next_poll = now + interval
+                if self.policy == DEADLINE:
+                    next_poll = min(next_poll, deadline)
+        finally:
+            stats.wall_time = time.monotonic() - start_time
+            stats.cpu_time = time.process_time() - start_cpu
+            _last_stats = stats
+            logging.debug(stats)
+
+    def __iter__(self):
+        for sleep_time in self._schedule():
+            _sleep(sleep_time)
+            _checkCancelled()
+            _checkTriggered()
+            yield self.stats.polls
+
+    async def _asyncIter(self):
+        for sleep_time in self._schedule():
+            await asyncio.sleep(max(sleep_time, 0))
+            _checkCancelled()
+            _checkTriggered()
+            yield self.stats.polls
+
+    def __aiter__(self):
+        return self._asyncIter()
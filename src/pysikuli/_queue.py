@@ -0,0 +1,211 @@
+# module for running input actions in order on a dedicated thread
+from concurrent.futures import Future
+import contextvars
+import threading
+import logging
+import queue
+
+from ._exceptions import FailSafeException, CancelledException
+from . import _main
+from . import _scroll
+
+# the functions which can be queued by name, e.g. input_queue.write("text")
+ACTIONS = {
+    name: getattr(module, name)
+    for module, names in (
+        (
+            _main,
+            (
+                "click",
+                "rightClick",
+                "dragDrop",
+                "hotkey",
+                "keyDown",
+                "keyUp",
+                "mouseDown",
+                "mouseMove",
+                "mouseMoveRelative",
+                "mouseSmoothMove",
+                "mouseUp",
+                "paste",
+                "scroll",
+                "hscroll",
+                "vscroll",
+                "tap",
+                "write",
+            ),
+        ),
+        (_scroll, ("scrollBy",)),
+    )
+    for name in names
+}
+
+
+class InputQueue(object):
+    """
+    Runs input actions one by one in a background thread, in the order of submission,
+    so the script can prepare the next search while a long write() or mouse movement
+    is still going, e.g.:
+
+    with input_queue as actions:
+        actions.write("long text")
+        actions.mouseSmoothMove((500, 500))
+        _match = find("pics/button.png")   # runs while the text is typed
+        actions.click(_match)
+    # the block ends after all actions are done
+
+    Each call returns a concurrent.futures.Future. sync() waits for the queued actions
+    and raises the first error since the previous sync(). A FailSafeException stops
+    the queue: the pending actions are cancelled, and submit() and sync() raise it
+    until reset().
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._errors = []
+        self._failure = None
+
+    def __getattr__(self, name):
+        if name in ACTIONS:
+            action = ACTIONS[name]
+
+            def submit(*args, **kwargs):
+                return self.submit(action, *args, **kwargs)
+
+            submit.__name__ = name
+            submit.__doc__ = action.__doc__
+            return submit
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.sync()
+        else:
+            self.cancel()
+        return False
+
+    @property
+    def pending(self):
+        """
+        The number of the queued and running actions
+        """
+        return self._pending
+
+    @property
+    def failure(self):
+        return self._failure
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="pysikuli-input", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, func, *args, **kwargs) -> Future:
+        """
+        Queues func(*args, **kwargs), the current Deadline applies to it as well
+        """
+        future = Future()
+        context = contextvars.copy_context()
+        with self._lock:
+            if self._failure is not None:
+                raise self._failure
+            self._pending += 1
+            self._start()
+        self._queue.put((future, context, func, args, kwargs))
+        return future
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, context, func, args, kwargs = item
+            try:
+                if self._failure is not None:
+                    future.set_exception(self._failure)
+                elif future.set_running_or_notify_cancel():
+                    try:
+                        result = context.run(func, *args, **kwargs)
+                    except BaseException as e:
+                        future.set_exception(e)
+                        self._fail(e)
+                    else:
+                        future.set_result(result)
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                    if self._pending == 0:
+                        self._idle.notify_all()
+
+    def _fail(self, error):
+        logging.debug(f"input queue action failed: {error!r}")
+        with self._lock:
+            self._errors.append(error)
+            if isinstance(error, (FailSafeException, CancelledException)):
+                if self._failure is None:
+                    self._failure = error
+
+    def sync(self, timeout: float = None):
+        """
+        Waits until all queued actions are done and raises the first error
+        since the previous sync(), returns False on timeout
+        """
+        with self._lock:
+            if not self._idle.wait_for(lambda: self._pending == 0, timeout):
+                return False
+            errors, self._errors = self._errors, []
+            failure = self._failure
+        if failure is not None:
+            raise failure
+        if errors:
+            raise errors[0]
+        return True
+
+    def cancel(self):
+        """
+        Cancels the actions which haven't started yet, the running one is finished
+        """
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                continue
+            future = item[0]
+            future.cancel()
+            with self._lock:
+                self._pending -= 1
+                if self._pending == 0:
+                    self._idle.notify_all()
+
+    def reset(self):
+        """
+        Allows new actions after a fail-safe and forgets the errors
+        """
+        with self._lock:
+            self._failure = None
+            self._errors = []
+
+    def shutdown(self, wait: bool = True):
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(None)
+        if wait:
+            thread.join()
+        self._thread = None
+
+
+input_queue = InputQueue()
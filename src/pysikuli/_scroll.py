@@ -0,0 +1,200 @@
+# module for scrolling by a distance or until a target appears
+import numpy as np
+import logging
+import math
+import cv2
+
+from ._config import config
+from ._deadline import _checkDeadline
+from ._timing import Pacer, now, preciseSleep
+from ._trajectory import EASINGS
+from ._main import (
+    mouse,
+    exist,
+    failSafeCheck,
+    _regionNormalization,
+    _regionToFrame,
+    _imageToNumpyArray,
+    _changedPart,
+)
+
+# scroll direction -> (horizontal, vertical) clicks, the same signs as pynput uses
+DIRECTIONS = {
+    "up": (0, 1),
+    "down": (0, -1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
+
+# frames are downscaled by this ratio to measure the scroll shift
+_SHIFT_RATIO = 2
+# phase correlation responses below this value are too weak to trust the shift
+_MIN_SHIFT_RESPONSE = 0.1
+
+
+def scrollSchedule(clicks: int, frames: int, profile: str = None):
+    """
+    Splits the clicks into `frames` batches, one per refresh interval,
+    the size of each batch follows the profile: "linear", "ease-in-out" or "bezier"
+    """
+    profile = profile if profile is not None else config.SCROLL_PROFILE
+    if profile not in EASINGS:
+        raise ValueError(f"Unknown profile {profile!r}, use one of {list(EASINGS)}")
+    frames = max(int(frames), 1)
+    progress = np.arange(1, frames + 1) / frames
+    covered = np.rint(EASINGS[profile](progress) * clicks).astype(np.int64)
+    return np.diff(covered, prepend=0)
+
+
+def _replaySchedule(horizontal: np.ndarray, vertical: np.ndarray, interval: float):
+    pacer = Pacer(interval, "scroll")
+    for dx, dy in zip(horizontal.tolist(), vertical.tolist()):
+        _checkDeadline()
+        if dx or dy:
+            mouse.scroll(dx, dy)
+        pacer.wait()
+
+
+@failSafeCheck
+def scrollBy(
+    dx: int = 0,
+    dy: int = 0,
+    duration: float = None,
+    profile: str = None,
+):
+    """
+    Scrolls by dx, dy clicks, positive dy is up and positive dx is right.
+
+    The clicks are sent in batches, at most one per screen refresh, by a precise
+    schedule spread over the whole `duration`. `duration` defaults to the distance divided by config.SCROLL_SPEED,
+    `profile` ("linear", "ease-in-out" or "bezier") sets the acceleration.
+    """
+    clicks = max(abs(dx), abs(dy))
+    if clicks == 0:
+        return
+    duration = duration if duration is not None else clicks / config.SCROLL_SPEED
+    frames = min(max(math.ceil(duration * config.REFRESH_RATE), 1), clicks)
+    _replaySchedule(
+        scrollSchedule(dx, frames, profile),
+        scrollSchedule(dy, frames, profile),
+        duration / frames,
+    )
+
+
+def _scrollShift(frame, previous, vertical: bool):
+    """
+    Returns how many pixels the content has moved between the frames, or None
+    """
+    image = np.float32(frame.variant("gray", _SHIFT_RATIO))
+    previous_image = np.float32(previous.variant("gray", _SHIFT_RATIO))
+    if image.shape != previous_image.shape:
+        return None
+    (shift_x, shift_y), response = cv2.phaseCorrelate(previous_image, image)
+    if response < _MIN_SHIFT_RESPONSE:
+        return None
+    shift = abs(shift_y if vertical else shift_x) * _SHIFT_RATIO
+    return shift if shift >= 1 else None
+
+
+def _targetCheck(target, grayscale, precision):
+    """
+    Returns tuple(check(frame), target size in pixels along width and height)
+    """
+    if callable(target):
+        return target, (0, 0)
+
+    height, width = _imageToNumpyArray(target).shape[:2]
+
+    def check(frame):
+        return exist(target, region=frame, grayscale=grayscale, precision=precision)
+
+    return check, (width, height)
+
+
+@failSafeCheck
+def scrollUntil(
+    target,
+    region=None,
+    direction: str = "down",
+    max_clicks: int = None,
+    grayscale: bool = None,
+    precision: float = None,
+):
+    """
+    Scrolls until the target appears in the region and returns its Match,
+    or None if the content has stopped moving or max_clicks have been scrolled.
+    `target` is an image or a function which takes a Frame and returns None
+    while the target isn't there.
+
+    The clicks are sent in bursts, the screen is checked on each refresh
+    while it settles after a burst. The bursts grow twice after each one,
+    but never move the content further than the region minus the target size,
+    so the target can't be scrolled past between two checks.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(
+            f"Unknown direction {direction!r}, use one of {list(DIRECTIONS)}"
+        )
+    max_clicks = max_clicks if max_clicks is not None else config.SCROLL_MAX_CLICKS
+    tuple_region = _regionNormalization(region)
+    if tuple_region is None:
+        raise TypeError("scrollUntil needs a screen region, not np.ndarray")
+
+    check, target_size = _targetCheck(target, grayscale, precision)
+    step_x, step_y = DIRECTIONS[direction]
+    vertical = step_y != 0
+    span = (
+        tuple_region[3] - tuple_region[1] - target_size[1]
+        if vertical
+        else tuple_region[2] - tuple_region[0] - target_size[0]
+    )
+
+    frame = _regionToFrame(tuple_region)
+    result = check(frame)
+    if result is not None:
+        return result
+
+    refresh_interval = 1 / config.REFRESH_RATE
+    burst = 1
+    scrolled = 0
+    while scrolled < max_clicks:
+        _checkDeadline()
+        clicks = min(burst, max_clicks - scrolled)
+        mouse.scroll(step_x * clicks, step_y * clicks)
+        scrolled += clicks
+
+        # the application may redraw late or animate the scroll, so the target
+        # is checked on each refresh until the screen has changed and stopped
+        settle_end = now() + config.SCROLL_SETTLE_TIME
+        previous = frame
+        moved = False
+        while True:
+            preciseSleep(refresh_interval)
+            current = _regionToFrame(tuple_region)
+            result = check(current)
+            if result is not None:
+                logging.debug(f"scrollUntil: found after {scrolled} clicks")
+                return result
+            if _changedPart(current, previous) >= config.MIN_CHANGED:
+                moved = True
+            elif moved:
+                break
+            if now() >= settle_end:
+                break
+            previous = current
+
+        if not moved:
+            logging.debug(f"scrollUntil: the content stopped after {scrolled} clicks")
+            return None
+
+        # without a measured shift the burst doesn't grow
+        shift = _scrollShift(current, frame, vertical)
+        if shift is not None:
+            burst = min(
+                burst * 2,
+                max(int(span * clicks / shift), 1),
+                config.SCROLL_MAX_BURST,
+            )
+        frame = current
+
+    return None
@@ -0,0 +1,140 @@
+# module for recognizing the current screen state by downsampled signatures
+import numpy as np
+import logging
+import cv2
+
+from ._config import config
+from ._main import _regionToNumpyArray, _imageToNumpyArray, _toGray
+
+
+def _stateSignature(np_img: np.ndarray, size: tuple) -> np.ndarray:
+    """
+    Downsampled grayscale thumbnail with zero mean and unit norm,
+    so the dot product of two signatures is their correlation coefficient
+    """
+    thumbnail = cv2.resize(_toGray(np_img), size, interpolation=cv2.INTER_AREA)
+    signature = thumbnail.astype(np.float32).flatten()
+    signature -= signature.mean()
+    norm = np.linalg.norm(signature)
+    if norm > 0:
+        signature /= norm
+    return signature
+
+
+class ScreenStates(object):
+    """
+    Recognizes which known screen the application is on with a single capture.
+
+    Every state is recorded as a downsampled signature of a reference screenshot,
+    the current frame is compared with all states at once by one matrix product,
+    so it takes milliseconds instead of a template search per landmark.
+    """
+
+    def __init__(self, region=None, size: tuple = (64, 36)):
+        """
+        Args:
+            region: region which is used for recording and classification. Defaults to the whole screen.
+            size (tuple, optional): width and height of the signature thumbnail. Defaults to (64, 36).
+        """
+        self.region = region
+        self.size = tuple(size)
+        self._names = []
+        self._signatures = np.empty((0, self.size[0] * self.size[1]), np.float32)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    @property
+    def names(self):
+        return list(dict.fromkeys(self._names))
+
+    def _capture(self, screenshot=None, tuple_region=None):
+        if screenshot is not None:
+            return _imageToNumpyArray(screenshot)
+        np_region, _ = _regionToNumpyArray(self.region, tuple_region)
+        return np_region
+
+    def addState(self, name: str, screenshot=None):
+        """
+        Records a named state, several screenshots can be recorded for the same name.
+
+        Args:
+            name (str): state name, e.g. "login", "main_menu"
+            screenshot (str | np.ndarray | ScreenShot, optional): reference screenshot
+            of the region. Defaults to the current content of the region.
+        """
+        signature = _stateSignature(self._capture(screenshot), self.size)
+        self._names.append(name)
+        self._signatures = np.vstack((self._signatures, signature))
+
+    def removeState(self, name: str):
+        keep = [i for i, state in enumerate(self._names) if state != name]
+        self._names = [self._names[i] for i in keep]
+        self._signatures = self._signatures[keep]
+
+    def scores(self, screenshot=None, tuple_region=None) -> dict:
+        """
+        Returns the best correlation of the current frame with every state
+        """
+        if not self._names:
+            return {}
+
+        signature = _stateSignature(self._capture(screenshot, tuple_region), self.size)
+        correlations = self._signatures @ signature
+
+        scores = {}
+        for name, correlation in zip(self._names, correlations.tolist()):
+            scores[name] = max(scores.get(name, -1.0), round(correlation, 6))
+        return scores
+
+    def classify(
+        self,
+        screenshot=None,
+        min_confidence: float = None,
+        tuple_region=None,
+    ):
+        """
+        Recognizes the current screen state.
+
+        Args:
+            screenshot (optional): frame to classify. Defaults to a new capture of the region.
+            min_confidence (float, optional): minimal correlation with the best state.
+            Defaults to config.STATE_MIN_CONFIDENCE.
+
+        Returns:
+            tuple(name, confidence) or None if no state is similar enough
+        """
+        min_confidence = (
+            min_confidence
+            if min_confidence is not None
+            else config.STATE_MIN_CONFIDENCE
+        )
+
+        scores = self.scores(screenshot, tuple_region)
+        if not scores:
+            return None
+
+        name = max(scores, key=scores.get)
+        confidence = scores[name]
+        logging.debug(f"classify(): state {name} confidence: {confidence}")
+
+        if confidence < min_confidence:
+            return None
+        return name, confidence
+
+    def save(self, path: str):
+        np.savez_compressed(
+            path,
+            names=np.array(self._names),
+            signatures=self._signatures,
+            size=np.array(self.size),
+        )
+
+    def load(self, path: str):
+        with np.load(path) as data:
+            self.size = tuple(int(x) for x in data["size"])
+            self._names = [str(name) for name in data["names"]]
+            self._signatures = data["signatures"].astype(np.float32)
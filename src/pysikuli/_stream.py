@@ -0,0 +1,306 @@
+# module for streaming frames of a region and processing them by pipeline stages
+import threading
+import logging
+import time
+
+from ._config import config
+from ._deadline import _limitTime, _checkCancelled
+from ._main import (
+    exist,
+    _regionNormalization,
+    _regionToFrame,
+    _changedPart,
+    _imgDownsize,
+    _toGray,
+    Frame,
+)
+
+
+class StreamStats(object):
+    """
+    Capture statistics of a FrameStream, `dropped` frames were replaced by newer ones
+    before the consumer took them, `failed` captures kept the previous frame,
+    `latency` is the time from capture to delivery
+    """
+
+    __slots__ = (
+        "captured",
+        "delivered",
+        "dropped",
+        "failed",
+        "capture_time",
+        "latency",
+        "max_latency",
+    )
+
+    def __init__(self):
+        self.captured = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self.capture_time = 0.0
+        self.latency = 0.0
+        self.max_latency = 0.0
+
+    @property
+    def mean_capture_time(self):
+        return self.capture_time / self.captured if self.captured else 0.0
+
+    @property
+    def mean_latency(self):
+        return self.latency / self.delivered if self.delivered else 0.0
+
+    def __str__(self):
+        return (
+            f"StreamStats(captured={self.captured}, delivered={self.delivered}, "
+            f"dropped={self.dropped}, failed={self.failed}, "
+            f"mean_capture_time={self.mean_capture_time:.4f}, "
+            f"mean_latency={self.mean_latency:.4f}, "
+            f"max_latency={self.max_latency:.4f})"
+        )
+
+    __repr__ = __str__
+
+
+class StageStats(object):
+    __slots__ = ("name", "calls", "passed", "time")
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.passed = 0
+        self.time = 0.0
+
+    @property
+    def mean_time(self):
+        return self.time / self.calls if self.calls else 0.0
+
+    def __str__(self):
+        return (
+            f"StageStats(name={self.name!r}, calls={self.calls}, "
+            f"passed={self.passed}, mean_time={self.mean_time:.5f})"
+        )
+
+    __repr__ = __str__
+
+
+class Stage(object):
+    """
+    One step of a Pipeline, calls `func` with the result of the previous stage.
+    If `func` returns None, the frame is filtered out and the next stages are skipped.
+    """
+
+    def __init__(self, func, name: str = None):
+        self.func = func
+        self.name = name if name is not None else getattr(func, "__name__", "stage")
+        self.stats = StageStats(self.name)
+
+    def __call__(self, value):
+        start = time.perf_counter()
+        result = self.func(value)
+        self.stats.time += time.perf_counter() - start
+        self.stats.calls += 1
+        if result is not None:
+            self.stats.passed += 1
+        return result
+
+    def __str__(self):
+        return f"<Stage {self.name}>"
+
+    @staticmethod
+    def crop(region):
+        """
+        Frame -> Frame of the region in screen coordinates
+        """
+        tuple_region = _regionNormalization(region)
+        return Stage(lambda frame: frame.crop(tuple_region), "crop")
+
+    @staticmethod
+    def grayscale():
+        """
+        Frame or np.ndarray -> gray np.ndarray, the gray variant of a Frame is reused
+        """
+
+        def grayscale(value):
+            if isinstance(value, Frame):
+                return value.gray
+            return _toGray(value)
+
+        return Stage(grayscale)
+
+    @staticmethod
+    def downscale(ratio: int = None):
+        """
+        Frame or np.ndarray -> np.ndarray downscaled by `ratio`
+        """
+        ratio = ratio if ratio is not None else config.COMPRESSION_RATIO
+
+        def downscale(value):
+            if isinstance(value, Frame):
+                value = value.np_region
+            return _imgDownsize(value, ratio)
+
+        return Stage(downscale)
+
+    @staticmethod
+    def match(image, grayscale: bool = None, precision: float = None):
+        """
+        Frame -> Match, the frames without the image are filtered out
+        """
+
+        def match(frame):
+            return exist(image, region=frame, grayscale=grayscale, precision=precision)
+
+        return Stage(match)
+
+    @staticmethod
+    def diff(min_changed: float = None):
+        """
+        Frame -> Frame, the frames which haven't changed since the last passed one
+        are filtered out, the first frame always passes
+        """
+        previous = []
+
+        def diff(frame):
+            threshold = min_changed if min_changed is not None else config.MIN_CHANGED
+            if previous and _changedPart(frame, previous[0]) < threshold:
+                return None
+            previous[:] = [frame]
+            return frame
+
+        return Stage(diff)
+
+
+class Pipeline(object):
+    """
+    Lazily runs the stages on each frame of the source and yields the results
+    of the frames which have passed all stages
+    """
+
+    def __init__(self, source, stages):
+        self.source = source
+        self.stages = [
+            stage if isinstance(stage, Stage) else Stage(stage) for stage in stages
+        ]
+
+    def pipe(self, *stages):
+        return Pipeline(self.source, self.stages + list(stages))
+
+    @property
+    def stats(self):
+        return [stage.stats for stage in self.stages]
+
+    def __iter__(self):
+        for frame in self.source:
+            value = frame
+            for stage in self.stages:
+                value = stage(value)
+                if value is None:
+                    break
+            else:
+                yield value
+
+
+class FrameStream(object):
+    """
+    Captures the region `fps` times per second in a background thread
+    and yields timestamped frames. Only the latest frame is kept,
+    so a slow consumer gets the current screen, not a queue of stale frames.
+    The stream ends after `duration` seconds or the remaining time of a Deadline.
+    """
+
+    def __init__(self, region=None, fps: float = None, duration: float = None):
+        self.tuple_region = _regionNormalization(region)
+        if self.tuple_region is None:
+            raise TypeError("FrameStream needs a screen region, not np.ndarray")
+        self.fps = fps if fps is not None else config.REFRESH_RATE
+        self.duration = duration
+        self.stats = StreamStats()
+
+        self._latest = None
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def pipe(self, *stages):
+        return Pipeline(self, stages)
+
+    def _capture(self):
+        interval = 1 / self.fps
+        next_capture = time.monotonic()
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            try:
+                frame = _regionToFrame(self.tuple_region)
+            except Exception:
+                logging.exception("FrameStream couldn't capture the region")
+                frame = None
+            capture_time = time.perf_counter() - start
+
+            with self._condition:
+                if frame is None:
+                    # the undelivered frame is still the latest one
+                    self.stats.failed += 1
+                else:
+                    self.stats.captured += 1
+                    self.stats.capture_time += capture_time
+                    if self._latest is not None:
+                        self.stats.dropped += 1
+                    self._latest = frame
+                    self._condition.notify()
+
+            now = time.monotonic()
+            next_capture = max(next_capture + interval, now)
+            self._stop.wait(next_capture - now)
+
+    def __iter__(self):
+        if self._thread is not None:
+            raise RuntimeError("The stream is already running")
+        duration = self.duration if self.duration is not None else float("inf")
+        end_time = time.monotonic() + _limitTime(duration)
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._capture, name="pysikuli-stream", daemon=True
+        )
+        self._thread.start()
+        try:
+            while True:
+                _checkCancelled()
+                with self._condition:
+                    remaining = end_time - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    # wake up at least once per frame interval to check the deadline
+                    timeout = min(remaining, 1 / self.fps)
+                    if self._latest is None:
+                        self._condition.wait(timeout)
+                    frame, self._latest = self._latest, None
+                if frame is None:
+                    continue
+
+                latency = time.time() - frame.timestamp
+                self.stats.delivered += 1
+                self.stats.latency += latency
+                self.stats.max_latency = max(self.stats.max_latency, latency)
+                yield frame
+        finally:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            with self._condition:
+                self._latest = None
+
+
+def frames(region=None, fps: float = None, duration: float = None):
+    """
+    Returns a stream of the region frames, e.g.:
+
+    stream = frames(region, fps=10)
+    for _match in stream.pipe(Stage.diff(), Stage.match("pics/error.png")):
+        ...
+
+    stream.stats shows the captured, delivered and dropped frames,
+    pipeline.stats shows the time of each stage.
+    """
+    return FrameStream(region, fps, duration)
@@ -0,0 +1,176 @@
+# module for precise waits of the paced input loops and their jitter statistics
+import threading
+import time
+
+from ._config import config
+from ._deadline import currentDeadline
+from ._exceptions import CancelledException
+
+# upper bounds in seconds of the lateness histogram buckets, the last bucket is unbounded
+_HISTOGRAM_EDGES = (0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02)
+
+
+def now() -> float:
+    """
+    Monotonic high resolution clock of all paced loops, in seconds
+    """
+    return time.perf_counter()
+
+
+class JitterStats(object):
+    """
+    Lateness of the waits of one loop: how much later than planned each wait has ended
+    """
+
+    __slots__ = ("name", "count", "total", "max_error", "buckets")
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.max_error = 0.0
+        self.buckets = [0] * (len(_HISTOGRAM_EDGES) + 1)
+
+    def record(self, error: float):
+        self.count += 1
+        self.total += error
+        self.max_error = max(self.max_error, error)
+        for index, edge in enumerate(_HISTOGRAM_EDGES):
+            if error < edge:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def histogram(self):
+        """
+        Returns a list of tuple(label, count), e.g. ("< 0.5 ms", 10)
+        """
+        labels = [f"< {edge * 1000:g} ms" for edge in _HISTOGRAM_EDGES]
+        labels.append(f">= {_HISTOGRAM_EDGES[-1] * 1000:g} ms")
+        return list(zip(labels, self.buckets))
+
+    def __str__(self):
+        return (
+            f"JitterStats(name={self.name!r}, count={self.count}, "
+            f"mean={self.mean * 1000:.3f} ms, max={self.max_error * 1000:.3f} ms)"
+        )
+
+    __repr__ = __str__
+
+
+class TimingStats(object):
+    """
+    Jitter statistics of the paced loops by their names:
+    "tap", "write", "hotkey", "scroll", "click" and "mouseSmoothMove",
+    and the dispatch latency of the onHotkey() callbacks: "onHotkey"
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        return self._stats[name]
+
+    def __contains__(self, name):
+        return name in self._stats
+
+    def names(self):
+        return list(self._stats)
+
+    def record(self, name, error: float):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = JitterStats(name)
+            stats.record(error)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def report(self):
+        """
+        Returns the lateness histograms of all loops as text
+        """
+        lines = []
+        with self._lock:
+            for stats in self._stats.values():
+                lines.append(str(stats))
+                width = max(stats.buckets)
+                for label, count in stats.histogram():
+                    bar = "#" * round(count / width * 40) if width else ""
+                    lines.append(f"  {label:>10} {count:>7} {bar}")
+        return "\n".join(lines)
+
+
+timing_stats = TimingStats()
+
+
+def sleepUntil(target: float, name: str = None, spin: float = None):
+    """
+    Waits until now() reaches the target: sleeps until `spin` seconds before it
+    and busy-waits the rest, because time.sleep() may oversleep by the OS timer slack.
+    The sleep wakes up at once and raises CancelledException
+    when the current Deadline is cancelled, so the paced loops stop.
+    """
+    spin = spin if spin is not None else config.TIMING_SPIN
+    remaining = target - now()
+    if remaining > spin:
+        deadline = currentDeadline()
+        if deadline is not None:
+            deadline.sleep(remaining - spin)
+            if deadline.cancelled:
+                raise CancelledException("pysikuli call has been cancelled")
+        else:
+            time.sleep(remaining - spin)
+    while now() < target:
+        # releases the GIL, so the other threads keep running while spinning
+        time.sleep(0)
+
+    if name is not None and config.TIMING_STATS:
+        timing_stats.record(name, now() - target)
+
+
+def preciseSleep(seconds: float, name: str = None, spin: float = None):
+    """
+    Same as time.sleep(), but with sleepUntil() precision
+    """
+    if seconds > 0:
+        sleepUntil(now() + seconds, name, spin)
+
+
+class Pacer(object):
+    """
+    Paces a loop by an absolute schedule, so the time of the loop body
+    doesn't add up to the intervals and the loop doesn't drift.
+    If the loop falls behind, the schedule restarts from now instead of catching up
+    with a burst of events.
+    """
+
+    def __init__(self, interval: float, name: str = None, spin: float = None):
+        self.interval = interval
+        self.name = name
+        self.spin = spin
+        self.next_tick = now()
+
+    def wait(self, interval: float = None):
+        """
+        Waits `interval` seconds after the previous tick, defaults to the pacer interval
+        """
+        interval = interval if interval is not None else self.interval
+        if interval <= 0:
+            return
+        self.next_tick += interval
+        current = now()
+        if self.next_tick <= current:
+            if self.name is not None and config.TIMING_STATS:
+                timing_stats.record(self.name, current - self.next_tick)
+            self.next_tick = current
+            return
+        sleepUntil(self.next_tick, self.name, self.spin)
@@ -0,0 +1,145 @@
+# module for precomputing mouse movement paths
+import numpy as np
+import math
+
+from ._config import config
+
+# CSS "ease" curve, the default control points of the "bezier" easing
+_DEFAULT_BEZIER = (0.25, 0.1, 0.25, 1.0)
+# number of samples of the bezier curve used for its inversion
+_BEZIER_SAMPLES = 256
+
+
+def _linear(progress: np.ndarray, bezier=None):
+    return progress
+
+
+def _easeInOut(progress: np.ndarray, bezier=None):
+    # smoothstep, starts and stops with zero speed
+    return progress * progress * (3 - 2 * progress)
+
+
+def _cubicBezier(progress: np.ndarray, bezier=None):
+    """
+    Timing function like CSS cubic-bezier(x1, y1, x2, y2), the curve goes
+    from (0, 0) to (1, 1), x is the time and y is the covered part of the path
+    """
+    x1, y1, x2, y2 = bezier if bezier is not None else _DEFAULT_BEZIER
+    if not (0 <= x1 <= 1 and 0 <= x2 <= 1):
+        raise ValueError(f"The x control points of {bezier} must be within [0, 1]")
+
+    t = np.linspace(0, 1, _BEZIER_SAMPLES)
+    u = 1 - t
+    curve_x = 3 * u * u * t * x1 + 3 * u * t * t * x2 + t**3
+    curve_y = 3 * u * u * t * y1 + 3 * u * t * t * y2 + t**3
+    # x is monotonic for x1, x2 within [0, 1], so the curve can be inverted by np.interp
+    return np.interp(progress, curve_x, curve_y)
+
+
+EASINGS = {
+    "linear": _linear,
+    "ease-in-out": _easeInOut,
+    "bezier": _cubicBezier,
+}
+
+
+class Trajectory(object):
+    """
+    Precomputed mouse path, `points` are the integer positions
+    and `times` are the moments in seconds from the start when they are reached.
+    The last point is always the destination, the repeated points are skipped.
+    """
+
+    __slots__ = ("points", "times", "start", "destination")
+
+    def __init__(self, points: np.ndarray, times: np.ndarray, start, destination):
+        self.points = points
+        self.times = times
+        self.start = tuple(int(value) for value in start)
+        self.destination = tuple(int(value) for value in destination)
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def duration(self):
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    @property
+    def max_step(self):
+        """
+        The longest distance between two successive points
+        """
+        path = np.vstack((self.start, self.points))
+        return float(np.hypot(*np.diff(path, axis=0).T).max())
+
+    def __str__(self):
+        return (
+            f"Trajectory(start={self.start}, destination={self.destination}, "
+            f"points={len(self)}, duration={self.duration:.3f})"
+        )
+
+    __repr__ = __str__
+
+    def offset(self, x_offset: int, y_offset: int):
+        """
+        Returns the same movement shifted by the offset
+        """
+        shift = np.array((x_offset, y_offset))
+        return Trajectory(
+            self.points + shift,
+            self.times,
+            np.add(self.start, shift),
+            np.add(self.destination, shift),
+        )
+
+
+def trajectory(
+    start,
+    destination,
+    speed: float = None,
+    easing: str = None,
+    rate: float = None,
+    bezier: tuple = None,
+):
+    """
+    Computes the mouse path from start to destination,
+    one point per 1 / rate seconds, `rate` defaults to config.REFRESH_RATE.
+
+    speed - pixels per millisecond, the duration is the distance divided by the speed
+    easing - "linear", "ease-in-out" or "bezier", defaults to config.MOUSE_MOVE_EASING
+    bezier - control points (x1, y1, x2, y2) of the "bezier" easing
+    """
+    speed = speed if speed is not None else config.MOUSE_MOVE_SPEED
+    easing = easing if easing is not None else config.MOUSE_MOVE_EASING
+    rate = rate if rate is not None else config.REFRESH_RATE
+    if easing not in EASINGS:
+        raise ValueError(f"Unknown easing {easing!r}, use one of {list(EASINGS)}")
+    if easing == "bezier" and bezier is None:
+        bezier = config.MOUSE_MOVE_BEZIER
+
+    start = np.array(start[:2], dtype=np.float64)
+    destination_point = np.array(destination[:2], dtype=np.float64)
+    vector = destination_point - start
+    distance = math.hypot(*vector)
+
+    speed = max(speed, 0.001) * 1000
+    duration = distance / speed
+    steps = max(math.ceil(duration * rate), 1)
+
+    progress = np.arange(1, steps + 1) / steps
+    covered = EASINGS[easing](progress, bezier)
+    points = np.rint(start + covered[:, None] * vector).astype(np.int64)
+    times = progress * duration
+
+    # the points which don't move the mouse are skipped,
+    # the mouse stays at the destination for the rest of the duration
+    moved = np.empty(steps, dtype=bool)
+    moved[0] = np.any(points[0] != np.rint(start))
+    moved[1:] = np.any(points[1:] != points[:-1], axis=1)
+    if moved.any():
+        points, times = points[moved], times[moved]
+    else:
+        points, times = points[-1:], times[-1:]
+
+    return Trajectory(points, times, start.astype(np.int64), points[-1])
@@ -1,9 +1,49 @@
+import logging
+import atexit
 import re
 
 from subprocess import run
 
+_x_clipboard = None
 
-def _copy(text: str):
+
+def _clipboard():
+    """
+    Returns XClipboard if config.CLIPBOARD_BACKEND is "xlib", otherwise None
+    """
+    global _x_clipboard
+    # _config imports this module, so config is imported on the first use
+    from ._config import config
+
+    if config.CLIPBOARD_BACKEND != "xlib":
+        return None
+    if _x_clipboard is None:
+        try:
+            from ._xclipboard import XClipboard
+
+            _x_clipboard = XClipboard()
+            atexit.register(_handOver)
+        except Exception:
+            logging.warning("X clipboard couldn't start, using xsel", exc_info=True)
+            _x_clipboard = False
+    return _x_clipboard or None
+
+
+def _handOver():
+    """
+    Passes the own clipboard text to xsel, so it stays after the process exits
+    """
+    clipboard = _x_clipboard
+    if clipboard and clipboard.owned:
+        text = clipboard.paste()
+        clipboard.close()
+        try:
+            _xselCopy(text)
+        except OSError:
+            logging.warning("The clipboard text is lost at exit, xsel isn't installed")
+
+
+def _xselCopy(text: str):
     run(
         ["xsel", "-b"],
         input=text,
@@ -11,10 +51,25 @@ def _copy(text: str):
     )
 
 
-def _paste():
+def _xselPaste():
     return run(["xsel", "-b"], capture_output=True, encoding="utf-8").stdout
 
 
+def _copy(text: str):
+    clipboard = _clipboard()
+    if clipboard is not None:
+        clipboard.copy(text)
+    else:
+        _xselCopy(text)
+
+
+def _paste():
+    clipboard = _clipboard()
+    if clipboard is not None:
+        return clipboard.paste()
+    return _xselPaste()
+
+
 def _apt_pkgs_installation_check(required_pkgs_name: tuple[str] or list):
     installed_pkgs = run(
         ["apt", "list", "--installed"],
@@ -0,0 +1,377 @@
+# module for owning the X CLIPBOARD selection in-process, Linux only
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from Xlib import X, Xatom, error
+from Xlib.display import Display
+from Xlib.protocol import event
+import threading
+import logging
+import select
+import queue
+import time
+import os
+
+# the largest property written at once, bigger texts are sent by the INCR protocol
+_MAX_CHUNK = 256 * 1024
+# seconds an INCR transfer waits for the requestor to ask for the next chunk,
+# the requestor which has exited or ignored the transfer never asks
+_TRANSFER_TIMEOUT = 5.0
+
+
+class _Transfer(object):
+    """
+    The text sent in chunks to one requestor property by INCR
+    """
+
+    def __init__(self, requestor, target, data: bytes, counted: bool):
+        self.requestor = requestor
+        self.target = target
+        self.data = data
+        self.offset = 0
+        self.counted = counted
+        self.deadline = time.monotonic() + _TRANSFER_TIMEOUT
+
+
+class XClipboard(object):
+    """
+    Owns the clipboard selection in a background thread instead of spawning xsel,
+    copy() takes ownership and answers the paste requests of the other applications,
+    paste() of its own text doesn't touch the X server at all.
+
+    The texts are offered as UTF8_STRING, text/plain;charset=utf-8, STRING and TEXT,
+    the texts bigger than one X request are sent and received in chunks by INCR.
+    `reads` counts every application which has read the text, `paste_reads` only
+    the reads after expectPaste(), see waitForPaste().
+    The text is lost when the process exits, unless it is handed over beforehand,
+    see _unix._handOver().
+    """
+
+    def __init__(self, display=None, selection: str = "CLIPBOARD"):
+        self.display = display if display is not None else Display()
+        self.window = self.display.screen().root.create_window(
+            0, 0, 1, 1, 0, X.CopyFromParent, event_mask=X.PropertyChangeMask
+        )
+        self._selection = self.display.intern_atom(selection)
+        self._property = self.display.intern_atom("PYSIKULI_SELECTION")
+        self._timestamp_property = self.display.intern_atom("PYSIKULI_TIMESTAMP")
+        self._targets = self.display.intern_atom("TARGETS")
+        self._timestamp = self.display.intern_atom("TIMESTAMP")
+        self._incr = self.display.intern_atom("INCR")
+        self._utf8 = self.display.intern_atom("UTF8_STRING")
+        # target -> encoding of the text
+        self._encodings = {
+            self._utf8: "utf-8",
+            self.display.intern_atom("text/plain;charset=utf-8"): "utf-8",
+            self.display.intern_atom("TEXT"): "utf-8",
+            Xatom.STRING: "latin-1",
+        }
+        max_request = self.display.display.info.max_request_length * 4
+        self._chunk_size = min(max_request - 1024, _MAX_CHUNK)
+
+        self._text = None
+        self._owner_time = X.CurrentTime
+        self._pending_copy = None
+        self._reading = None
+        # (requestor window id, property) -> _Transfer
+        self._transfers = {}
+        self._commands = queue.SimpleQueue()
+        self._wake_read, self._wake_write = os.pipe()
+        self._closed = False
+        self._reads_changed = threading.Condition()
+        self.reads = 0
+        self.paste_reads = 0
+        # the requestors which have read the current text, e.g. clipboard managers
+        self._readers = set()
+        self._expecting_paste = False
+
+        self._thread = threading.Thread(
+            target=self._run, name="pysikuli-clipboard", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def owned(self):
+        """
+        True while the clipboard holds the text of the last copy()
+        """
+        return self._text is not None
+
+    def _submit(self, command, *args) -> Future:
+        if self._closed:
+            raise RuntimeError("The clipboard is closed")
+        future = Future()
+        self._commands.put((command, future, args))
+        os.write(self._wake_write, b"\0")
+        return future
+
+    def copy(self, text: str, timeout: float = 1.0):
+        """
+        Puts the text into the clipboard and returns when the selection is owned
+        """
+        self._submit(self._copy, str(text)).result(timeout)
+
+    def paste(self, timeout: float = 1.0) -> str:
+        """
+        Returns the text of the clipboard, "" if it's empty or isn't a text
+        """
+        text = self._text
+        if text is not None:
+            return text
+        future = self._submit(self._paste)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            logging.warning("XClipboard: the clipboard owner hasn't answered")
+            return ""
+
+    def expectPaste(self):
+        """
+        Starts counting the paste_reads, call it right before the paste hotkey.
+        The requestors which have already read the text don't count,
+        nor do the requests timed before the text was copied: clipboard managers
+        save each new text, the pasting application requests it with the time
+        of the key event.
+        """
+        with self._reads_changed:
+            self.paste_reads = 0
+            self._expecting_paste = True
+
+    def waitForPaste(self, timeout: float) -> bool:
+        """
+        Waits until an application has read the text after expectPaste(),
+        returns False on timeout
+        """
+        with self._reads_changed:
+            pasted = self._reads_changed.wait_for(
+                lambda: self.paste_reads > 0, timeout
+            )
+            self._expecting_paste = False
+            return pasted
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        os.write(self._wake_write, b"\0")
+        self._thread.join(1)
+        self.window.destroy()
+        self.display.close()
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+
+    def _run(self):
+        fd = self.display.fileno()
+        while not self._closed:
+            try:
+                self._runCommands()
+                self.display.flush()
+                while self.display.pending_events():
+                    self._handle(self.display.next_event())
+                    self.display.flush()
+                timeout = self._expireTransfers()
+                self.display.flush()
+                readable, _, _ = select.select([fd, self._wake_read], [], [], timeout)
+                if self._wake_read in readable:
+                    os.read(self._wake_read, 4096)
+            except error.ConnectionClosedError:
+                logging.warning("XClipboard: the X connection is closed")
+                self._closed = True
+                return
+            except Exception:
+                if self._closed:
+                    return
+                logging.exception("XClipboard: the event loop has failed")
+
+    def _runCommands(self):
+        while True:
+            try:
+                command, future, args = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            if future.set_running_or_notify_cancel():
+                try:
+                    command(future, *args)
+                except Exception as e:
+                    future.set_exception(e)
+
+    def _copy(self, future, text):
+        # ICCCM asks for the server time of the ownership, an empty append to a
+        # property of the own window makes the server report the current time
+        self._pending_copy = (future, text)
+        self.window.change_property(
+            self._timestamp_property, Xatom.STRING, 8, b"", X.PropModeAppend
+        )
+
+    def _takeOwnership(self, time):
+        future, text = self._pending_copy
+        self._pending_copy = None
+        self.window.set_selection_owner(self._selection, time)
+        owner = self.display.get_selection_owner(self._selection)
+        if getattr(owner, "id", owner) != self.window.id:
+            future.set_exception(RuntimeError("Couldn't own the clipboard"))
+            return
+        self._text = text
+        self._owner_time = time
+        with self._reads_changed:
+            self._readers.clear()
+            self._expecting_paste = False
+        future.set_result(None)
+
+    def _paste(self, future):
+        self._requestText(future, self._utf8)
+
+    def _requestText(self, future, target):
+        self._reading = {"future": future, "target": target, "chunks": None}
+        self.window.convert_selection(
+            self._selection, target, self._property, X.CurrentTime
+        )
+
+    def _finishReading(self, data: bytes):
+        reading, self._reading = self._reading, None
+        encoding = self._encodings.get(reading["target"], "utf-8")
+        if not reading["future"].done():
+            reading["future"].set_result(data.decode(encoding, "replace"))
+
+    def _handle(self, ev):
+        if ev.type == X.SelectionRequest:
+            self._answer(ev)
+        elif ev.type == X.SelectionNotify:
+            self._onSelectionNotify(ev)
+        elif ev.type == X.PropertyNotify:
+            self._onPropertyNotify(ev)
+        elif ev.type == X.SelectionClear:
+            if ev.atom == self._selection and ev.time >= self._owner_time:
+                self._text = None
+
+    def _onSelectionNotify(self, ev):
+        if self._reading is None or ev.selection != self._selection:
+            return
+        if ev.property == X.NONE:
+            # the owner doesn't support UTF8_STRING, the old clients have STRING
+            if self._reading["target"] == self._utf8:
+                self._requestText(self._reading["future"], Xatom.STRING)
+            else:
+                self._finishReading(b"")
+            return
+        prop = self.window.get_full_property(self._property, X.AnyPropertyType)
+        # deleting the property asks the INCR owner for the first chunk
+        self.window.delete_property(self._property)
+        if prop is not None and prop.property_type == self._incr:
+            self._reading["chunks"] = []
+        else:
+            self._finishReading(_propertyBytes(prop))
+
+    def _onPropertyNotify(self, ev):
+        window = ev.window.id
+        if window == self.window.id:
+            if ev.atom == self._timestamp_property and self._pending_copy is not None:
+                self._takeOwnership(ev.time)
+            elif (
+                ev.atom == self._property
+                and ev.state == X.PropertyNewValue
+                and self._reading is not None
+                and self._reading["chunks"] is not None
+            ):
+                prop = self.window.get_full_property(self._property, X.AnyPropertyType)
+                if prop is None:
+                    # a late event of the property which is already read
+                    return
+                self.window.delete_property(self._property)
+                chunk = _propertyBytes(prop)
+                if chunk:
+                    self._reading["chunks"].append(chunk)
+                else:
+                    self._finishReading(b"".join(self._reading["chunks"]))
+        elif ev.state == X.PropertyDelete and (window, ev.atom) in self._transfers:
+            self._sendChunk(window, ev.atom)
+
+    def _answer(self, ev):
+        # obsolete clients don't set the property, the target is used instead
+        prop = ev.property if ev.property != X.NONE else ev.target
+        requestor = ev.requestor
+        text = self._text
+        if ev.selection != self._selection or text is None:
+            prop = X.NONE
+        elif ev.target == self._targets:
+            targets = [self._targets, self._timestamp, *self._encodings]
+            requestor.change_property(prop, Xatom.ATOM, 32, targets)
+        elif ev.target == self._timestamp:
+            requestor.change_property(prop, Xatom.INTEGER, 32, [self._owner_time])
+        elif ev.target in self._encodings:
+            data = text.encode(self._encodings[ev.target], "replace")
+            if len(data) > self._chunk_size:
+                # the requestor deletes the property to get each next chunk
+                requestor.change_attributes(event_mask=X.PropertyChangeMask)
+                requestor.change_property(prop, self._incr, 32, [len(data)])
+                counted = self._isPasteRead(requestor, ev.time)
+                self._transfers[(requestor.id, prop)] = _Transfer(
+                    requestor, ev.target, data, counted
+                )
+            else:
+                requestor.change_property(prop, ev.target, 8, data)
+                self._countRead(self._isPasteRead(requestor, ev.time))
+        else:
+            prop = X.NONE
+        requestor.send_event(
+            event.SelectionNotify(
+                time=ev.time,
+                requestor=requestor.id,
+                selection=ev.selection,
+                target=ev.target,
+                property=prop,
+            )
+        )
+
+    def _sendChunk(self, window, prop):
+        transfer = self._transfers[(window, prop)]
+        chunk = transfer.data[transfer.offset : transfer.offset + self._chunk_size]
+        transfer.requestor.change_property(prop, transfer.target, 8, chunk)
+        transfer.offset += len(chunk)
+        transfer.deadline = time.monotonic() + _TRANSFER_TIMEOUT
+        if not chunk:
+            # the empty chunk ends the transfer
+            self._endTransfer(window, prop)
+            self._countRead(transfer.counted)
+
+    def _endTransfer(self, window, prop):
+        transfer = self._transfers.pop((window, prop))
+        if all(key[0] != window for key in self._transfers):
+            transfer.requestor.change_attributes(event_mask=X.NoEventMask)
+
+    def _expireTransfers(self):
+        """
+        Drops the INCR transfers the requestors have abandoned,
+        returns the seconds until the next deadline or None without transfers
+        """
+        if not self._transfers:
+            return None
+        current = time.monotonic()
+        for key, transfer in list(self._transfers.items()):
+            if transfer.deadline <= current:
+                logging.warning("XClipboard: the requestor has abandoned the text")
+                self._endTransfer(*key)
+        deadlines = [transfer.deadline for transfer in self._transfers.values()]
+        return max(min(deadlines) - current, 0) if deadlines else None
+
+    def _isPasteRead(self, requestor, request_time) -> bool:
+        window = requestor.id
+        with self._reads_changed:
+            first_read = window not in self._readers
+            self._readers.add(window)
+            if not self._expecting_paste or not first_read:
+                return False
+        # the requests timed by the ownership change are of clipboard managers
+        return request_time == X.CurrentTime or request_time > self._owner_time
+
+    def _countRead(self, paste: bool = False):
+        with self._reads_changed:
+            self.reads += 1
+            if paste:
+                self.paste_reads += 1
+            self._reads_changed.notify_all()
+
+
+def _propertyBytes(prop) -> bytes:
+    if prop is None or prop.format != 8:
+        return b""
+    value = prop.value
+    return value if isinstance(value, bytes) else bytes(value)
@@ -0,0 +1,273 @@
+# module for sending keyboard and mouse events by XTest directly, Linux only
+from contextlib import contextmanager
+from Xlib import X, XK
+from Xlib.display import Display
+import threading
+import logging
+
+# keysyms of the control characters, the printable Latin-1 keysyms match the code point
+_CHAR_KEYSYMS = {
+    "\n": XK.XK_Return,
+    "\r": XK.XK_Return,
+    "\t": XK.XK_Tab,
+    "\b": XK.XK_BackSpace,
+    "\x1b": XK.XK_Escape,
+}
+
+# pynput key names which differ from the X keysym names
+_KEY_NAMES = {
+    "alt": "Alt_L",
+    "alt_l": "Alt_L",
+    "alt_r": "Alt_R",
+    "alt_gr": "ISO_Level3_Shift",
+    "backspace": "BackSpace",
+    "caps_lock": "Caps_Lock",
+    "cmd": "Super_L",
+    "cmd_l": "Super_L",
+    "cmd_r": "Super_R",
+    "ctrl": "Control_L",
+    "ctrl_l": "Control_L",
+    "ctrl_r": "Control_R",
+    "delete": "Delete",
+    "down": "Down",
+    "end": "End",
+    "enter": "Return",
+    "esc": "Escape",
+    "home": "Home",
+    "insert": "Insert",
+    "left": "Left",
+    "menu": "Menu",
+    "num_lock": "Num_Lock",
+    "page_down": "Next",
+    "page_up": "Prior",
+    "pause": "Pause",
+    "print_screen": "Print",
+    "right": "Right",
+    "scroll_lock": "Scroll_Lock",
+    "shift": "Shift_L",
+    "shift_l": "Shift_L",
+    "shift_r": "Shift_R",
+    "space": "space",
+    "tab": "Tab",
+    "up": "Up",
+}
+
+
+def _charToKeysym(char: str):
+    if char in _CHAR_KEYSYMS:
+        return _CHAR_KEYSYMS[char]
+    code = ord(char)
+    if 0x20 <= code <= 0x7E or 0xA0 <= code <= 0xFF:
+        return code
+    # Unicode keysyms, see keysymdef.h
+    return 0x01000000 | code
+
+
+def _keyToKeysym(key):
+    """
+    Returns the keysym of a character, a keysym name, a pynput Key or KeyCode
+    """
+    if isinstance(key, str):
+        if len(key) == 1:
+            return _charToKeysym(key)
+        keysym = XK.string_to_keysym(_KEY_NAMES.get(key.lower(), key))
+    elif getattr(key, "char", None):
+        # pynput KeyCode of a character, e.g. from a recorded macro
+        return _charToKeysym(key.char)
+    else:
+        # pynput Key on Xorg keeps the keysym in vk, as does a KeyCode without char
+        keysym = getattr(getattr(key, "value", key), "vk", None)
+        if keysym is None and hasattr(key, "name"):
+            keysym = XK.string_to_keysym(_KEY_NAMES.get(key.name, key.name))
+    if not keysym:
+        raise ValueError(f"Can't find the keysym of {key!r}")
+    return keysym
+
+
+class XTestBackend(object):
+    """
+    Sends key and motion events with XTest, like xdotool does.
+
+    The keysym to keycode map is read once, the characters which aren't on
+    the keyboard layout are typed by temporarily remapping a free keycode.
+    The events are only queued until the end of the outermost batch(),
+    so write() sends the whole text in one flush instead of one sync per event.
+    """
+
+    def __init__(self, display=None):
+        self.display = display if display is not None else Display()
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._batch_remapped = set()
+        self.events = 0
+        self.flushes = 0
+        self.remaps = 0
+        self._loadKeymap()
+
+    def _loadKeymap(self):
+        min_keycode = self.display.display.info.min_keycode
+        max_keycode = self.display.display.info.max_keycode
+        mapping = self.display.get_keyboard_mapping(
+            min_keycode, max_keycode - min_keycode + 1
+        )
+
+        self._keysyms_per_keycode = len(mapping[0]) if mapping else 2
+        self._keycodes = {}
+        self._spare_keycodes = []
+        for keycode, keysyms in enumerate(mapping, min_keycode):
+            if not any(keysyms):
+                self._spare_keycodes.append(keycode)
+                continue
+            # only the plain and the shifted levels, the others need modifiers
+            # which depend on the layout
+            for index, keysym in enumerate(keysyms[:2]):
+                if keysym and keysym not in self._keycodes:
+                    self._keycodes[keysym] = (keycode, index == 1)
+
+        # remapped keysym -> spare keycode, the least recently used comes first
+        self._remapped = {}
+        self._shift_keycode = self._keycodes.get(XK.XK_Shift_L, (None, False))[0]
+
+    def _remap(self, keysym):
+        if not self._spare_keycodes and not self._remapped:
+            raise ValueError(f"There is no free keycode to type keysym {keysym:#x}")
+
+        if self._spare_keycodes:
+            keycode = self._spare_keycodes.pop()
+        else:
+            old_keysym = next(iter(self._remapped))
+            keycode = self._remapped.pop(old_keysym)
+            if old_keysym in self._batch_remapped:
+                # the queued events of the old keysym have to reach the clients
+                # before its keycode gets a new meaning
+                self.display.sync()
+                self.flushes += 1
+                self._batch_remapped.clear()
+
+        self.display.change_keyboard_mapping(
+            keycode, [(keysym,) * self._keysyms_per_keycode]
+        )
+        self._remapped[keysym] = keycode
+        self._batch_remapped.add(keysym)
+        self.remaps += 1
+        return keycode
+
+    def keycode(self, keysym):
+        """
+        Returns tuple(keycode, shift) of the keysym, remaps a free keycode if needed
+        """
+        if keysym in self._keycodes:
+            return self._keycodes[keysym]
+        if keysym in self._remapped:
+            keycode = self._remapped.pop(keysym)
+            self._remapped[keysym] = keycode
+            self._batch_remapped.add(keysym)
+            return keycode, False
+        return self._remap(keysym), False
+
+    def _fakeInput(self, event_type, detail=0, x=0, y=0):
+        self.display.xtest_fake_input(event_type, detail, root=X.NONE, x=x, y=y)
+        self.events += 1
+
+    @contextmanager
+    def batch(self):
+        """
+        Queues the events of the block and flushes them at once in the end
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+
+    def flush(self):
+        with self._lock:
+            self.display.flush()
+            self.flushes += 1
+            self._batch_remapped.clear()
+
+    def sync(self):
+        """
+        Flushes the events and waits until the X server has processed them,
+        so the events of the other connections, e.g. the pynput clicks, go after them
+        """
+        with self._lock:
+            self.display.sync()
+            self.flushes += 1
+            self._batch_remapped.clear()
+
+    def _keyEvent(self, key, press: bool):
+        with self.batch():
+            keycode, shift = self.keycode(_keyToKeysym(key))
+            if shift and press:
+                self._fakeInput(X.KeyPress, self._shift_keycode)
+            self._fakeInput(X.KeyPress if press else X.KeyRelease, keycode)
+            if shift and not press:
+                self._fakeInput(X.KeyRelease, self._shift_keycode)
+
+    def press(self, key):
+        self._keyEvent(key, True)
+
+    def release(self, key):
+        self._keyEvent(key, False)
+
+    def tap(self, key):
+        with self.batch():
+            self._keyEvent(key, True)
+            self._keyEvent(key, False)
+
+    def type(self, text: str):
+        """
+        Types the text, holding Shift over runs of shifted characters
+        """
+        with self.batch():
+            shift_down = False
+            for char in text:
+                keycode, shift = self.keycode(_charToKeysym(char))
+                if shift != shift_down:
+                    event = X.KeyPress if shift else X.KeyRelease
+                    self._fakeInput(event, self._shift_keycode)
+                    shift_down = shift
+                self._fakeInput(X.KeyPress, keycode)
+                self._fakeInput(X.KeyRelease, keycode)
+            if shift_down:
+                self._fakeInput(X.KeyRelease, self._shift_keycode)
+
+    def move(self, x: int, y: int):
+        with self.batch():
+            self._fakeInput(X.MotionNotify, x=int(x), y=int(y))
+
+    def position(self):
+        """
+        Returns the mouse position, the query goes after the queued motion events
+        """
+        with self._lock:
+            pointer = self.display.screen().root.query_pointer()
+            return pointer.root_x, pointer.root_y
+
+    def moveAlong(self, points):
+        """
+        Sends a motion event for each point in one flush
+        """
+        with self.batch():
+            for x, y in points:
+                self._fakeInput(X.MotionNotify, x=int(x), y=int(y))
+
+    def close(self):
+        """
+        Restores the remapped keycodes and closes the connection
+        """
+        with self._lock:
+            empty = (X.NoSymbol,) * self._keysyms_per_keycode
+            for keycode in self._remapped.values():
+                self.display.change_keyboard_mapping(keycode, [empty])
+            self._spare_keycodes.extend(self._remapped.values())
+            self._remapped.clear()
+            try:
+                self.display.sync()
+                self.display.close()
+            except Exception:
+                logging.debug("XTest display is already closed", exc_info=True)
@@ -0,0 +1,90 @@
+import pytest
+import numpy as np
+import time
+import cv2
+
+from ...src.pysikuli import _main as main
+
+
+@pytest.fixture()
+def random_screen():
+    """Returns screen(tuple_region, seed=0): a BGRA screen with 10 random rectangles"""
+
+    def screen(tuple_region, seed=0):
+        width, height = tuple_region[2], tuple_region[3]
+        rng = np.random.default_rng(seed)
+        np_screen = np.full((height, width, 4), 240, np.uint8)
+        for _ in range(10):
+            x = int(rng.integers(0, width - 40))
+            y = int(rng.integers(0, height - 25))
+            color = tuple(int(c) for c in rng.integers(0, 255, 3)) + (255,)
+            cv2.rectangle(np_screen, (x, y), (x + 40, y + 25), color, -1)
+        return np_screen
+
+    return screen
+
+
+class FakeCapture:
+    """Replaces _regionToFrame of the modules and keeps the grabbed regions"""
+
+    def __init__(self, monkeypatch):
+        self.monkeypatch = monkeypatch
+        self.grabs = []
+
+    def patch(self, module, screen):
+        """
+        screen is an ndarray, cropped to the grabbed region,
+        or a callable that takes the region and returns a Frame
+        """
+
+        def regionToFrame(reg=None, tuple_region=None):
+            reg = reg if reg is not None else tuple_region
+            if isinstance(reg, main.Frame):
+                return reg
+            self.grabs.append(reg)
+            if callable(screen):
+                return screen(reg)
+            x1, y1, x2, y2 = reg
+            return main.Frame(screen[y1:y2, x1:x2].copy(), reg)
+
+        self.monkeypatch.setattr(module, "_regionToFrame", regionToFrame)
+        return self.grabs
+
+
+@pytest.fixture()
+def capture(monkeypatch):
+    return FakeCapture(monkeypatch)
+
+
+class FakeClock:
+    """
+    Virtual time for the `time` module of the paced and polling loops,
+    sleep() advances it at once, so the tests don't depend on the OS scheduler
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        # how late each non-zero sleep wakes up, like the OS timer slack
+        self.oversleep = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    perf_counter = monotonic
+
+    def process_time(self):
+        return time.process_time()
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        if seconds > 0:
+            self.now += seconds + self.oversleep
+        else:
+            # sleep(0) of the busy-waits only yields the GIL
+            self.now += 1e-6
+
+
+@pytest.fixture()
+def fake_clock():
+    return FakeClock()
@@ -0,0 +1,113 @@
+import pytest
+import asyncio
+import time
+import numpy as np
+
+from ...src import pysikuli as sik
+from ...src.pysikuli import _async as aio, _incremental as incremental
+from ...src.pysikuli import _polling as polling, config
+from ...src.pysikuli._main import Frame, Match
+
+TEST_REG = (100, 100, 300, 250)
+
+
+@pytest.fixture()
+def test_frame():
+    rng = np.random.default_rng(0)
+    np_region = rng.integers(0, 255, (TEST_REG[3] - 100, TEST_REG[2] - 100, 4), np.uint8)
+    return Frame(np_region, TEST_REG)
+
+
+@pytest.fixture()
+def test_img_ndarray(test_frame):
+    return np.ascontiguousarray(test_frame.np_region[40:80, 60:100, :3])
+
+
+@pytest.fixture()
+def test_missing_img_ndarray():
+    rng = np.random.default_rng(1)
+    return rng.integers(0, 255, (40, 40, 3), np.uint8)
+
+
+class TestAsync:
+    def test_existAsync(self, test_frame, test_img_ndarray):
+        match = asyncio.run(aio.existAsync(test_img_ndarray, region=test_frame))
+        assert isinstance(match, Match)
+        assert match.up_left_loc == (160, 140)
+
+    def test_findAsync(self, test_frame, test_img_ndarray):
+        match = asyncio.run(aio.findAsync(test_img_ndarray, region=test_frame))
+        assert match.up_left_loc == (160, 140)
+
+    def test_waitAsync_timeout(self, test_frame, test_missing_img_ndarray):
+        with pytest.raises(TimeoutError):
+            asyncio.run(
+                aio.waitAsync(
+                    test_missing_img_ndarray, region=test_frame, max_search_time=0.1
+                )
+            )
+
+    def test_waitWhileExistAsync(self, test_frame, test_missing_img_ndarray):
+        assert asyncio.run(
+            aio.waitWhileExistAsync(test_missing_img_ndarray, region=test_frame)
+        )
+
+    def test_incremental(self, test_frame, test_missing_img_ndarray, monkeypatch):
+        monkeypatch.setattr(config, "INCREMENTAL_MATCH", True)
+        matchers = []
+        exist = incremental.IncrementalMatcher.exist
+
+        def matcherExist(matcher, region):
+            matchers.append(matcher)
+            return exist(matcher, region)
+
+        monkeypatch.setattr(incremental.IncrementalMatcher, "exist", matcherExist)
+        _match = asyncio.run(
+            aio.findAsync(
+                test_missing_img_ndarray, region=test_frame, max_search_time=0.1
+            )
+        )
+        assert _match is None
+        assert asyncio.run(
+            aio.waitWhileExistAsync(test_missing_img_ndarray, region=test_frame)
+        )
+        # one matcher for all polls of the wait
+        assert len(matchers) > 2 and len(set(matchers)) == 2
+
+    def test_poll_cpu_time(self, test_frame, test_missing_img_ndarray, monkeypatch):
+        def busy(*args):
+            start = time.process_time()
+            while time.process_time() - start < 0.02:
+                pass
+
+        monkeypatch.setattr(aio, "_pollExist", busy)
+        asyncio.run(
+            aio.findAsync(
+                test_missing_img_ndarray,
+                region=test_frame,
+                max_search_time=0.1,
+                time_step=0.01,
+            )
+        )
+        stats = polling.lastPollStats()
+        # the searches of the executor threads count
+        assert stats.cpu_time >= stats.polls * 0.02 * 0.9
+
+    def test_concurrent_waits(self, test_frame, test_missing_img_ndarray):
+        async def waitMany():
+            waits = [
+                aio.findAsync(
+                    test_missing_img_ndarray, region=test_frame, max_search_time=0.3
+                )
+                for _ in range(5)
+            ]
+            return await asyncio.gather(*waits)
+
+        start = time.monotonic()
+        assert asyncio.run(waitMany()) == [None] * 5
+        assert time.monotonic() - start < 1.0
+
+    def test_mouseSmoothMoveAsync(self):
+        destination = (400, 300)
+        asyncio.run(aio.mouseSmoothMoveAsync(destination, speed=2))
+        assert sik.mousePosition() == destination
@@ -0,0 +1,127 @@
+import pytest
+import asyncio
+import numpy as np
+import time
+
+from ...src.pysikuli import _async as aio, _cache as cache, _macro as macro
+from ...src.pysikuli import _main as main, config
+
+TEST_REGION = (0, 0, 100, 100)
+
+
+@pytest.fixture()
+def searches(monkeypatch):
+    searches = []
+
+    def exist(image, region=None, **kwargs):
+        searches.append((image, region))
+        return "match" if image != "absent.png" else None
+
+    monkeypatch.setattr(main, "_exist", exist)
+    monkeypatch.setattr(config, "RESULT_CACHE", True)
+    monkeypatch.setattr(config, "RESULT_CACHE_TTL", 0.5)
+    monkeypatch.setattr(main.mouse, "click", lambda button, count: None)
+    main.result_cache.clear()
+    main.result_cache.resetStats()
+    yield searches
+    main.result_cache.clear()
+
+
+class TestResultCache:
+    def test_key(self, monkeypatch):
+        monkeypatch.setattr(config, "RESULT_CACHE", True)
+        key = cache.ResultCache.key("a.png", TEST_REGION, None, None, None)
+        assert key == cache.ResultCache.key("a.png", [0, 0, 100, 100], None, 0.8, None)
+        assert key != cache.ResultCache.key("a.png", TEST_REGION, False, None, None)
+        assert cache.ResultCache.key(object(), TEST_REGION, None, None, None) is None
+
+    def test_array_key(self, monkeypatch):
+        monkeypatch.setattr(config, "RESULT_CACHE", True)
+        image = np.zeros((10, 10, 3), np.uint8)
+        key = cache.ResultCache.key(image, TEST_REGION, None, None, None)
+        assert key == cache.ResultCache.key(image.copy(), TEST_REGION, None, None, None)
+        # the same array changed in place is another template
+        image[0, 0] = 255
+        assert key != cache.ResultCache.key(image, TEST_REGION, None, None, None)
+
+        monkeypatch.setattr(config, "RESULT_CACHE", False)
+        assert cache.ResultCache.key("a.png", TEST_REGION, None, None, None) is None
+
+    def test_hit_miss(self, searches):
+        assert main.exist("a.png", TEST_REGION) == "match"
+        assert main.exist("a.png", TEST_REGION) == "match"
+        assert main.exist("absent.png", TEST_REGION) is None
+        assert main.exist("absent.png", TEST_REGION) is None
+        assert len(searches) == 2
+        assert main.result_cache.hits == 2
+        assert main.result_cache.misses == 2
+
+        main.exist("a.png", (0, 0, 50, 50))
+        assert len(searches) == 3
+
+    def test_disabled(self, searches, monkeypatch):
+        monkeypatch.setattr(config, "RESULT_CACHE", False)
+        main.exist("a.png", TEST_REGION)
+        main.exist("a.png", TEST_REGION)
+        assert len(searches) == 2
+
+    def test_static_region(self, searches):
+        np_region = np.zeros((100, 100, 3), np.uint8)
+        main.exist("a.png", np_region, tuple_region=TEST_REGION)
+        main.exist("a.png", np_region, tuple_region=TEST_REGION)
+        assert len(searches) == 2
+
+    def test_ttl(self, searches, monkeypatch):
+        monkeypatch.setattr(config, "RESULT_CACHE_TTL", 0.05)
+        main.exist("a.png", TEST_REGION)
+        time.sleep(0.06)
+        main.exist("a.png", TEST_REGION)
+        assert len(searches) == 2
+
+    def test_input_invalidation(self, searches):
+        main.exist("a.png", TEST_REGION)
+        main.click()
+        main.exist("a.png", TEST_REGION)
+        main.keyDown("a")
+        main.keyUp("a")
+        main.exist("a.png", TEST_REGION)
+        assert len(searches) == 3
+
+        main.result_cache.clear()
+        main.exist("a.png", TEST_REGION)
+        assert len(searches) == 4
+
+    def test_move_invalidation(self, searches, monkeypatch):
+        monkeypatch.setattr(main, "_inputBackend", lambda: None)
+        monkeypatch.setattr(main.mouse, "scroll", lambda dx, dy: None)
+        main.mouse.position = (0, 0)
+        main.exist("a.png", TEST_REGION)
+        asyncio.run(aio.mouseSmoothMoveAsync((50, 0), speed=10))
+        main.exist("a.png", TEST_REGION)
+        assert len(searches) == 2
+
+        for kind in (macro.MOVE, macro.SCROLL):
+            log = macro.MacroLog()
+            log.append(kind, 0, 10, 5)
+            macro.replayMacro(log, speed=float("inf"))
+            main.exist("a.png", TEST_REGION)
+        assert len(searches) == 4
+
+    def test_stale_put(self, searches):
+        generation = main.result_cache.generation
+        main.result_cache.clear()
+        key = main.result_cache.key("a.png", TEST_REGION, None, None, None)
+        main.result_cache.put(key, "stale", generation=generation)
+        assert main.result_cache.get(key) == (False, None)
+
+    def test_find_refresh(self, searches):
+        main.exist("absent.png", TEST_REGION)
+        assert main.find("absent.png", TEST_REGION, max_search_time=0.1) is None
+        # only the first poll can use the cached result
+        assert len(searches) >= 2
+
+    def test_max_entries(self, searches, monkeypatch):
+        monkeypatch.setattr(cache, "_MAX_ENTRIES", 3)
+        for i in range(5):
+            main.exist(f"{i}.png", TEST_REGION)
+        assert len(main.result_cache) == 3
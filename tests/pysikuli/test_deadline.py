@@ -0,0 +1,93 @@
+import pytest
+import threading
+import asyncio
+import time
+
+from ...src.pysikuli import _deadline as deadline, _polling as polling, _main as main
+from ...src.pysikuli import _async
+from ...src.pysikuli._exceptions import CancelledException
+
+
+def _polls(max_search_time):
+    return sum(1 for _ in polling.Poller(max_search_time, 0.01, polling.FIXED))
+
+
+class TestDeadline:
+    def test_no_deadline(self):
+        assert deadline.currentDeadline() is None
+        assert deadline._limitTime(2) == 2
+        deadline._checkDeadline()
+
+    def test_limit(self):
+        with deadline.Deadline(0.1) as budget:
+            assert deadline.currentDeadline() is budget
+            assert 0 < deadline._limitTime(2) <= 0.1
+            assert deadline._limitTime(0.05) == 0.05
+
+            start = time.monotonic()
+            _polls(2)
+            assert time.monotonic() - start < 0.5
+
+            time.sleep(0.1)
+            assert budget.expired
+            with pytest.raises(TimeoutError):
+                budget.check()
+        assert deadline.currentDeadline() is None
+
+    def test_nested(self):
+        with deadline.Deadline(0.2) as outer:
+            with deadline.Deadline(5) as inner:
+                assert inner.remaining() <= 0.2
+            with deadline.Deadline() as unlimited:
+                assert unlimited.remaining() <= 0.2
+            with deadline.Deadline(0.05) as short:
+                assert short.remaining() <= 0.05
+                assert deadline.currentDeadline() is short
+            assert deadline.currentDeadline() is outer
+            assert outer._children == []
+
+    def test_reuse(self):
+        budget = deadline.Deadline(1)
+        with budget:
+            with pytest.raises(RuntimeError):
+                with budget:
+                    pass
+
+    def test_cancel_from_thread(self):
+        budget = deadline.Deadline(5)
+        threading.Timer(0.1, budget.cancel).start()
+        start = time.monotonic()
+        with pytest.raises(CancelledException):
+            with budget:
+                with deadline.Deadline():
+                    _polls(5)
+        assert time.monotonic() - start < 1
+
+    def test_cancelled_parent(self):
+        with deadline.Deadline() as outer:
+            outer.cancel()
+            with deadline.Deadline() as inner:
+                assert inner.cancelled
+                with pytest.raises(CancelledException):
+                    deadline._checkDeadline()
+
+    def test_sleep(self):
+        budget = deadline.Deadline()
+        threading.Timer(0.05, budget.cancel).start()
+        start = time.monotonic()
+        with budget:
+            deadline._sleep(5)
+        assert time.monotonic() - start < 1
+
+    def test_scroll(self):
+        with pytest.raises(TimeoutError):
+            with deadline.Deadline(0.05):
+                main.scroll(duration=5, vertical_speed=1)
+
+    def test_async(self):
+        async def search():
+            with deadline.Deadline(0.1):
+                await asyncio.sleep(0.15)
+                return await _async._runInExecutor(deadline._limitTime, 2)
+
+        assert asyncio.run(search()) == 0
@@ -0,0 +1,172 @@
+import pytest
+
+from ...src.pysikuli import _failsafe as failsafe, _main as main, config
+from ...src.pysikuli._exceptions import FailSafeException
+
+TEST_REGION = (0, 0, 100, 100)
+
+
+class FakeKeyboard:
+    """
+    PyHotKey keyboard_manager, register_hotkey() returns `result` if it's set
+    """
+
+    def __init__(self, result=None):
+        self.result = result
+        self.hotkeys = []
+        self.pressed_keys = []
+
+    def register_hotkey(self, keys, count, func, *args):
+        if self.result is not None:
+            return self.result
+        self.hotkeys.append(func)
+        return len(self.hotkeys)
+
+    def unregister_hotkey_by_id(self, hotkey_id):
+        # PyHotKey looks at the last hotkey first and fails on an empty list
+        self.hotkeys[-1]
+        self.hotkeys.pop(hotkey_id - 1)
+        return True
+
+
+@pytest.fixture()
+def keyboard(monkeypatch):
+    keyboard = FakeKeyboard()
+    monkeypatch.setattr(failsafe, "keyboard", keyboard)
+    monkeypatch.setattr(main, "keyboard", keyboard)
+    return keyboard
+
+
+@pytest.fixture()
+def watcher(keyboard, monkeypatch):
+    watcher = failsafe.FailSafeWatcher()
+    monkeypatch.setattr(failsafe, "failsafe_watcher", watcher)
+    monkeypatch.setattr(main, "failsafe_watcher", watcher)
+    monkeypatch.setattr(config, "FAILSAFE", True)
+    monkeypatch.setattr(config, "FAILSAFE_WATCHER", True)
+    monkeypatch.setattr(config, "FAILSAFE_REGIONS", [(0, 0, 10, 10)])
+    monkeypatch.setattr(main, "mousePosition", lambda: (500, 500))
+    yield watcher
+    watcher.stop()
+
+
+class TestFailSafeWatcher:
+    def test_start_stop(self, watcher):
+        assert watcher.start()
+        assert watcher.running
+        assert watcher.start()
+        watcher.stop()
+        assert not watcher.running
+
+    def test_mouse(self, watcher):
+        watcher.start()
+        watcher._onMove(500, 500)
+        main._failSafeCheck()
+
+        watcher._onMove(5, 5)
+        with pytest.raises(FailSafeException, match="fail-safe region"):
+            main._failSafeCheck()
+        with pytest.raises(FailSafeException, match="fail-safe region"):
+            main._failSafeCheck()
+
+        # the trigger is cleared when the mouse leaves the region
+        watcher._onMove(500, 500)
+        main._failSafeCheck()
+
+    def test_initial_position(self, watcher, monkeypatch):
+        # the mouse is in the region before the watcher starts, no move is reported
+        monkeypatch.setattr(main, "mousePosition", lambda: (5, 5))
+        with pytest.raises(FailSafeException, match="fail-safe region"):
+            main._failSafeCheck()
+        assert watcher.running and watcher.position_checked
+
+        monkeypatch.setattr(main, "mousePosition", lambda: (500, 500))
+        watcher._onMove(500, 500)
+        main._failSafeCheck()
+
+    def test_latch(self, watcher, monkeypatch):
+        monkeypatch.setattr(config, "FAILSAFE_LATCH", True)
+        watcher.start()
+        watcher._onMove(5, 5)
+        watcher._onMove(500, 500)
+        with pytest.raises(FailSafeException, match="fail-safe region"):
+            main._failSafeCheck()
+
+        watcher.reset()
+        main._failSafeCheck()
+
+    def test_own_move(self, watcher, monkeypatch):
+        monkeypatch.setattr(main, "_inputBackend", lambda: None)
+        watcher.start()
+        main._setMousePosition((5, 5))
+        watcher._onMove(5, 5)
+        main._failSafeCheck()
+        # the user moves the mouse back into the region
+        watcher._onMove(500, 500)
+        watcher._onMove(5, 5)
+        with pytest.raises(FailSafeException, match="fail-safe region"):
+            main._failSafeCheck()
+
+    def test_hotkey(self, watcher, monkeypatch):
+        watcher.start()
+        watcher._onHotkey()
+        watcher._onMove(5, 5)
+        monkeypatch.setattr(main, "mousePosition", lambda: (5, 5))
+        with pytest.raises(FailSafeException, match="hotkey"):
+            main._failSafeCheck()
+        # the hotkey raises once, the mouse is still in the region
+        with pytest.raises(FailSafeException, match="fail-safe region"):
+            main._failSafeCheck()
+        watcher._onMove(500, 500)
+        main._failSafeCheck()
+
+    def test_hotkey_not_registered(self, watcher, keyboard, caplog):
+        keyboard.result = -1
+        assert watcher.start()
+        assert not watcher.hotkey_watched
+        assert "already registered" in caplog.text
+        main._failSafeCheck()
+        # the hotkey is polled instead
+        keyboard.pressed_keys = list(config.FAILSAFE_HOTKEY)
+        with pytest.raises(FailSafeException, match="hotkey"):
+            main._failSafeCheck()
+
+    def test_stop_unregistered(self, watcher, keyboard):
+        watcher.start()
+        assert watcher.hotkey_watched
+        # e.g. unregister_all() elsewhere
+        keyboard.hotkeys.clear()
+        watcher.stop()
+        assert not watcher.running
+
+    def test_disabled(self, watcher, monkeypatch):
+        watcher.start()
+        watcher._onHotkey()
+        monkeypatch.setattr(config, "FAILSAFE", False)
+        main._failSafeCheck()
+        failsafe._checkTriggered()
+
+    def test_find_stops(self, watcher, monkeypatch):
+        polls = []
+
+        def exist(*args, **kwargs):
+            polls.append(1)
+            if len(polls) == 3:
+                watcher._onMove(5, 5)
+            return None
+
+        monkeypatch.setattr(main, "_exist", exist)
+        with pytest.raises(FailSafeException):
+            main.find("a.png", TEST_REGION, max_search_time=5, time_step=0.01)
+        assert len(polls) == 3
+
+    def test_polling_fallback(self, watcher, monkeypatch):
+        def listener(**kwargs):
+            raise OSError("no display")
+
+        monkeypatch.setattr(failsafe, "MouseListener", listener)
+        monkeypatch.setattr(main, "mousePosition", lambda: (5, 5))
+        assert not watcher.start()
+        assert not watcher.running
+        with pytest.raises(FailSafeException, match="fail-safe region"):
+            main._failSafeCheck()
@@ -0,0 +1,76 @@
+import pytest
+import numpy as np
+import cv2
+
+from ...src.pysikuli import _features as features
+from ...src.pysikuli._main import Match
+
+TEST_REG = (0, 0, 600, 400)
+TEST_IMG_LOC = (120, 80)
+TEST_IMG_SIZE = 256
+
+
+@pytest.fixture()
+def test_reg_ndarray():
+    rng = np.random.default_rng(0)
+    np_region = np.full((TEST_REG[3], TEST_REG[2], 3), 235, np.uint8)
+    for _ in range(150):
+        x, y = rng.integers(0, TEST_REG[2] - 60), rng.integers(0, TEST_REG[3] - 30)
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.rectangle(np_region, (int(x), int(y)), (int(x) + 50, int(y) + 20), color, 1)
+        cv2.putText(
+            np_region, "abc123", (int(x), int(y) + 15), 0, 0.4, color, 1
+        )
+    return cv2.cvtColor(np_region, cv2.COLOR_BGR2BGRA)
+
+
+@pytest.fixture()
+def test_img_ndarray(test_reg_ndarray):
+    x, y = TEST_IMG_LOC
+    size = TEST_IMG_SIZE
+    return np.ascontiguousarray(test_reg_ndarray[y : y + size, x : x + size, :3])
+
+
+class TestFeatureIndex:
+    def test_add(self, test_img_ndarray):
+        index = features.FeatureIndex()
+        assert index.add(test_img_ndarray, key="panel") == "panel"
+        assert "panel" in index
+        assert len(index) == 1
+
+        index.remove("panel")
+        assert len(index) == 0
+
+    def test_add_without_key(self, test_img_ndarray):
+        with pytest.raises(TypeError):
+            features.FeatureIndex().add(test_img_ndarray)
+
+    def test_add_without_keypoints(self):
+        with pytest.raises(ValueError):
+            features.FeatureIndex().add(np.zeros((100, 100, 3), np.uint8), key=1)
+
+    def test_locate(self, test_img_ndarray, test_reg_ndarray):
+        index = features.FeatureIndex()
+        index.add(test_img_ndarray, key="panel")
+
+        match = index.locate("panel", region=test_reg_ndarray, tuple_region=TEST_REG)
+
+        assert isinstance(match, Match)
+        assert match.score >= 0.95
+        assert abs(match.up_left_loc[0] - TEST_IMG_LOC[0]) <= 2
+        assert abs(match.up_left_loc[1] - TEST_IMG_LOC[1]) <= 2
+
+    def test_locate_int_key(self, test_img_ndarray, test_reg_ndarray):
+        index = features.FeatureIndex()
+        index.add(test_img_ndarray, key=512)
+
+        match = index.locate(512, region=test_reg_ndarray, tuple_region=TEST_REG)
+
+        assert isinstance(match, Match)
+
+    def test_locate_missing(self, test_img_ndarray, test_reg_ndarray):
+        np_region = np.full_like(test_reg_ndarray, 235)
+        match = features.existByFeatures(
+            test_img_ndarray, region=np_region, tuple_region=TEST_REG
+        )
+        assert match is None
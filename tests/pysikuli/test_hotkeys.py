@@ -0,0 +1,166 @@
+import threading
+import time
+
+import pytest
+
+from ...src.pysikuli import _hotkeys as hotkeys, _timing as timing, config
+from ...src.pysikuli._config import Key
+
+
+class FakeKeyboard:
+    """
+    PyHotKey keyboard_manager, the handlers are called in the "listener" thread
+    """
+
+    def __init__(self):
+        self.hotkeys = {}
+        self.magickeys = {}
+        self.next_id = 1
+
+    def register_hotkey(self, keys, count, func, *args):
+        for registered_keys, registered_count, _, _ in self.hotkeys.values():
+            if set(registered_keys) == set(keys) and (
+                len(keys) > 1 or registered_count == count
+            ):
+                return -1
+        if len(keys) == 1 and count < 2:
+            return 0
+        hotkey_id = self.next_id
+        self.next_id += 1
+        self.hotkeys[hotkey_id] = (keys, count, func, args)
+        return hotkey_id
+
+    def unregister_hotkey_by_id(self, hotkey_id):
+        return self.hotkeys.pop(hotkey_id, None) is not None
+
+    def set_magickey_on_release(self, key, func, *args):
+        self.magickeys[key] = (func, args)
+        return True
+
+    def remove_magickey_on_release(self, key):
+        return self.magickeys.pop(key, None) is not None
+
+    def press(self, keys, count=None):
+        """
+        Calls the handler synchronously, as the PyHotKey listener does
+        """
+        if len(keys) == 1 and count is None:
+            func, args = self.magickeys[keys[0]]
+            return func(*args)
+        for registered_keys, registered_count, func, args in self.hotkeys.values():
+            if set(registered_keys) == set(keys) and (
+                len(keys) > 1 or registered_count == count
+            ):
+                return func(*args)
+        raise KeyError(keys)
+
+
+@pytest.fixture()
+def keyboard(monkeypatch):
+    keyboard = FakeKeyboard()
+    monkeypatch.setattr(hotkeys, "keyboard", keyboard)
+    return keyboard
+
+
+@pytest.fixture()
+def dispatcher(keyboard, monkeypatch):
+    dispatcher = hotkeys.HotkeyDispatcher()
+    monkeypatch.setattr(hotkeys, "hotkey_dispatcher", dispatcher)
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+class TestHotkey:
+    def test_validation(self):
+        with pytest.raises(ValueError):
+            hotkeys.Hotkey([], print)
+        with pytest.raises(ValueError):
+            hotkeys.Hotkey([Key.ctrl, "s"], print, presses=2)
+        hotkey = hotkeys.Hotkey(Key.f9, print)
+        assert hotkey.keys == (Key.f9,)
+        assert hotkeys.Hotkey([Key.ctrl, "S"], print).keys == (Key.ctrl, "s")
+
+
+class TestHotkeyDispatcher:
+    def test_callbacks(self, keyboard, dispatcher):
+        calls = []
+        hotkeys.onHotkey([Key.ctrl, "s"], calls.append, "save")
+        hotkeys.onHotkey(["s", Key.ctrl], calls.append, "backup")
+        hotkeys.onHotkey(Key.f9, calls.append, "pause")
+        hotkeys.onHotkey(Key.f10, calls.append, "skip", presses=2)
+        # the same combination shares one registration
+        assert len(keyboard.hotkeys) == 2
+        assert len(dispatcher) == 4
+
+        keyboard.press([Key.ctrl, "s"])
+        keyboard.press([Key.f9])
+        keyboard.press([Key.f10], count=2)
+        assert dispatcher.wait(1)
+        assert calls == ["save", "backup", "pause", "skip"]
+        assert dispatcher.dispatched == 3
+
+    def test_listener_not_blocked(self, keyboard, dispatcher):
+        release = threading.Event()
+        done = []
+
+        def slow():
+            release.wait(1)
+            done.append(True)
+
+        hotkeys.onHotkey(Key.f9, slow)
+        start = time.perf_counter()
+        keyboard.press([Key.f9])
+        keyboard.press([Key.f9])
+        assert time.perf_counter() - start < 0.05
+        assert not done
+        release.set()
+        assert dispatcher.wait(1)
+        assert done == [True, True]
+
+    def test_pause_stop(self, keyboard, dispatcher):
+        calls = []
+        hotkey = hotkeys.onHotkey(Key.f9, calls.append, 1)
+        other = hotkeys.onHotkey(Key.f9, calls.append, 2)
+        hotkey.pause()
+        keyboard.press([Key.f9])
+        assert dispatcher.wait(1)
+        assert calls == [2]
+
+        hotkey.resume()
+        other.stop()
+        keyboard.press([Key.f9])
+        assert dispatcher.wait(1)
+        assert calls == [2, 1]
+
+        hotkey.stop()
+        assert keyboard.magickeys == {}
+        assert len(dispatcher) == 0
+
+    def test_errors(self, keyboard, dispatcher, caplog):
+        keyboard.register_hotkey([Key.alt, "c"], None, print)
+        with pytest.raises(ValueError, match="already registered"):
+            hotkeys.onHotkey([Key.alt, "c"], print)
+        assert len(dispatcher) == 0
+
+        def fail():
+            raise RuntimeError("callback")
+
+        calls = []
+        hotkeys.onHotkey(Key.f9, fail)
+        hotkeys.onHotkey(Key.f9, calls.append, "next")
+        keyboard.press([Key.f9])
+        assert dispatcher.wait(1)
+        assert calls == ["next"]
+        assert "hotkey callback failed" in caplog.text
+
+    def test_latency(self, keyboard, dispatcher, monkeypatch):
+        monkeypatch.setattr(config, "TIMING_STATS", True)
+        timing.timing_stats.reset()
+        hotkeys.onHotkey(Key.f9, lambda: None)
+        for _ in range(20):
+            keyboard.press([Key.f9])
+        assert dispatcher.wait(1)
+        stats = timing.timing_stats["onHotkey"]
+        assert stats.count == 20
+        assert stats.max_error < 0.1
+        timing.timing_stats.reset()
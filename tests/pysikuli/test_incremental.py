@@ -0,0 +1,97 @@
+import pytest
+import numpy as np
+import cv2
+
+from ...src.pysikuli import _incremental as incremental, _main as main, config
+
+TEST_REGION = (0, 0, 320, 200)
+
+
+def _screen(seed=0):
+    rng = np.random.default_rng(seed)
+    np_screen = np.full((TEST_REGION[3], TEST_REGION[2], 4), 240, np.uint8)
+    for _ in range(25):
+        x = int(rng.integers(0, TEST_REGION[2] - 40))
+        y = int(rng.integers(0, TEST_REGION[3] - 25))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3)) + (255,)
+        cv2.rectangle(np_screen, (x, y), (x + 40, y + 25), color, -1)
+    return np_screen
+
+
+@pytest.fixture()
+def test_screen():
+    return _screen()
+
+
+@pytest.fixture()
+def test_template(test_screen):
+    return np.ascontiguousarray(test_screen[60:100, 100:160, :3])
+
+
+def _frame(np_screen):
+    return main.Frame(np_screen.copy(), TEST_REGION)
+
+
+class TestIncrementalMatcher:
+    def test_dirtyRects(self):
+        previous = np.zeros((100, 200), np.uint8)
+        current = previous.copy()
+        assert incremental._dirtyRects(current, previous) == []
+
+        current[5, 5] = 1
+        current[80:90, 150:199] = 1
+        rects = sorted(incremental._dirtyRects(current, previous))
+        assert rects == [(0, 0, 16, 16), (144, 80, 200, 96)]
+
+    @pytest.mark.parametrize("grayscale", [True, False])
+    def test_equal_to_full_match(self, test_screen, test_template, grayscale):
+        matcher = incremental.IncrementalMatcher(test_template, grayscale)
+        rng = np.random.default_rng(1)
+        np_screen = test_screen.copy()
+        for _ in range(10):
+            x = int(rng.integers(0, TEST_REGION[2] - 20))
+            y = int(rng.integers(0, TEST_REGION[3] - 20))
+            np_screen[y : y + 8, x : x + 12] = rng.integers(0, 255, 4)
+
+            frame = _frame(np_screen)
+            score, loc = matcher.update(frame)
+            expected = cv2.matchTemplate(
+                frame.variant(matcher._variant, matcher.ratio),
+                matcher._template,
+                cv2.TM_CCOEFF_NORMED,
+            )
+            # the full match has float32 rounding errors, which depend on the whole region
+            assert np.allclose(matcher._map, expected, atol=1e-3)
+            assert score == pytest.approx(float(expected.max()), abs=1e-3)
+        assert matcher.partial_updates > 0
+        assert matcher.full_updates == 1
+
+    def test_exist(self, test_screen, test_template):
+        matcher = incremental.IncrementalMatcher(test_template)
+        expected = main.exist(test_template, region=_frame(test_screen))
+        _match = matcher.exist(_frame(test_screen))
+        assert _match.up_left_loc == expected.up_left_loc == (100, 60)
+        assert _match.score == expected.score
+
+        matcher.exist(_frame(test_screen))
+        assert matcher.unchanged_updates == 1
+
+        np_screen = test_screen.copy()
+        np_screen[60:100, 100:160] = 0
+        expected = main.exist(test_template, region=_frame(np_screen), precision=0)
+        _match = matcher.exist(_frame(np_screen))
+        assert _match.up_left_loc == expected.up_left_loc != (100, 60)
+        assert matcher.partial_updates == 1
+
+    def test_new_region(self, test_screen, test_template):
+        matcher = incremental.IncrementalMatcher(test_template)
+        matcher.exist(_frame(test_screen))
+        crop = main.Frame(test_screen[:150].copy(), (0, 0, 320, 150))
+        assert matcher.exist(crop).up_left_loc == (100, 60)
+        assert matcher.full_updates == 2
+
+    def test_find(self, monkeypatch, test_screen, test_template):
+        monkeypatch.setattr(config, "INCREMENTAL_MATCH", True)
+        frame = _frame(test_screen)
+        _match = main.find(test_template, region=frame, max_search_time=0.1)
+        assert _match.up_left_loc == (100, 60)
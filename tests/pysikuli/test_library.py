@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+import cv2
+
+from ...src.pysikuli import _library as library
+
+TEST_REG = (0, 0, 24, 24)
+
+
+@pytest.fixture()
+def test_icons():
+    rng = np.random.default_rng(0)
+    icons = []
+    for _ in range(50):
+        icon = np.full((TEST_REG[3], TEST_REG[2], 3), 200, np.uint8)
+        for _ in range(4):
+            x, y = (int(v) for v in rng.integers(0, 20, 2))
+            w, h = (int(v) for v in rng.integers(2, 10, 2))
+            color = tuple(int(c) for c in rng.integers(0, 255, 3))
+            cv2.rectangle(icon, (x, y), (x + w, y + h), color, -1)
+        icons.append(icon)
+    return icons
+
+
+@pytest.fixture()
+def test_library(test_icons):
+    lib = library.TemplateLibrary()
+    for i, icon in enumerate(test_icons):
+        lib.add(icon, name=f"icon_{i}")
+    return lib
+
+
+class TestSignature:
+    def test_dHash(self, test_icons):
+        signature = library._dHash(test_icons[0])
+        assert 0 <= signature < 2**64
+        assert signature == library._dHash(test_icons[0].copy())
+
+    def test_hammingDistances(self):
+        signatures = np.array([0, 1, 3, 2**64 - 1], np.uint64)
+        distances = library._hammingDistances(signatures, 0)
+        assert list(distances) == [0, 1, 2, 64]
+
+
+class TestTemplateLibrary:
+    def test_add(self, test_library, test_icons):
+        assert len(test_library) == len(test_icons)
+        assert "icon_0" in test_library
+
+        with pytest.raises(ValueError):
+            test_library.add(test_icons[0], name="icon_0")
+        with pytest.raises(TypeError):
+            test_library.add(test_icons[0])
+
+    def test_shortlist(self, test_library, test_icons):
+        np_region = cv2.cvtColor(test_icons[7], cv2.COLOR_BGR2BGRA)
+        names = test_library.shortlist(np_region, top=3, tuple_region=TEST_REG)
+        assert len(names) == 3
+        assert names[0] == "icon_7"
+
+    @pytest.mark.parametrize("index", [0, 13, 49])
+    def test_classify(self, test_library, test_icons, index):
+        np_region = cv2.cvtColor(test_icons[index], cv2.COLOR_BGR2BGRA)
+        name, match = test_library.classify(np_region, tuple_region=TEST_REG)
+        assert name == f"icon_{index}"
+        assert match.score >= match.precision
+
+    def test_classify_unknown(self, test_library):
+        np_region = np.zeros((TEST_REG[3], TEST_REG[2], 4), np.uint8)
+        assert test_library.classify(np_region, tuple_region=TEST_REG) is None
@@ -0,0 +1,151 @@
+import pytest
+import numpy as np
+import time
+
+from ...src.pysikuli import _macro as macro, config
+from ...src.pysikuli._config import Key, Button
+
+
+@pytest.fixture()
+def actions(monkeypatch):
+    actions = []
+    monkeypatch.setattr(macro, "_setMousePosition", lambda loc: actions.append(loc))
+    monkeypatch.setattr(macro, "mousePress", lambda b: actions.append(("down", b)))
+    monkeypatch.setattr(macro, "mouseRelease", lambda b: actions.append(("up", b)))
+    monkeypatch.setattr(macro, "keyDown", lambda k: actions.append(("press", k)))
+    monkeypatch.setattr(macro, "keyUp", lambda k: actions.append(("release", k)))
+    monkeypatch.setattr(macro.mouse, "scroll", lambda dx, dy: actions.append((dx, dy)))
+    return actions
+
+
+def flow():
+    log = macro.MacroLog()
+    for i in range(10):
+        log.append(macro.MOVE, 0.01 * i, 10 * i, 5)
+    log.append(macro.MOUSE_DOWN, 0.1, 90, 5, Button.left)
+    log.append(macro.MOUSE_UP, 0.15, 90, 5, Button.left)
+    log.append(macro.KEY_DOWN, 0.2, value=Key.ctrl)
+    log.append(macro.KEY_DOWN, 0.21, value="a")
+    log.append(macro.KEY_UP, 0.22, value="a")
+    log.append(macro.KEY_UP, 0.23, value=Key.ctrl)
+    log.append(macro.SCROLL, 0.3, 0, -2)
+    return log
+
+
+class TestMacroLog:
+    def test_append(self):
+        log = flow()
+        assert len(log) == 17
+        assert log.duration == pytest.approx(0.3)
+        assert log.events.dtype.itemsize == 21
+        # the keys are stored once
+        assert log.inputs == [Button.left, Key.ctrl, "a"]
+
+    def test_grow(self):
+        log = macro.MacroLog()
+        for i in range(macro._INITIAL_CAPACITY * 3):
+            log.append(macro.MOVE, i, i, i)
+        assert len(log) == macro._INITIAL_CAPACITY * 3
+        assert log.events["x"][-1] == macro._INITIAL_CAPACITY * 3 - 1
+
+    def test_save_load(self, tmp_path):
+        log = flow()
+        log.addSyncPoint(0.4, "pics/ok.png", (0, 0, 100, 100), 2.0)
+        log.addSyncPoint(0.5, np.zeros((4, 4, 3), np.uint8))
+        path = tmp_path / "flow.npz"
+        log.save(path)
+
+        loaded = macro.MacroLog.load(path)
+        assert np.array_equal(loaded.events, log.events)
+        assert loaded.inputs[:2] == [Button.left, Key.ctrl]
+        assert loaded.sync_points[0] == ("pics/ok.png", (0, 0, 100, 100), 2.0)
+        image, region, max_search_time = loaded.sync_points[1]
+        assert image.shape == (4, 4, 3) and region is None and max_search_time is None
+
+
+class TestMacroRecorder:
+    def test_record(self, monkeypatch):
+        monkeypatch.setattr(config, "MACRO_MOVE_INTERVAL", 1)
+        recorder = macro.MacroRecorder()
+        with recorder:
+            for x in range(100):
+                recorder._onMove(x, 0)
+            recorder._onClick(99, 0, Button.left, True)
+            recorder._onClick(99, 0, Button.left, False)
+            recorder._onPress("a")
+            recorder._onRelease("a")
+            recorder._onScroll(99, 0, 0, -1)
+            recorder.syncPoint("pics/ok.png")
+        assert not recorder.recording
+
+        events = recorder.log.events
+        # the merged moves keep the first and the last position
+        assert events["kind"].tolist() == [0, 0, 1, 2, 4, 5, 3, 6]
+        assert events["x"][:2].tolist() == [0, 99]
+        assert np.all(np.diff(events["time"]) >= 0)
+
+    def test_stop_key(self):
+        recorder = macro.MacroRecorder(stop_key=Key.esc).start()
+        recorder._onPress(Key.esc)
+        assert recorder.wait(1)
+        assert len(recorder.log) == 0
+
+
+class TestReplayMacro:
+    def test_order(self, actions):
+        replayed = macro.replayMacro(flow(), speed=10)
+        assert replayed == 17
+        assert actions[-9:] == [
+            (90, 5),
+            ("down", Button.left),
+            (90, 5),
+            ("up", Button.left),
+            ("press", Key.ctrl),
+            ("press", "a"),
+            ("release", "a"),
+            ("release", Key.ctrl),
+            (0, -2),
+        ]
+
+    def test_speed(self, actions):
+        start = time.perf_counter()
+        macro.replayMacro(flow(), speed=1)
+        assert time.perf_counter() - start == pytest.approx(0.3, abs=0.03)
+
+        start = time.perf_counter()
+        macro.replayMacro(flow(), speed=10)
+        assert time.perf_counter() - start == pytest.approx(0.03, abs=0.02)
+
+        with pytest.raises(ValueError):
+            macro.replayMacro(flow(), speed=0)
+
+    def test_skip_late_moves(self, actions):
+        replayed = macro.replayMacro(flow(), speed=float("inf"))
+        assert replayed < 17
+        assert actions[0] == (90, 5)
+
+    def test_sync_point(self, actions, monkeypatch):
+        searches = []
+
+        def find(image, region=None, max_search_time=None):
+            searches.append(image)
+            time.sleep(0.1)
+            return "match" if image == "pics/ok.png" else None
+
+        monkeypatch.setattr(macro, "find", find)
+        log = macro.MacroLog()
+        log.append(macro.MOVE, 0.0, 1, 1)
+        log.addSyncPoint(0.05, "pics/ok.png")
+        log.append(macro.MOVE, 0.1, 2, 2)
+
+        start = time.perf_counter()
+        macro.replayMacro(log, speed=1)
+        # the event after the sync point is timed from the moment it has passed
+        assert time.perf_counter() - start == pytest.approx(0.2, abs=0.03)
+        assert actions == [(1, 1), (2, 2)]
+
+        log.addSyncPoint(0.2, "pics/missing.png")
+        with pytest.raises(TimeoutError):
+            macro.replayMacro(log, speed=10)
+        # the skipped sync points aren't counted
+        assert macro.replayMacro(log, speed=10, sync=False) == 2
@@ -422,3 +422,164 @@ class TestRegion:
 
     def test_wait(self):
         pass
+
+
+@pytest.fixture()
+def test_frame_reg():
+    return (100, 100, 164, 148)
+
+
+@pytest.fixture()
+def test_frame_ndarray(test_frame_reg):
+    x1, y1, x2, y2 = test_frame_reg
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, (y2 - y1, x2 - x1, 4), np.uint8)
+
+
+@pytest.fixture()
+def test_frame(test_frame_ndarray, test_frame_reg):
+    return main.Frame(test_frame_ndarray, test_frame_reg)
+
+
+class TestFrame:
+    def test_init(self, test_frame, test_frame_ndarray, test_frame_reg):
+        assert test_frame.tuple_region == test_frame_reg
+        assert test_frame.width == test_frame_ndarray.shape[1]
+        assert test_frame.height == test_frame_ndarray.shape[0]
+
+    def test_variant_cache(self, test_frame):
+        assert test_frame.gray is test_frame.variant("gray")
+        assert test_frame.bgr is test_frame.variant("bgr", 1)
+        assert test_frame.variant("gray", 2) is test_frame.variant("gray", 2)
+        assert test_frame.integral() is test_frame.integral("gray", 1)
+
+        with pytest.raises(ValueError):
+            test_frame.variant("hsv")
+
+    def test_variant_downscale(self, test_frame):
+        downscaled = test_frame.variant("gray", 2)
+        assert downscaled.shape == (test_frame.height // 2, test_frame.width // 2)
+
+    def test_crop(self, test_frame, test_frame_reg):
+        x1, y1, x2, y2 = test_frame_reg
+        cropped = test_frame.crop((x1 + 1, y1 + 1, x2 - 1, y2 - 1))
+        assert cropped.tuple_region == (x1 + 1, y1 + 1, x2 - 1, y2 - 1)
+        assert cropped.np_region.shape[:2] == (y2 - y1 - 2, x2 - x1 - 2)
+
+        with pytest.raises(ValueError):
+            test_frame.crop((x1 - 1, y1, x2, y2))
+
+    def test_exist(self, test_frame, test_frame_ndarray, test_frame_reg):
+        np_image = np.ascontiguousarray(test_frame_ndarray[10:30, 20:40, :3])
+        frame_match = main.exist(np_image, region=test_frame)
+        ndarray_match = main.exist(
+            np_image, region=test_frame_ndarray, tuple_region=test_frame_reg
+        )
+        assert frame_match.up_left_loc == (120, 110)
+        assert frame_match.center_loc == ndarray_match.center_loc
+        assert frame_match.score == ndarray_match.score
+
+
+class TestWaitConditions:
+    @pytest.fixture()
+    def grabs(self, capture, test_frame):
+        return capture.patch(main, test_frame.crop)
+
+    def test_conditionsNormalization(self, test_frame_reg):
+        conditions = main._conditionsNormalization(
+            ["a.png", ("b.png", test_frame_reg), main.Vanish("c.png", test_frame_reg)]
+        )
+        assert conditions[0] == ("a.png", main.config.MONITOR_REGION, False)
+        assert conditions[1] == ("b.png", test_frame_reg, False)
+        assert conditions[2] == ("c.png", test_frame_reg, True)
+
+        with pytest.raises(TypeError):
+            main._conditionsNormalization([("a.png", np.zeros((10, 10, 3)))])
+
+    def test_unionRegion(self):
+        regions = [(10, 20, 30, 40), (0, 25, 15, 60)]
+        assert main._unionRegion(regions) == (0, 20, 30, 60)
+
+    def test_waitAny(self, grabs, test_frame_ndarray):
+        absent = np.random.default_rng(1).integers(0, 255, (10, 10, 3), np.uint8)
+        present = np.ascontiguousarray(test_frame_ndarray[10:30, 20:40, :3])
+        index, _match = main.waitAny(
+            [(absent, (100, 100, 130, 130)), (present, (110, 100, 164, 148))],
+            max_search_time=0.1,
+        )
+        assert index == 1
+        assert _match.up_left_loc == (120, 110)
+        assert grabs[0] == (100, 100, 164, 148)
+
+        index, _match = main.waitAny([main.Vanish(absent, (100, 100, 164, 148))])
+        assert (index, _match) == (0, None)
+
+        with pytest.raises(TimeoutError):
+            main.waitAny([(absent, (100, 100, 164, 148))], max_search_time=0.05)
+
+    def test_waitAll(self, grabs, test_frame_ndarray):
+        absent = np.random.default_rng(1).integers(0, 255, (10, 10, 3), np.uint8)
+        present = np.ascontiguousarray(test_frame_ndarray[10:30, 20:40, :3])
+        matches = main.waitAll(
+            [(present, (100, 100, 164, 148)), main.Vanish(absent, (100, 100, 140, 140))]
+        )
+        assert matches[0].up_left_loc == (120, 110)
+        assert matches[1] is None
+        assert len(grabs) == 1
+
+        with pytest.raises(TimeoutError):
+            main.waitAll(
+                [(present, (100, 100, 164, 148)), (absent, (100, 100, 164, 148))],
+                max_search_time=0.05,
+            )
+
+
+class TestWaitChanges:
+    @pytest.fixture()
+    def test_gradient(self, test_frame_reg):
+        x1, y1, x2, y2 = test_frame_reg
+        gradient = np.linspace(0, 255, x2 - x1).astype(np.uint8)
+        return np.ascontiguousarray(np.tile(gradient[None, :, None], (y2 - y1, 1, 4)))
+
+    @pytest.fixture()
+    def screen(self, capture, test_gradient, test_frame_reg):
+        # the screen changes on each grab while `changes` lasts
+        screen = {"changes": 0}
+
+        def grab(reg):
+            if screen["changes"] > 0:
+                screen["changes"] -= 1
+                test_gradient[:] = 255 - test_gradient
+            return main.Frame(test_gradient.copy(), test_frame_reg)
+
+        capture.patch(main, grab)
+        return screen
+
+    def test_changedPart(self, test_gradient, test_frame_reg):
+        test_frame = main.Frame(test_gradient, test_frame_reg)
+        assert main._changedPart(test_frame, test_frame) == 0
+        changed = test_gradient.copy()
+        changed[: changed.shape[0] // 2] = 255 - changed[: changed.shape[0] // 2]
+        part = main._changedPart(main.Frame(changed, test_frame_reg), test_frame)
+        assert 0.3 < part <= 0.5
+
+    def test_waitUntilStable(self, screen, test_frame_reg):
+        screen["changes"] = 5
+        start = time.monotonic()
+        frame = main.waitUntilStable(test_frame_reg, stable_time=0.1)
+        assert time.monotonic() - start >= 0.1
+        assert screen["changes"] == 0
+        assert frame.tuple_region == test_frame_reg
+
+        screen["changes"] = 10**6
+        with pytest.raises(TimeoutError):
+            main.waitUntilStable(test_frame_reg, stable_time=0.1, max_search_time=0.1)
+
+    def test_waitForChange(self, screen, test_frame_reg):
+        with pytest.raises(TimeoutError):
+            main.waitForChange(test_frame_reg, max_search_time=0.1)
+
+        baseline = main.grabFrame(test_frame_reg)
+        screen["changes"] = 1
+        frame = main.waitForChange(baseline=baseline)
+        assert main._changedPart(frame, baseline) > 0.8
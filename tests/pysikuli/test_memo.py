@@ -0,0 +1,103 @@
+import pytest
+import numpy as np
+import zlib
+import cv2
+
+from ...src.pysikuli import _memo as memo, _main as main, config
+
+TEST_REGION = (0, 0, 200, 120)
+
+
+@pytest.fixture()
+def test_screen(random_screen):
+    return lambda seed: random_screen(TEST_REGION, seed)
+
+
+@pytest.fixture()
+def test_template(test_screen):
+    return np.ascontiguousarray(test_screen(0)[40:80, 60:120, :3])
+
+
+@pytest.fixture()
+def matches(monkeypatch):
+    calls = []
+    match_template = cv2.matchTemplate
+
+    def matchTemplate(*args, **kwargs):
+        calls.append(args)
+        return match_template(*args, **kwargs)
+
+    monkeypatch.setattr(main.cv2, "matchTemplate", matchTemplate)
+    monkeypatch.setattr(config, "MATCH_MEMO", True)
+    main.match_memo.clear()
+    main.match_memo.resetStats()
+    yield calls
+    main.match_memo.clear()
+
+
+def _exist(np_screen, image, **kwargs):
+    frame = main.Frame(np_screen.copy(), TEST_REGION)
+    return main.exist(image, region=frame, **kwargs)
+
+
+class TestMatchMemo:
+    def test_digest(self, test_screen):
+        first = main.Frame(test_screen(0), TEST_REGION)
+        assert first.digest == main.Frame(test_screen(0), TEST_REGION).digest
+        assert first.digest != main.Frame(test_screen(1), TEST_REGION).digest
+        assert first.crop((10, 10, 50, 50)).digest == first.crop((10, 10, 50, 50)).digest
+
+    def test_key(self, test_template, test_screen):
+        frame = main.Frame(test_screen(0), TEST_REGION)
+        key = memo.MatchMemo.key(frame, test_template, True)
+        assert key == memo.MatchMemo.key(frame, test_template.copy(), True)
+        assert key != memo.MatchMemo.key(frame, test_template, False)
+        assert memo.MatchMemo.key(frame, object(), True) is None
+
+    def test_collision(self):
+        # the same crc32, the same bytes of another dtype
+        assert zlib.crc32(b"plumless") == zlib.crc32(b"buckeroo")
+        first = np.frombuffer(b"plumless", np.uint8)
+        assert memo._contentKey(first) != memo._contentKey(
+            np.frombuffer(b"buckeroo", np.uint8)
+        )
+        assert memo._contentKey(first) != memo._contentKey(first.view(np.int8))
+
+    def test_hit(self, matches, test_template, test_screen):
+        first = _exist(test_screen(0), test_template)
+        second = _exist(test_screen(0), test_template)
+        assert len(matches) == 1
+        assert main.match_memo.hits == 1
+        assert second.up_left_loc == first.up_left_loc == (60, 40)
+        assert second.score == first.score
+        assert second.np_region.shape == first.np_region.shape
+
+        _exist(test_screen(1), test_template)
+        assert len(matches) == 2
+
+    def test_precision(self, matches, test_template, test_screen):
+        np_screen = test_screen(0)
+        np_screen[40:80, 60:120] = 255 - np_screen[40:80, 60:120]
+        assert _exist(np_screen, test_template) is None
+        assert _exist(np_screen, test_template, precision=-1) is not None
+        assert len(matches) == 1
+
+    def test_color(self, matches, test_template, test_screen):
+        gray = _exist(test_screen(0), test_template, grayscale=True)
+        color = _exist(test_screen(0), test_template, grayscale=False)
+        assert len(matches) == 2
+        assert color.np_region.shape[2] == 4
+        assert gray.np_region.ndim == 2
+
+    def test_disabled(self, matches, test_template, monkeypatch, test_screen):
+        monkeypatch.setattr(config, "MATCH_MEMO", False)
+        _exist(test_screen(0), test_template)
+        _exist(test_screen(0), test_template)
+        assert len(matches) == 2
+
+    def test_lru(self, matches, test_template, monkeypatch, test_screen):
+        monkeypatch.setattr(config, "MATCH_MEMO_SIZE", 2)
+        for seed in (0, 1, 2, 0):
+            _exist(test_screen(seed), test_template)
+        assert len(main.match_memo) == 2
+        assert len(matches) == 4
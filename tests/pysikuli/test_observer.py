@@ -0,0 +1,187 @@
+import pytest
+import numpy as np
+import time
+import cv2
+
+from ...src.pysikuli import _observer as observer
+
+TEST_REGION = (0, 0, 320, 180)
+
+
+@pytest.fixture()
+def test_screen(random_screen, capture):
+    np_screen = random_screen(TEST_REGION)
+    return np_screen, capture.patch(observer, np_screen)
+
+
+@pytest.fixture()
+def test_icon():
+    icon = np.full((30, 30, 3), 255, np.uint8)
+    cv2.circle(icon, (15, 15), 10, (0, 0, 200), -1)
+    cv2.line(icon, (0, 0), (29, 29), (0, 120, 0), 2)
+    return icon
+
+
+@pytest.fixture()
+def test_scheduler():
+    scheduler = observer.ObserverScheduler(cpu_budget=1.0)
+    # cycles are run by the tests, not by the thread
+    scheduler.start = lambda: None
+    return scheduler
+
+
+def _observer(scheduler, event, callback, **kwargs):
+    return scheduler.add(
+        observer.Observer(event, callback, region=TEST_REGION, **kwargs)
+    )
+
+
+class TestObserver:
+    def test_validation(self, test_icon):
+        with pytest.raises(ValueError):
+            observer.Observer("click", print, image=test_icon)
+        with pytest.raises(ValueError):
+            observer.Observer(observer.APPEAR, print)
+        with pytest.raises(TypeError):
+            observer.Observer(observer.CHANGE, print, region=np.zeros((10, 10)))
+
+    def test_appear_vanish(self, test_scheduler, test_screen, test_icon):
+        np_screen, grabs = test_screen
+        events = []
+        _observer(test_scheduler, observer.APPEAR, events.append, image=test_icon)
+        _observer(test_scheduler, observer.VANISH, events.append, image=test_icon)
+
+        test_scheduler._cycle()
+        assert [event.type for event in events] == [observer.VANISH]
+        assert len(grabs) == 1
+
+        np_screen[100:130, 200:230, :3] = test_icon
+        for o in test_scheduler.observers:
+            o.next_run = 0
+        test_scheduler._cycle()
+        assert events[-1].type == observer.APPEAR
+        assert events[-1].match.up_left_loc == (200, 100)
+
+        # no repeated events while the image stays on the screen
+        for o in test_scheduler.observers:
+            o.next_run = 0
+        test_scheduler._cycle()
+        assert len(events) == 2
+
+    def test_change(self, test_scheduler, test_screen):
+        np_screen, _ = test_screen
+        events = []
+        _observer(test_scheduler, observer.CHANGE, events.append, interval=0)
+
+        test_scheduler._cycle()
+        test_scheduler._cycle()
+        assert events == []
+
+        np_screen[50:100, 50:150] = 0
+        test_scheduler._cycle()
+        assert len(events) == 1
+        assert events[0].changed > 0.05
+
+    def test_interval_priority(self, test_scheduler, test_screen):
+        order = []
+        _observer(test_scheduler, observer.CHANGE, lambda e: None, interval=10)
+        low = _observer(test_scheduler, observer.CHANGE, None, priority=0)
+        high = _observer(test_scheduler, observer.CHANGE, None, priority=5)
+        low._check = lambda frame: order.append("low")
+        high._check = lambda frame: order.append("high")
+
+        delay = test_scheduler._cycle()
+        assert order == ["high", "low"]
+        assert 0 < delay <= low.interval
+        assert test_scheduler._cycle() > 0
+        assert order == ["high", "low"]
+
+    def test_budget(self, test_scheduler, test_screen):
+        checked = []
+        for _ in range(3):
+            o = _observer(test_scheduler, observer.CHANGE, None)
+            o._check = lambda frame, o=o: checked.append(o)
+
+        test_scheduler._credit = -0.01
+        assert test_scheduler._cycle() > 0
+        assert checked == []
+
+        test_scheduler._credit = 1e-9
+        test_scheduler._last_refill = time.monotonic()
+        test_scheduler._cycle()
+        assert len(checked) < 3
+
+    def test_pause_stop(self, test_scheduler, test_screen):
+        checked = []
+        first = _observer(test_scheduler, observer.CHANGE, None, interval=0)
+        second = _observer(test_scheduler, observer.CHANGE, None, interval=0)
+        first._check = lambda frame: checked.append("first")
+        second._check = lambda frame: checked.append("second")
+
+        first.pause()
+        test_scheduler._cycle()
+        assert checked == ["second"]
+
+        first.resume()
+        second.stop()
+        test_scheduler._cycle()
+        assert checked == ["second", "first"]
+        assert len(test_scheduler) == 1
+
+        test_scheduler.pause()
+        test_scheduler._cycle()
+        assert checked == ["second", "first"]
+        test_scheduler.resume()
+        test_scheduler._cycle()
+        assert checked == ["second", "first", "first"]
+
+    def test_callback_error(self, test_scheduler, test_screen):
+        def callback(event):
+            raise RuntimeError
+
+        o = _observer(test_scheduler, observer.CHANGE, callback, interval=0)
+        o._check = lambda frame: observer.ObserveEvent(observer.CHANGE, o)
+        test_scheduler._cycle()
+        test_scheduler._cycle()
+        assert o.fired == 2
+
+    def test_capture_error(self, test_scheduler, test_screen, monkeypatch, caplog):
+        _, grabs = test_screen
+        capture = observer._regionToFrame
+
+        def regionToFrame(reg=None, tuple_region=None):
+            if not grabs:
+                grabs.append(None)
+                raise OSError("XGetImage failed")
+            return capture(reg, tuple_region)
+
+        monkeypatch.setattr(observer, "_regionToFrame", regionToFrame)
+        checked = []
+        o = _observer(test_scheduler, observer.CHANGE, print, interval=0)
+        o._check = checked.append
+        assert test_scheduler._cycle() == observer._MIN_RETRY
+        assert "the screen capture has failed" in caplog.text
+        test_scheduler._cycle()
+        assert len(grabs) == 2
+        assert len(checked) == 1
+
+    def test_thread(self, test_screen, test_icon):
+        np_screen, _ = test_screen
+        scheduler = observer.ObserverScheduler()
+        events = []
+        scheduler.add(
+            observer.Observer(
+                observer.APPEAR,
+                events.append,
+                image=test_icon,
+                region=TEST_REGION,
+                interval=0.01,
+            )
+        )
+        np_screen[10:40, 10:40, :3] = test_icon
+        start = time.monotonic()
+        while not events and time.monotonic() - start < 2:
+            time.sleep(0.01)
+        scheduler.shutdown(timeout=1)
+        assert len(events) == 1
+        assert events[0].match.up_left_loc == (10, 10)
@@ -0,0 +1,101 @@
+import pytest
+import numpy as np
+import cv2
+
+from ...src.pysikuli import _planner as planner
+from ...src.pysikuli._main import Match
+
+TEST_REG = (0, 0, 640, 480)
+TEST_IMG_LOC = (300, 200)
+TEST_IMG_SIZE = 48
+
+
+@pytest.fixture()
+def test_reg_ndarray():
+    rng = np.random.default_rng(0)
+    np_region = np.full((TEST_REG[3], TEST_REG[2], 3), 235, np.uint8)
+    for _ in range(200):
+        x, y = rng.integers(0, TEST_REG[2] - 40), rng.integers(0, TEST_REG[3] - 20)
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.putText(np_region, "abc123", (int(x), int(y) + 15), 0, 0.4, color, 1)
+    return cv2.cvtColor(np_region, cv2.COLOR_BGR2BGRA)
+
+
+@pytest.fixture()
+def test_img_ndarray(test_reg_ndarray):
+    x, y = TEST_IMG_LOC
+    size = TEST_IMG_SIZE
+    return np.ascontiguousarray(test_reg_ndarray[y : y + size, x : x + size, :3])
+
+
+class TestMatchPlanner:
+    def test_plan(self, test_img_ndarray, test_reg_ndarray):
+        estimations = planner.MatchPlanner().plan(
+            test_img_ndarray, test_reg_ndarray, key="key"
+        )
+        strategies = [strategy for strategy, *_ in estimations]
+        assert sorted(strategies) == sorted(planner.STRATEGIES)
+
+        eligible = dict((e[0], e[1]) for e in estimations)
+        assert eligible[planner.FULL]
+        assert not eligible[planner.PRIOR_WINDOW]
+
+    def test_plan_small_template(self, test_reg_ndarray):
+        np_image = np.zeros((10, 10, 3), np.uint8)
+        estimations = planner.MatchPlanner().plan(np_image, test_reg_ndarray, key=1)
+        eligible = dict((e[0], e[1]) for e in estimations)
+        assert not eligible[planner.DOWNSCALED]
+
+    @pytest.mark.parametrize("grayscale", [True, False])
+    def test_exist(self, test_img_ndarray, test_reg_ndarray, grayscale):
+        match_planner = planner.MatchPlanner()
+        for _ in range(3):
+            match = match_planner.exist(
+                test_img_ndarray,
+                region=test_reg_ndarray,
+                grayscale=grayscale,
+                tuple_region=TEST_REG,
+            )
+            assert isinstance(match, Match)
+            assert match.up_left_loc == TEST_IMG_LOC
+            assert "chosen:" in match_planner.report()
+
+    def test_exist_missing(self, test_img_ndarray, test_reg_ndarray):
+        match_planner = planner.MatchPlanner()
+        match_planner.exist(test_img_ndarray, test_reg_ndarray, tuple_region=TEST_REG)
+
+        np_region = test_reg_ndarray.copy()
+        x, y = TEST_IMG_LOC
+        np_region[y : y + TEST_IMG_SIZE, x : x + TEST_IMG_SIZE] = 235
+        for _ in range(3):
+            assert (
+                match_planner.exist(test_img_ndarray, np_region, tuple_region=TEST_REG)
+                is None
+            )
+
+    def test_downscaled_miss(self):
+        # the noise of single pixels disappears in the downscaled frame
+        rng = np.random.default_rng(3)
+        np_region = rng.integers(0, 255, (TEST_REG[3], TEST_REG[2], 3), np.uint8)
+        match_planner = planner.MatchPlanner()
+        match_planner.calibrate()
+        match_planner.plan = lambda *args: [(planner.DOWNSCALED, True, 0.0, "")]
+        fallbacks = 0
+        for i in range(10):
+            x, y = 101 + i * 37, 51 + i * 29
+            np_image = np.ascontiguousarray(np_region[y : y + 32, x : x + 32])
+            match = match_planner.exist(np_image, np_region, tuple_region=TEST_REG)
+            assert match.up_left_loc == (x, y)
+            fallbacks += "fallback to full" in match_planner.report()
+
+        assert fallbacks > 0
+        # every downscaled search is recorded, the missed ones too
+        tries = [h.downscaled_hits[1] for h in match_planner._history.values()]
+        assert tries == [1] * 10
+
+    def test_tiles(self):
+        tiles = planner.MatchPlanner()._tiles(400, 400, 50, 50)
+        assert len(tiles) == 16
+        for x1, y1, x2, y2 in tiles:
+            assert 0 <= x1 < x2 <= 400
+            assert 0 <= y1 < y2 <= 400
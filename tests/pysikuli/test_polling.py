@@ -0,0 +1,52 @@
+import pytest
+
+from ...src.pysikuli import _polling as polling, config
+
+
+@pytest.fixture()
+def clock(fake_clock, monkeypatch):
+    monkeypatch.setattr(polling, "time", fake_clock)
+    monkeypatch.setattr(polling, "_sleep", fake_clock.sleep)
+    return fake_clock
+
+
+def _poll(clock, max_search_time, time_step=None, policy=None):
+    poller = polling.Poller(max_search_time, time_step, policy)
+    timestamps = [clock.monotonic() for _ in poller]
+    return poller.stats, timestamps
+
+
+class TestPoller:
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            polling.Poller(1, policy="random")
+
+    def test_fixed(self, clock):
+        stats, timestamps = _poll(clock, 0.2, time_step=0.05, policy=polling.FIXED)
+        assert stats.polls == 4
+        assert stats.polls == len(timestamps)
+        assert stats.cpu_time < stats.wall_time
+
+    def test_refresh(self, clock):
+        stats, timestamps = _poll(clock, 0.2, policy=polling.REFRESH)
+        expected = 0.2 * config.REFRESH_RATE
+        assert expected <= stats.polls <= expected + 1
+
+    def test_backoff(self, clock):
+        stats, timestamps = _poll(clock, 0.5, policy=polling.BACKOFF)
+        intervals = [b - a for a, b in zip(timestamps, timestamps[1:])]
+        assert intervals == sorted(intervals, key=lambda i: round(i, 4))
+        assert intervals[0] == pytest.approx(1 / config.REFRESH_RATE, abs=1e-4)
+        assert max(intervals) == pytest.approx(config.POLL_MAX_INTERVAL, abs=1e-4)
+
+    def test_deadline(self, clock):
+        start = clock.monotonic()
+        stats, timestamps = _poll(clock, 0.3, policy=polling.DEADLINE)
+        assert timestamps[-1] - start == pytest.approx(0.3, abs=1e-4)
+
+    def test_early_exit(self):
+        for poll in polling.Poller(10):
+            if poll == 3:
+                break
+        assert polling.lastPollStats().polls == 3
+        assert polling.lastPollStats().wall_time < 1
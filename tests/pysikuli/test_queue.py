@@ -0,0 +1,127 @@
+import pytest
+import time
+
+from ...src.pysikuli import _queue as input_queue, _main as main
+from ...src.pysikuli._deadline import Deadline, _checkDeadline
+from ...src.pysikuli._exceptions import FailSafeException, CancelledException
+
+
+@pytest.fixture()
+def actions():
+    actions = input_queue.InputQueue()
+    yield actions
+    actions.cancel()
+    actions.shutdown()
+
+
+class FakeKeyboard:
+    """
+    Records the keys instead of pressing them
+    """
+
+    def __init__(self):
+        self.log = []
+        self.pressed_keys = []
+
+    def type(self, message):
+        self.log.append(("type", message))
+
+    def tap(self, key):
+        self.log.append(("tap", key))
+
+    def press(self, key):
+        self.log.append(("press", key))
+
+    def release(self, key):
+        self.log.append(("release", key))
+
+
+def failSafe():
+    raise FailSafeException("fail-safe")
+
+
+class TestInputQueue:
+    def test_order(self, actions):
+        calls = []
+
+        def action(i):
+            time.sleep(0.01 * (3 - i))
+            calls.append(i)
+            return i * 10
+
+        futures = [actions.submit(action, i) for i in range(3)]
+        assert actions.sync()
+        assert calls == [0, 1, 2]
+        assert [future.result() for future in futures] == [0, 10, 20]
+        assert actions.pending == 0
+
+    def test_overlap(self, actions):
+        start = time.perf_counter()
+        future = actions.submit(time.sleep, 0.2)
+        # the script keeps working while the action runs
+        time.sleep(0.2)
+        assert not actions.sync(timeout=0.1) or future.done()
+        future.result()
+        assert time.perf_counter() - start < 0.35
+
+    def test_errors(self, actions):
+        future = actions.submit(int, "not a number")
+        actions.submit(int, "1")
+        with pytest.raises(ValueError):
+            actions.sync()
+        assert isinstance(future.exception(), ValueError)
+        # the errors are raised once
+        assert actions.sync()
+
+    def test_failsafe(self, actions):
+        actions.submit(failSafe)
+        later = actions.submit(time.sleep, 0)
+        with pytest.raises(FailSafeException):
+            actions.sync()
+        assert isinstance(later.exception(), FailSafeException)
+        with pytest.raises(FailSafeException):
+            actions.submit(time.sleep, 0)
+
+        actions.reset()
+        assert actions.submit(int, "2").result() == 2
+
+    def test_with_block(self, actions):
+        with pytest.raises(RuntimeError):
+            with actions:
+                actions.submit(time.sleep, 0.1)
+                pending = actions.submit(time.sleep, 0)
+                raise RuntimeError("script error")
+        assert pending.cancelled()
+
+        with actions:
+            done = actions.submit(int, "3")
+        assert done.result() == 3
+
+    def test_deadline(self, actions):
+        deadline = Deadline()
+        with deadline:
+            future = actions.submit(_checkDeadline)
+            assert future.exception() is None
+            sleeping = actions.submit(time.sleep, 0.05)
+            actions.submit(_checkDeadline)
+            # the queued actions see the script's Deadline
+            deadline.cancel()
+        with pytest.raises(CancelledException):
+            actions.sync()
+        assert sleeping.exception() is None
+        actions.reset()
+
+    def test_named_actions(self, actions, monkeypatch):
+        keyboard = FakeKeyboard()
+        monkeypatch.setattr(main, "keyboard", keyboard)
+        monkeypatch.setattr(main, "_inputBackend", lambda: None)
+        actions.write("ab", time_step=0, mode="type")
+        actions.tap("c")
+        actions.sync()
+        assert keyboard.log == [
+            ("type", "ab"),
+            ("press", "c"),
+            ("release", "c"),
+        ]
+        with pytest.raises(AttributeError):
+            actions.exist
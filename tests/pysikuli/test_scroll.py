@@ -0,0 +1,112 @@
+import pytest
+import numpy as np
+import time
+import cv2
+
+from ...src.pysikuli import _scroll as scroll, _main as main, config
+
+PAGE_HEIGHT = 3000
+WINDOW = (0, 0, 400, 500)
+PIXELS_PER_CLICK = 40
+
+
+def page():
+    # blocks of random colors, like the text lines and icons of a real page
+    rng = np.random.default_rng(7)
+    blocks = rng.integers(0, 256, (PAGE_HEIGHT // 10, 40, 4), dtype=np.uint8)
+    return cv2.resize(blocks, (400, PAGE_HEIGHT), interpolation=cv2.INTER_NEAREST)
+
+
+class FakePage:
+    def __init__(self, monkeypatch, capture):
+        self.page = page()
+        self.offset = 0
+        self.events = []
+        monkeypatch.setattr(main.mouse, "scroll", self.scroll)
+        capture.patch(scroll, self.frame)
+        monkeypatch.setattr(config, "SCROLL_SETTLE_TIME", 0.05)
+
+    def scroll(self, dx, dy):
+        self.events.append((dx, dy))
+        offset = self.offset - dy * PIXELS_PER_CLICK
+        self.offset = min(max(offset, 0), PAGE_HEIGHT - WINDOW[3])
+
+    def frame(self, tuple_region):
+        window = self.page[self.offset : self.offset + WINDOW[3]]
+        return main.Frame(np.ascontiguousarray(window), tuple_region)
+
+
+@pytest.fixture()
+def fake_page(monkeypatch, capture):
+    return FakePage(monkeypatch, capture)
+
+
+class TestScrollSchedule:
+    @pytest.mark.parametrize("profile", ["linear", "ease-in-out", "bezier"])
+    def test_sum(self, profile):
+        schedule = scroll.scrollSchedule(-37, 12, profile)
+        assert len(schedule) == 12
+        assert schedule.sum() == -37
+        assert np.all(schedule <= 0)
+
+    def test_acceleration(self):
+        schedule = scroll.scrollSchedule(60, 12, "ease-in-out")
+        assert schedule[0] < schedule[6]
+        assert schedule[-1] < schedule[6]
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            scroll.scrollSchedule(10, 5, "bounce")
+
+
+class TestScrollBy:
+    def test_batched(self, fake_page):
+        scroll.scrollBy(dy=-20, duration=0.1, profile="linear")
+        frames = int(0.1 * config.REFRESH_RATE)
+        assert len(fake_page.events) == frames
+        assert sum(dy for _, dy in fake_page.events) == -20
+
+    @pytest.mark.parametrize("duration", [None, 0.5])
+    def test_duration(self, fake_page, duration):
+        start = time.monotonic()
+        scroll.scrollBy(dy=10, duration=duration)
+        elapsed = time.monotonic() - start
+        expected = duration if duration is not None else 10 / config.SCROLL_SPEED
+        # the wait after the last batch completes the duration
+        assert expected * 0.95 <= elapsed < expected + 0.2
+        assert sum(dy for _, dy in fake_page.events) == 10
+
+    def test_vscroll(self, fake_page):
+        main.vscroll(duration=0.05, speed=-1)
+        assert all(event == (0, -1) for event in fake_page.events)
+
+
+class TestScrollUntil:
+    def test_found(self, fake_page):
+        y = 2000
+        template = fake_page.page[y : y + 60, 100:160, :3].copy()
+        _match = scroll.scrollUntil(template, WINDOW)
+        assert _match is not None
+        assert _match.up_left_loc == (100, y - fake_page.offset)
+
+        # the content never moves further than the window minus the template
+        span = WINDOW[3] - 60
+        assert max(abs(dy) for _, dy in fake_page.events) * PIXELS_PER_CLICK <= span
+
+    def test_callable(self, fake_page):
+        found = scroll.scrollUntil(
+            lambda frame: True if fake_page.offset >= 400 else None, WINDOW
+        )
+        assert found is True
+
+    def test_end_of_page(self, fake_page):
+        assert scroll.scrollUntil(lambda frame: None, WINDOW, direction="up") is None
+        assert fake_page.events == [(0, 1)]
+
+    def test_max_clicks(self, fake_page):
+        assert scroll.scrollUntil(lambda frame: None, WINDOW, max_clicks=5) is None
+        assert sum(-dy for _, dy in fake_page.events) == 5
+
+    def test_direction(self):
+        with pytest.raises(ValueError):
+            scroll.scrollUntil(lambda frame: None, WINDOW, direction="forward")
@@ -0,0 +1,68 @@
+import pytest
+import numpy as np
+import cv2
+import os
+
+from ...src.pysikuli import _states as states
+
+TEST_SIZE = (320, 180)
+
+
+def _screen(seed):
+    rng = np.random.default_rng(seed)
+    np_screen = np.full((TEST_SIZE[1], TEST_SIZE[0], 3), 240, np.uint8)
+    for _ in range(20):
+        x = int(rng.integers(0, TEST_SIZE[0] - 40))
+        y = int(rng.integers(0, TEST_SIZE[1] - 25))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.rectangle(np_screen, (x, y), (x + 40, y + 25), color, -1)
+    return np_screen
+
+
+@pytest.fixture()
+def test_screens():
+    return {"login": _screen(0), "menu": _screen(1), "settings": _screen(2)}
+
+
+@pytest.fixture()
+def test_states(test_screens):
+    screen_states = states.ScreenStates()
+    for name, np_screen in test_screens.items():
+        screen_states.addState(name, np_screen)
+    return screen_states
+
+
+class TestScreenStates:
+    def test_stateSignature(self, test_screens):
+        signature = states._stateSignature(test_screens["login"], (16, 9))
+        assert signature.shape == (16 * 9,)
+        assert np.isclose(np.dot(signature, signature), 1)
+
+    def test_addState(self, test_states):
+        assert len(test_states) == 3
+        assert "menu" in test_states
+        assert test_states.names == ["login", "menu", "settings"]
+
+    @pytest.mark.parametrize("name", ["login", "menu", "settings"])
+    def test_classify(self, test_states, test_screens, name):
+        state, confidence = test_states.classify(test_screens[name])
+        assert state == name
+        assert confidence == pytest.approx(1, abs=1e-5)
+
+    def test_classify_unknown(self, test_states):
+        assert test_states.classify(_screen(3)) is None
+        assert states.ScreenStates().classify(_screen(3)) is None
+
+    def test_removeState(self, test_states, test_screens):
+        test_states.removeState("menu")
+        assert "menu" not in test_states
+        assert test_states.classify(test_screens["menu"]) is None
+
+    def test_save_load(self, test_states, test_screens, tmp_path):
+        path = os.path.join(tmp_path, "states.npz")
+        test_states.save(path)
+
+        loaded = states.ScreenStates()
+        loaded.load(path)
+        assert loaded.names == test_states.names
+        assert loaded.classify(test_screens["login"])[0] == "login"
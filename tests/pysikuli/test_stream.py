@@ -0,0 +1,122 @@
+import pytest
+import numpy as np
+import threading
+import time
+import cv2
+
+from ...src.pysikuli import _stream as stream, _main as main, _deadline as deadline
+from ...src.pysikuli._exceptions import CancelledException
+
+TEST_REGION = (0, 0, 160, 100)
+
+
+@pytest.fixture()
+def test_screen(capture):
+    np_screen = np.full((TEST_REGION[3], TEST_REGION[2], 4), 240, np.uint8)
+    cv2.rectangle(np_screen, (20, 20), (60, 50), (0, 0, 200, 255), -1)
+    cv2.circle(np_screen, (110, 60), 15, (200, 0, 0, 255), -1)
+    capture.patch(stream, np_screen)
+    return np_screen
+
+
+def _frames(count, np_screen=None):
+    if np_screen is None:
+        np_screen = np.zeros((100, 160, 4), np.uint8)
+    return [main.Frame(np_screen.copy(), TEST_REGION) for _ in range(count)]
+
+
+class TestFrameStream:
+    def test_frames(self, test_screen):
+        frame_stream = stream.frames(TEST_REGION, fps=100, duration=0.2)
+        received = list(frame_stream)
+        assert 5 <= len(received) <= 25
+        assert all(frame.tuple_region == TEST_REGION for frame in received)
+        assert received == sorted(received, key=lambda frame: frame.timestamp)
+        assert frame_stream.stats.delivered == len(received)
+        assert frame_stream._thread is None
+
+    def test_drop_stale(self, test_screen):
+        frame_stream = stream.frames(TEST_REGION, fps=200, duration=0.3)
+        for _ in frame_stream:
+            time.sleep(0.05)
+        stats = frame_stream.stats
+        assert stats.dropped > stats.delivered
+        # the consumer always gets the latest frame, not a queue of old ones
+        assert stats.max_latency < 0.05
+
+    def test_capture_error(self, capture):
+        frame_stream = stream.frames(TEST_REGION, fps=100)
+        frame = _frames(1)[0]
+        frame_stream._latest = frame
+
+        def failedGrab(reg):
+            frame_stream._stop.set()
+            raise OSError("XGetImage failed")
+
+        capture.patch(stream, failedGrab)
+        frame_stream._capture()
+        # the undelivered frame isn't replaced by the failed capture
+        assert frame_stream._latest is frame
+        assert frame_stream.stats.failed == 1
+        assert frame_stream.stats.captured == 0
+
+    def test_break(self, test_screen):
+        frame_stream = stream.frames(TEST_REGION, fps=100)
+        for _ in frame_stream:
+            break
+        assert frame_stream._thread is None
+
+    def test_deadline(self, test_screen):
+        start = time.monotonic()
+        with deadline.Deadline(0.1):
+            list(stream.frames(TEST_REGION, fps=100))
+        assert time.monotonic() - start < 0.5
+
+        budget = deadline.Deadline()
+        threading.Timer(0.05, budget.cancel).start()
+        with pytest.raises(CancelledException):
+            with budget:
+                list(stream.frames(TEST_REGION, fps=100, duration=5))
+
+
+class TestPipeline:
+    def test_stages(self, test_screen):
+        frames = [main.Frame(test_screen.copy(), TEST_REGION)]
+        pipeline = stream.Pipeline(frames, [stream.Stage.crop((20, 20, 100, 60))])
+        cropped = list(pipeline)[0]
+        assert cropped.tuple_region == (20, 20, 100, 60)
+
+        gray = list(pipeline.pipe(stream.Stage.grayscale()))[0]
+        assert gray.shape == (40, 80)
+        small = list(pipeline.pipe(stream.Stage.grayscale(), stream.Stage.downscale(2)))
+        assert small[0].shape == (20, 40)
+
+    def test_match(self, test_screen):
+        template = np.ascontiguousarray(test_screen[10:60, 10:70, :3])
+        screens = [test_screen.copy(), np.full_like(test_screen, 240)]
+        frames = [main.Frame(np_screen, TEST_REGION) for np_screen in screens]
+        pipeline = stream.Pipeline(frames, [stream.Stage.match(template)])
+        matches = list(pipeline)
+        assert len(matches) == 1
+        assert matches[0].up_left_loc == (10, 10)
+        assert pipeline.stats[0].calls == 2
+        assert pipeline.stats[0].passed == 1
+
+    def test_diff(self, test_screen):
+        changed = test_screen.copy()
+        changed[:50] = 0
+        frames = _frames(2, test_screen) + _frames(2, changed)
+        pipeline = stream.Pipeline(frames, [stream.Stage.diff()])
+        assert [frame.np_region[0, 0, 0] for frame in pipeline] == [240, 0]
+
+    def test_custom_stage(self):
+        pipeline = stream.Pipeline(_frames(3), [lambda frame: frame.width])
+        assert list(pipeline) == [160, 160, 160]
+        assert pipeline.stats[0].name == "<lambda>"
+        assert pipeline.stats[0].mean_time >= 0
+
+    def test_stream_pipe(self, test_screen):
+        frame_stream = stream.frames(TEST_REGION, fps=50, duration=0.1)
+        results = list(frame_stream.pipe(stream.Stage.diff()))
+        assert len(results) == 1
+        assert frame_stream.stats.delivered >= 2
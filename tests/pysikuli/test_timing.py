@@ -0,0 +1,132 @@
+import pytest
+import threading
+import time
+
+from ...src.pysikuli import _timing as timing, _main as main, config
+from ...src.pysikuli._deadline import Deadline
+from ...src.pysikuli._exceptions import CancelledException
+
+
+@pytest.fixture()
+def stats():
+    timing.timing_stats.reset()
+    yield timing.timing_stats
+    timing.timing_stats.reset()
+
+
+@pytest.fixture()
+def clock(fake_clock, monkeypatch):
+    monkeypatch.setattr(timing, "time", fake_clock)
+    return fake_clock
+
+
+class TestJitterStats:
+    def test_record(self):
+        stats = timing.JitterStats("test")
+        for error in (0.00005, 0.0003, 0.0003, 0.05):
+            stats.record(error)
+        assert stats.count == 4
+        assert stats.max_error == 0.05
+        assert stats.mean == pytest.approx(0.0126625)
+        histogram = dict(stats.histogram())
+        assert histogram["< 0.1 ms"] == 1
+        assert histogram["< 0.5 ms"] == 2
+        assert histogram[">= 20 ms"] == 1
+
+    def test_report(self, stats):
+        stats.record("tap", 0.0002)
+        assert "tap" in stats
+        assert "JitterStats(name='tap'" in stats.report()
+
+
+class TestSleep:
+    def test_preciseSleep(self, stats, clock, monkeypatch):
+        monkeypatch.setattr(config, "TIMING_SPIN", 0.002)
+        clock.oversleep = 0.001
+        start = timing.now()
+        timing.preciseSleep(0.02, "test")
+        elapsed = timing.now() - start
+        # the busy-wait absorbs the oversleep
+        assert clock.sleeps[0] == pytest.approx(0.018)
+        assert 0.02 <= elapsed < 0.02 + 1e-5
+        assert stats["test"].count == 1
+        assert stats["test"].max_error < 1e-5
+
+    def test_no_stats(self, stats, monkeypatch):
+        monkeypatch.setattr(config, "TIMING_STATS", False)
+        timing.preciseSleep(0.001, "test")
+        assert "test" not in stats
+
+    def test_cancel(self):
+        deadline = Deadline()
+        threading.Timer(0.05, deadline.cancel).start()
+        start = time.perf_counter()
+        with pytest.raises(CancelledException):
+            with deadline:
+                timing.sleepUntil(timing.now() + 5)
+        assert time.perf_counter() - start < 1
+
+
+class TestPacer:
+    def test_no_drift(self, stats, clock):
+        clock.oversleep = 0.001
+        pacer = timing.Pacer(0.01, "test")
+        start = timing.now()
+        for _ in range(10):
+            # the loop body doesn't add up to the intervals
+            clock.sleep(0.003)
+            pacer.wait()
+        assert timing.now() - start == pytest.approx(0.1, abs=1e-4)
+        assert stats["test"].count == 10
+
+    def test_behind(self, stats):
+        pacer = timing.Pacer(0.01, "test")
+        time.sleep(0.05)
+        start = time.perf_counter()
+        pacer.wait()
+        pacer.wait()
+        # the missed ticks aren't caught up
+        assert time.perf_counter() - start >= 0.009
+        assert stats["test"].max_error >= 0.03
+
+    def test_zero_interval(self, stats):
+        pacer = timing.Pacer(0, "test")
+        pacer.wait()
+        assert "test" not in stats
+
+
+class TestPacedLoops:
+    def test_tap(self, stats, clock):
+        start = timing.now()
+        main.tap("a", presses=3, time_step=0.01)
+        assert timing.now() - start == pytest.approx(0.06, abs=1e-4)
+        assert stats["tap"].count == 6
+
+    def test_cancel(self, monkeypatch):
+        events = []
+        monkeypatch.setattr(main, "_inputBackend", lambda: None)
+        monkeypatch.setattr(
+            main.keyboard, "press", lambda k: events.append(("press", k))
+        )
+        monkeypatch.setattr(
+            main.keyboard, "release", lambda k: events.append(("release", k))
+        )
+        deadline = Deadline()
+        threading.Timer(0.05, deadline.cancel).start()
+        with pytest.raises(CancelledException):
+            with deadline:
+                main.tap("a", presses=20, interval=10, time_step=0.01)
+        # the remaining presses aren't sent and the key isn't left pressed
+        assert events == [("press", "a"), ("release", "a")]
+
+        events.clear()
+        deadline = Deadline()
+        threading.Timer(0.05, deadline.cancel).start()
+        with pytest.raises(CancelledException):
+            with deadline:
+                main.hotkey("ctrl", "shift", "a", interval=10)
+        assert events == [("press", "ctrl"), ("release", "ctrl")]
+
+    def test_scroll(self, stats):
+        main.scroll(duration=0.1, vertical_speed=1)
+        assert stats["scroll"].count == int(0.1 * config.REFRESH_RATE)
@@ -0,0 +1,94 @@
+import pytest
+import numpy as np
+import time
+
+from ...src.pysikuli import _trajectory as trajectory, _main as main
+from ...src.pysikuli._exceptions import PysikuliException
+
+
+@pytest.fixture()
+def positions(monkeypatch):
+    positions = []
+
+    def setMousePosition(loc):
+        positions.append(loc)
+        main.mouse.position = loc
+
+    monkeypatch.setattr(main, "_setMousePosition", setMousePosition)
+    # (0, 0) is a fail-safe corner
+    main.mouse.position = (0, 100)
+    yield positions
+
+
+class TestTrajectory:
+    def test_linear(self):
+        path = trajectory.trajectory((0, 0), (600, 0), speed=1, rate=60)
+        assert path.duration == pytest.approx(0.6)
+        assert len(path) == 36
+        assert path.destination == (600, 0)
+        assert tuple(path.points[-1]) == (600, 0)
+        assert np.all(np.diff(path.points[:, 0]) > 0)
+        assert np.allclose(np.diff(path.times), 1 / 60)
+
+    @pytest.mark.parametrize("easing", ["ease-in-out", "bezier"])
+    def test_easing(self, easing):
+        path = trajectory.trajectory((0, 0), (1000, 500), easing=easing, rate=60)
+        steps = np.hypot(*np.diff(path.points, axis=0).T)
+        # slow start and fast middle
+        assert steps[0] < steps[len(steps) // 2]
+        assert tuple(path.points[-1]) == (1000, 500)
+        assert np.all(np.diff(path.points[:, 0]) >= 0)
+
+    def test_short(self):
+        path = trajectory.trajectory((10, 10), (10, 10))
+        assert len(path) == 1
+        assert path.duration == 0
+        path = trajectory.trajectory((10, 10), (13, 10), rate=60, speed=0.001)
+        # repeated points are skipped
+        assert path.points.tolist() == [[11, 10], [12, 10], [13, 10]]
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            trajectory.trajectory((0, 0), (10, 10), easing="bounce")
+        with pytest.raises(ValueError):
+            trajectory.trajectory((0, 0), (10, 10), easing="bezier", bezier=(2, 0, 0, 1))
+
+    def test_offset(self):
+        path = trajectory.trajectory((0, 0), (100, 0)).offset(5, 7)
+        assert path.start == (5, 7)
+        assert path.destination == (105, 7)
+        assert tuple(path.points[-1]) == (105, 7)
+
+
+class TestSmoothMove:
+    def test_duration(self, positions):
+        start = time.monotonic()
+        main.mouseSmoothMove((300, 100), speed=1)
+        assert time.monotonic() - start == pytest.approx(0.3, abs=0.05)
+        assert positions[-1] == (300, 100)
+        assert main.mousePosition() == (300, 100)
+
+    def test_late_points_skipped(self, positions, monkeypatch):
+        path = trajectory.trajectory((0, 0), (600, 0), rate=60)
+        start = time.monotonic()
+        # every sleep takes 50 ms longer than asked
+        for delay in main._smoothMove(None, path=path):
+            time.sleep(delay + 0.05)
+        assert time.monotonic() - start < 0.7
+        assert len(positions) < len(path) // 2
+        assert positions[-1] == (600, 0)
+
+    def test_interrupted(self, positions, monkeypatch):
+        monkeypatch.setattr(main, "mousePosition", lambda: (0, 500))
+        path = trajectory.trajectory((0, 0), (300, 0), rate=60)
+        with pytest.raises(PysikuliException):
+            for _ in main._smoothMove(None, path=path):
+                pass
+
+    def test_dragDrop(self, positions, monkeypatch):
+        buttons = []
+        monkeypatch.setattr(main.mouse, "press", lambda b: buttons.append("press"))
+        monkeypatch.setattr(main.mouse, "release", lambda b: buttons.append("release"))
+        main.dragDrop((50, 100), start_location=(20, 100), speed=5)
+        assert buttons == ["press", "release"]
+        assert positions[-1] == (50, 100)
@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+
+from ...src.pysikuli import _main as main, config
+
+
+class FakeClipboard:
+    def __init__(self, text="saved"):
+        self.text = text
+        self.history = []
+
+    def copy(self, text):
+        self.history.append(text)
+        self.text = text
+
+    def paste(self):
+        return self.text
+
+
+class FakeWindow:
+    """
+    The active window, the pasted text appears after `delay` frames
+    """
+
+    def __init__(self, clipboard, delay=2):
+        self.clipboard = clipboard
+        self.delay = delay
+        self.pasted = None
+        self.frames = 0
+        self.polls = 0
+        self.caret = False
+
+    def hotkey(self):
+        self.pasted = self.clipboard.text
+
+    def frame(self, reg=None, tuple_region=None):
+        image = np.zeros((80, 80, 3), np.uint8)
+        self.polls += 1
+        if self.caret and self.polls % 2:
+            image[8:24, 4:8] = 255
+        if self.pasted is not None:
+            self.frames += 1
+            if self.frames > self.delay:
+                image[16:32, 8:72] = 255
+        return main.Frame(image, (0, 0, 80, 80))
+
+
+@pytest.fixture()
+def clipboard(monkeypatch):
+    clipboard = FakeClipboard()
+    monkeypatch.setattr(config, "CLIPBOARD_BACKEND", "xsel")
+    monkeypatch.setattr(config.platformModule, "_copy", clipboard.copy)
+    monkeypatch.setattr(config.platformModule, "_paste", clipboard.paste)
+    return clipboard
+
+
+@pytest.fixture()
+def window(clipboard, monkeypatch):
+    window = FakeWindow(clipboard)
+    monkeypatch.setattr(main, "_pasteHotkey", window.hotkey)
+    monkeypatch.setattr(main, "_regionToFrame", window.frame)
+    monkeypatch.setattr(main, "_pasteRegion", lambda: (0, 0, 80, 80))
+    monkeypatch.setattr(main, "_inputBackend", lambda: None)
+    monkeypatch.setattr(config, "WRITE_PASTE_VERIFY", True)
+    return window
+
+
+@pytest.fixture()
+def typed(monkeypatch):
+    typed = []
+    monkeypatch.setattr(main.keyboard, "type", typed.append)
+    return typed
+
+
+class TestWriteMode:
+    def test_choice(self, monkeypatch):
+        monkeypatch.setattr(config, "WRITE_PASTE_THRESHOLD", 10)
+        assert main._writeMode("short\ttext") == "paste"
+        assert main._writeMode("short\n") == "type"
+        assert main._writeMode("привет") == "paste"
+        assert main._writeMode("") == "type"
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            main.write("text", mode="fast")
+
+
+class TestWritePaste:
+    def test_restore(self, clipboard, window, typed):
+        main.write("x" * config.WRITE_PASTE_THRESHOLD, mode="auto")
+        assert window.pasted == "x" * config.WRITE_PASTE_THRESHOLD
+        assert window.frames > window.delay
+        assert clipboard.text == "saved"
+        assert typed == []
+
+    def test_type(self, clipboard, window, typed):
+        main.write("short", time_step=0, mode="auto")
+        assert typed == ["short"]
+        assert window.pasted is None
+        assert clipboard.history == []
+
+    def test_timeout(self, clipboard, window, monkeypatch):
+        monkeypatch.setattr(window, "delay", float("inf"))
+        monkeypatch.setattr(config, "WRITE_PASTE_TIMEOUT", 0.05)
+        with pytest.raises(TimeoutError):
+            main.write("text", mode="paste")
+        assert clipboard.text == "saved"
+
+    def test_caret(self, clipboard, window, monkeypatch):
+        # a blinking caret and a change smaller than a few characters aren't a paste
+        monkeypatch.setattr(window, "delay", float("inf"))
+        monkeypatch.setattr(window, "caret", True)
+        monkeypatch.setattr(config, "WRITE_PASTE_TIMEOUT", 0.1)
+        with pytest.raises(TimeoutError):
+            main.write("text", mode="paste")
+
+    def test_no_window(self, clipboard, window, typed, monkeypatch):
+        monkeypatch.setattr(main, "_pasteRegion", lambda: None)
+        main.write("text", time_step=0, mode="paste")
+        assert typed == ["text"]
+        assert window.pasted is None
+        assert clipboard.text == "saved"
+
+    def test_default(self, clipboard, window, typed):
+        main.write("x" * config.WRITE_PASTE_THRESHOLD, time_step=0)
+        assert typed == ["x" * config.WRITE_PASTE_THRESHOLD]
+        assert clipboard.history == []
+
+    def test_rejected(self, clipboard, window, typed, monkeypatch):
+        monkeypatch.setattr(config.platformModule, "_copy", lambda text: None)
+        main.write("привет", time_step=0, mode="auto")
+        assert typed == ["привет"]
+        assert window.pasted is None
+
+    def test_unavailable(self, window, typed, monkeypatch):
+        def paste():
+            raise FileNotFoundError("xsel")
+
+        monkeypatch.setattr(config.platformModule, "_paste", paste)
+        main.write("привет", time_step=0, mode="auto")
+        assert typed == ["привет"]
+        with pytest.raises(FileNotFoundError):
+            main.write("привет", mode="paste")
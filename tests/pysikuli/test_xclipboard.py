@@ -0,0 +1,439 @@
+import threading
+import types
+import os
+
+import pytest
+
+from Xlib import X, Xatom
+
+from ...src.pysikuli import _xclipboard as xclipboard, _unix as unix, config
+
+
+class FakeServer:
+    """
+    Keeps the windows, their properties and the selection owners,
+    delivers the events to the clients like the X server does
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.atoms = {"STRING": Xatom.STRING, "ATOM": Xatom.ATOM}
+        self.properties = {}
+        self.owners = {}
+        self.listeners = {}
+        self.creators = {}
+        self.time = 100
+        self.next_id = 1
+
+    def atom(self, name):
+        with self.lock:
+            return self.atoms.setdefault(name, 1000 + len(self.atoms))
+
+    def tick(self):
+        self.time += 1
+        return self.time
+
+    def event(self, **fields):
+        return types.SimpleNamespace(**fields)
+
+    def setProperty(self, window, prop, value):
+        with self.lock:
+            self.properties[(window.id, prop)] = value
+            self.notifyProperty(window, prop, X.PropertyNewValue)
+
+    def deleteProperty(self, window, prop):
+        with self.lock:
+            if self.properties.pop((window.id, prop), None) is not None:
+                self.notifyProperty(window, prop, X.PropertyDelete)
+
+    def notifyProperty(self, window, prop, state):
+        for client in self.listeners.get(window.id, ()):
+            client.deliver(
+                self.event(
+                    type=X.PropertyNotify,
+                    window=window,
+                    atom=prop,
+                    state=state,
+                    time=self.tick(),
+                )
+            )
+
+
+class FakeWindow:
+    """
+    A window as seen by one client, the events of the window go to its creator
+    """
+
+    def __init__(self, server, client, window_id=None):
+        self.server = server
+        self.client = client
+        if window_id is None:
+            with server.lock:
+                window_id = server.next_id
+                server.next_id += 1
+                server.creators[window_id] = client
+        self.id = window_id
+
+    @property
+    def creator(self):
+        return self.server.creators[self.id]
+
+    def change_property(self, prop, prop_type, prop_format, data, mode=None):
+        key = (self.id, prop)
+        value = bytes(data) if prop_format == 8 else list(data)
+        if mode == X.PropModeAppend and key in self.server.properties:
+            old = self.server.properties[key].value
+            value = old + value
+        self.server.setProperty(
+            self,
+            prop,
+            types.SimpleNamespace(
+                property_type=prop_type, format=prop_format, value=value
+            ),
+        )
+
+    def get_full_property(self, prop, prop_type):
+        return self.server.properties.get((self.id, prop))
+
+    def delete_property(self, prop):
+        self.server.deleteProperty(self, prop)
+
+    def change_attributes(self, event_mask):
+        with self.server.lock:
+            listeners = self.server.listeners.setdefault(self.id, set())
+            if event_mask & X.PropertyChangeMask:
+                listeners.add(self.client)
+            else:
+                listeners.discard(self.client)
+
+    def set_selection_owner(self, selection, time):
+        server = self.server
+        with server.lock:
+            previous = server.owners.get(selection)
+            server.owners[selection] = self
+            if previous is not None and previous is not self:
+                previous.creator.deliver(
+                    server.event(
+                        type=X.SelectionClear,
+                        window=previous,
+                        atom=selection,
+                        time=time,
+                    )
+                )
+
+    def convert_selection(self, selection, target, prop, time):
+        server = self.server
+        with server.lock:
+            owner = server.owners.get(selection)
+        if owner is None:
+            self.client.deliver(
+                server.event(
+                    type=X.SelectionNotify,
+                    requestor=self,
+                    selection=selection,
+                    target=target,
+                    property=X.NONE,
+                    time=time,
+                )
+            )
+            return
+        owner.creator.deliver(
+            server.event(
+                type=X.SelectionRequest,
+                owner=owner,
+                requestor=self,
+                selection=selection,
+                target=target,
+                property=prop,
+                time=time,
+            )
+        )
+
+    def send_event(self, ev, event_mask=0):
+        self.creator.deliver(
+            self.server.event(
+                type=X.SelectionNotify,
+                requestor=self,
+                selection=ev._data["selection"],
+                target=ev._data["target"],
+                property=ev._data["property"],
+                time=ev._data["time"],
+            )
+        )
+
+    def destroy(self):
+        pass
+
+
+class FakeClient:
+    """
+    One connection: XClipboard uses it as Display, the tests as another application
+    """
+
+    def __init__(self, server, max_request_length=65535):
+        self.server = server
+        self.queue = []
+        self.read_fd, self.write_fd = os.pipe()
+        self.display = types.SimpleNamespace(
+            info=types.SimpleNamespace(max_request_length=max_request_length)
+        )
+        self.root = FakeWindow(server, self)
+        self.received = threading.Condition()
+
+    def screen(self):
+        return types.SimpleNamespace(root=self)
+
+    def create_window(self, *args, event_mask=0, **kwargs):
+        window = FakeWindow(self.server, self)
+        if event_mask & X.PropertyChangeMask:
+            window.change_attributes(event_mask)
+        return window
+
+    def intern_atom(self, name):
+        return self.server.atom(name)
+
+    def get_selection_owner(self, selection):
+        return self.server.owners.get(selection, X.NONE)
+
+    def deliver(self, ev):
+        for name in ("window", "requestor", "owner"):
+            window = getattr(ev, name, None)
+            if isinstance(window, FakeWindow):
+                setattr(ev, name, FakeWindow(self.server, self, window.id))
+        with self.received:
+            self.queue.append(ev)
+            self.received.notify_all()
+        os.write(self.write_fd, b"\0")
+
+    def fileno(self):
+        return self.read_fd
+
+    def pending_events(self):
+        with self.received:
+            return len(self.queue)
+
+    def next_event(self):
+        with self.received:
+            os.read(self.read_fd, 1)
+            return self.queue.pop(0)
+
+    def waitEvent(self, event_type, timeout=2):
+        with self.received:
+            assert self.received.wait_for(
+                lambda: any(ev.type == event_type for ev in self.queue), timeout
+            )
+            for index, ev in enumerate(self.queue):
+                if ev.type == event_type:
+                    os.read(self.read_fd, 1)
+                    return self.queue.pop(index)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Requestor:
+    """
+    Another application, which pastes from the clipboard
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.client = FakeClient(server)
+        self.window = self.client.create_window(event_mask=X.PropertyChangeMask)
+        self.prop = server.atom("XSEL_DATA")
+
+    def request(self, target_name="UTF8_STRING", time=X.CurrentTime):
+        target = self.server.atom(target_name)
+        self.window.convert_selection(
+            self.server.atom("CLIPBOARD"), target, self.prop, time
+        )
+        return self.client.waitEvent(X.SelectionNotify)
+
+    def paste(self, target_name="UTF8_STRING", time=X.CurrentTime):
+        notify = self.request(target_name, time)
+        if notify.property == X.NONE:
+            return None
+        value = self.window.get_full_property(self.prop, X.AnyPropertyType)
+        self.window.delete_property(self.prop)
+        if value.property_type != self.server.atom("INCR"):
+            return value.value
+        chunks = []
+        while True:
+            ev = self.client.waitEvent(X.PropertyNotify)
+            if ev.state != X.PropertyNewValue:
+                continue
+            value = self.window.get_full_property(self.prop, X.AnyPropertyType)
+            if value is None:
+                continue
+            self.window.delete_property(self.prop)
+            if not value.value:
+                return b"".join(chunks)
+            chunks.append(value.value)
+
+
+class Owner:
+    """
+    Another application, which owns the clipboard
+    """
+
+    def __init__(self, server, text: bytes, targets=("UTF8_STRING",), chunk=None):
+        self.server = server
+        self.client = FakeClient(server)
+        self.window = self.client.create_window()
+        self.text = text
+        self.targets = [server.atom(name) for name in targets]
+        self.chunk = chunk
+        self.window.set_selection_owner(server.atom("CLIPBOARD"), server.tick())
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        ev = self.client.waitEvent(X.SelectionRequest)
+        while ev.target not in self.targets:
+            ev.requestor.send_event(self.notify(ev, X.NONE))
+            ev = self.client.waitEvent(X.SelectionRequest)
+        requestor = ev.requestor
+        if self.chunk is None:
+            requestor.change_property(ev.property, ev.target, 8, self.text)
+            requestor.send_event(self.notify(ev, ev.property))
+            return
+        requestor.change_attributes(X.PropertyChangeMask)
+        requestor.change_property(
+            ev.property, self.server.atom("INCR"), 32, [len(self.text)]
+        )
+        requestor.send_event(self.notify(ev, ev.property))
+        offset = 0
+        while True:
+            deleted = self.client.waitEvent(X.PropertyNotify)
+            if deleted.state != X.PropertyDelete:
+                continue
+            chunk = self.text[offset : offset + self.chunk]
+            requestor.change_property(ev.property, ev.target, 8, chunk)
+            offset += len(chunk)
+            if not chunk:
+                return
+
+    def notify(self, ev, prop):
+        return types.SimpleNamespace(
+            _data=dict(
+                selection=ev.selection, target=ev.target, property=prop, time=ev.time
+            )
+        )
+
+
+@pytest.fixture()
+def server():
+    return FakeServer()
+
+
+@pytest.fixture()
+def clipboard(server):
+    clipboard = xclipboard.XClipboard(FakeClient(server))
+    yield clipboard
+    clipboard.close()
+
+
+class TestCopy:
+    def test_own(self, server, clipboard):
+        clipboard.copy("привет")
+        assert clipboard.owned
+        assert server.owners[server.atom("CLIPBOARD")] is clipboard.window
+        assert clipboard.paste() == "привет"
+
+    def test_request(self, server, clipboard):
+        clipboard.copy("привет, world")
+        requestor = Requestor(server)
+        assert requestor.paste().decode("utf-8") == "привет, world"
+        assert requestor.paste("STRING") == "??????, world".encode("latin-1")
+        assert clipboard.reads == 2
+        targets = requestor.paste("TARGETS")
+        assert server.atom("UTF8_STRING") in targets
+        assert requestor.paste("image/png") is None
+        assert clipboard.reads == 2
+
+    def test_incr(self, server, clipboard):
+        clipboard._chunk_size = 7
+        text = "длинный текст " * 10
+        clipboard.copy(text)
+        requestor = Requestor(server)
+        clipboard.expectPaste()
+        assert requestor.paste().decode("utf-8") == text
+        assert clipboard.waitForPaste(1)
+        assert clipboard._transfers == {}
+
+    def test_abandoned_incr(self, server, clipboard, monkeypatch):
+        monkeypatch.setattr(xclipboard, "_TRANSFER_TIMEOUT", 0.05)
+        clipboard._chunk_size = 7
+        clipboard.copy("длинный текст")
+        # the requestor doesn't delete the property to get the chunks
+        Requestor(server).request()
+        assert len(clipboard._transfers) == 1
+        for _ in range(100):
+            if not clipboard._transfers:
+                break
+            threading.Event().wait(0.01)
+        assert clipboard._transfers == {}
+
+    def test_paste_reads(self, server, clipboard):
+        clipboard.copy("text")
+        # a clipboard manager saves the new text before and after the paste hotkey
+        manager = Requestor(server)
+        assert manager.paste() == b"text"
+        clipboard.expectPaste()
+        assert manager.paste() == b"text"
+        late_manager = Requestor(server)
+        assert late_manager.paste(time=clipboard._owner_time) == b"text"
+        assert not clipboard.waitForPaste(0.05)
+        assert clipboard.reads == 3
+
+        clipboard.expectPaste()
+        assert Requestor(server).paste(time=server.tick()) == b"text"
+        assert clipboard.waitForPaste(1)
+
+    def test_clear(self, server, clipboard):
+        clipboard.copy("text")
+        Owner(server, b"other")
+        for _ in range(100):
+            if not clipboard.owned:
+                break
+            threading.Event().wait(0.01)
+        assert not clipboard.owned
+        assert clipboard.paste() == "other"
+
+
+class TestPaste:
+    def test_string(self, server, clipboard):
+        Owner(server, "café".encode("latin-1"), targets=("STRING",))
+        assert clipboard.paste() == "café"
+
+    def test_incr(self, server, clipboard):
+        text = "большой буфер " * 20
+        Owner(server, text.encode("utf-8"), chunk=16)
+        assert clipboard.paste() == text
+
+    def test_empty(self, clipboard):
+        assert clipboard.paste() == ""
+
+
+class TestUnixClipboard:
+    def test_fallback(self, monkeypatch):
+        calls = []
+
+        def run(args, **kwargs):
+            calls.append(kwargs.get("input"))
+            return types.SimpleNamespace(stdout="from xsel")
+
+        def display():
+            raise OSError("no display")
+
+        monkeypatch.setattr(unix, "run", run)
+        monkeypatch.setattr(xclipboard, "Display", display)
+        monkeypatch.setattr(unix, "_x_clipboard", None)
+        monkeypatch.setattr(config, "CLIPBOARD_BACKEND", "xlib")
+        unix._copy("text")
+        assert unix._paste() == "from xsel"
+        assert calls == ["text", None]
+        assert unix._x_clipboard is False
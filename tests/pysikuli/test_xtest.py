@@ -0,0 +1,227 @@
+import time
+
+import pytest
+
+from Xlib import X, XK
+
+from ...src.pysikuli import (
+    _trajectory as trajectory,
+    _xtest as xtest,
+    _main as main,
+    config,
+)
+from ...src.pysikuli._config import Key
+
+# keycode -> (plain, shifted)
+KEYMAP = {
+    8: (XK.XK_Escape, 0),
+    9: (XK.XK_Tab, 0),
+    10: (ord("a"), ord("A")),
+    11: (ord("1"), ord("!")),
+    12: (XK.XK_Shift_L, 0),
+    13: (XK.XK_Return, 0),
+    14: (XK.XK_Control_L, 0),
+    15: (0, 0),
+    16: (0, 0),
+}
+
+
+class KeyCode:
+    def __init__(self, vk=None, char=None):
+        self.vk = vk
+        self.char = char
+
+
+class FakeDisplay:
+    def __init__(self):
+        self.display = type(
+            "", (), {"info": type("", (), {"min_keycode": 8, "max_keycode": 16})}
+        )
+        self.keymap = dict(KEYMAP)
+        self.queue = []
+        self.sent = []
+        self.syncs = 0
+        # out of the fail-safe regions in the corners
+        self.pointer = (500, 500)
+
+    def get_keyboard_mapping(self, first_keycode, count):
+        return [
+            self.keymap.get(keycode, (0, 0))
+            for keycode in range(first_keycode, first_keycode + count)
+        ]
+
+    def change_keyboard_mapping(self, first_keycode, keysyms):
+        self.keymap[first_keycode] = keysyms[0]
+        self.queue.append(("map", first_keycode, keysyms[0][0]))
+
+    def xtest_fake_input(self, event_type, detail=0, root=X.NONE, x=0, y=0):
+        self.queue.append((event_type, detail, x, y))
+
+    def flush(self):
+        if self.queue:
+            self.sent.append(self.queue)
+        self.queue = []
+
+    def sync(self):
+        self.flush()
+        self.syncs += 1
+
+    def screen(self):
+        pointer = type("", (), {"root_x": self.pointer[0], "root_y": self.pointer[1]})
+        root = type("", (), {"query_pointer": lambda root: pointer})
+        return type("", (), {"root": root()})
+
+    def close(self):
+        pass
+
+
+@pytest.fixture()
+def display():
+    return FakeDisplay()
+
+
+@pytest.fixture()
+def backend(display):
+    return xtest.XTestBackend(display)
+
+
+class TestKeysym:
+    def test_char(self):
+        assert xtest._charToKeysym("a") == ord("a")
+        assert xtest._charToKeysym("é") == 0xE9
+        assert xtest._charToKeysym("\n") == XK.XK_Return
+        assert xtest._charToKeysym("ж") == 0x01000000 | ord("ж")
+
+    def test_key(self):
+        assert xtest._keyToKeysym("ctrl") == XK.XK_Control_L
+        assert xtest._keyToKeysym("Return") == XK.XK_Return
+        assert xtest._keyToKeysym(Key.enter) == XK.XK_Return
+        # pynput KeyCode, e.g. of a recorded macro
+        assert xtest._keyToKeysym(KeyCode(char="ж")) == xtest._charToKeysym("ж")
+        assert xtest._keyToKeysym(KeyCode(vk=XK.XK_F5)) == XK.XK_F5
+        with pytest.raises(ValueError):
+            xtest._keyToKeysym("no_such_key")
+
+
+class TestXTestBackend:
+    def test_keymap(self, backend):
+        assert backend.keycode(ord("a")) == (10, False)
+        assert backend.keycode(ord("A")) == (10, True)
+        assert backend._shift_keycode == 12
+        assert sorted(backend._spare_keycodes) == [15, 16]
+
+    def test_type_one_flush(self, backend, display):
+        backend.type("aA!a\n")
+        assert len(display.sent) == 1
+        assert display.sent[0] == [
+            (X.KeyPress, 10, 0, 0),
+            (X.KeyRelease, 10, 0, 0),
+            (X.KeyPress, 12, 0, 0),
+            (X.KeyPress, 10, 0, 0),
+            (X.KeyRelease, 10, 0, 0),
+            (X.KeyPress, 11, 0, 0),
+            (X.KeyRelease, 11, 0, 0),
+            (X.KeyRelease, 12, 0, 0),
+            (X.KeyPress, 10, 0, 0),
+            (X.KeyRelease, 10, 0, 0),
+            (X.KeyPress, 13, 0, 0),
+            (X.KeyRelease, 13, 0, 0),
+        ]
+
+    def test_remap(self, backend, display):
+        backend.type("жж")
+        keycode = backend._remapped[xtest._charToKeysym("ж")]
+        assert display.sent[0][0] == ("map", keycode, xtest._charToKeysym("ж"))
+        assert backend.remaps == 1
+
+        # both spare keycodes are taken, the third character reuses the oldest one
+        backend.type("щ")
+        backend.type("ю")
+        assert backend.remaps == 3
+        assert xtest._charToKeysym("ж") not in backend._remapped
+        assert display.syncs == 0
+
+        # a keycode remapped in the same batch is synced before the reuse
+        backend.type("жщю")
+        assert display.syncs >= 1
+
+        backend.close()
+        assert display.keymap[15] == (0, 0) and display.keymap[16] == (0, 0)
+
+    def test_press_release(self, backend, display):
+        backend.press(Key.ctrl)
+        backend.press("A")
+        backend.release("A")
+        backend.release(Key.ctrl)
+        assert [event[:2] for batch in display.sent for event in batch] == [
+            (X.KeyPress, 14),
+            (X.KeyPress, 12),
+            (X.KeyPress, 10),
+            (X.KeyRelease, 10),
+            (X.KeyRelease, 12),
+            (X.KeyRelease, 14),
+        ]
+
+    def test_moveAlong(self, backend, display):
+        backend.moveAlong([(1, 2), (3, 4), (5.7, 6)])
+        assert display.sent == [
+            [
+                (X.MotionNotify, 0, 1, 2),
+                (X.MotionNotify, 0, 3, 4),
+                (X.MotionNotify, 0, 5, 6),
+            ]
+        ]
+
+
+class TestInputBackend:
+    def test_main(self, backend, display, monkeypatch):
+        monkeypatch.setattr(main, "_xtest_backend", backend)
+        monkeypatch.setattr(config, "INPUT_BACKEND", "xtest")
+        monkeypatch.setattr(config, "UNIX", True)
+        main.write("a1", time_step=0)
+        main.mouseMove((510, 520))
+        assert len(display.sent) == 2
+        assert display.sent[1] == [(X.MotionNotify, 0, 510, 520)]
+        # the pynput clicks go after the processed move
+        assert display.syncs == 1
+
+        monkeypatch.setattr(config, "INPUT_BACKEND", "pynput")
+        assert main._inputBackend() is None
+
+    def test_smooth_move(self, backend, display, monkeypatch):
+        monkeypatch.setattr(main, "_xtest_backend", backend)
+        monkeypatch.setattr(config, "INPUT_BACKEND", "xtest")
+        monkeypatch.setattr(config, "UNIX", True)
+        monkeypatch.setattr(
+            main,
+            "mousePosition",
+            lambda: display.sent[-1][-1][2:] if display.sent else (0, 0),
+        )
+        path = trajectory.trajectory((0, 0), (600, 0), rate=60)
+        # every sleep takes 50 ms longer than asked, the late points go in one flush
+        for delay in main._smoothMove(None, path=path):
+            time.sleep(delay + 0.05)
+        points = [event[2:] for batch in display.sent for event in batch]
+        assert points == [tuple(point) for point in path.points.tolist()]
+        assert len(display.sent) < len(path) // 2
+
+    def test_close_at_exit(self, display, monkeypatch):
+        registered = []
+        monkeypatch.setattr(xtest, "Display", lambda: display)
+        monkeypatch.setattr(main.atexit, "register", registered.append)
+        monkeypatch.setattr(main, "_xtest_backend", None)
+        monkeypatch.setattr(config, "INPUT_BACKEND", "xtest")
+        monkeypatch.setattr(config, "UNIX", True)
+        backend = main._inputBackend()
+        assert registered == [backend.close]
+
+    def test_fallback(self, monkeypatch):
+        def display():
+            raise OSError("no display")
+
+        monkeypatch.setattr(xtest, "Display", display)
+        monkeypatch.setattr(main, "_xtest_backend", None)
+        monkeypatch.setattr(config, "INPUT_BACKEND", "xtest")
+        monkeypatch.setattr(config, "UNIX", True)
+        assert main._inputBackend() is None
+        assert main._xtest_backend is False